@@ -0,0 +1,82 @@
+"""
+Память на один браузер воркера: открывает --sessions браузеров через open_session (как пул воркеров),
+загружает в каждом страницу матча с локального сервера записанных страниц и замеряет суммарную
+резидентную память всех процессов ChromeDriver и Chrome. Сравнивает отдельный Chrome на воркера
+("browser": {"engine": "dedicated"}) и контексты одного Chrome ("engine": "shared").
+
+Запуск из корня проекта (нужны Chrome и ChromeDriver):
+    python benchmarks/bench_browser_memory.py [--sessions 8] [--engines dedicated shared]
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+os.chdir(ROOT)
+sys.path.insert(0, ROOT)
+
+from benchmarks.replay_server import ReplayServer
+from src.parser.browser_manager import open_session
+from src.parser.browser_profile import BrowserProfile, _process_tree_rss
+from src.parser.driver_launcher import DriverLauncher
+from src.parser.scrape_context import ScrapeContext
+from src.parser.shared_browser import ENGINE_DEDICATED, ENGINE_SHARED, SharedBrowser
+from src.utils.logger_setup import logger
+
+def measure(engine, sessions, url):
+    """
+    :param engine: "dedicated" или "shared".
+    :param sessions: Количество браузеров воркеров.
+    :param url: Адрес сервера записанных страниц.
+    :return: Кортеж (память всех браузеров в байтах, время открытия браузеров в секундах).
+    """
+    profile = BrowserProfile()
+    launcher = DriverLauncher()
+    shared = SharedBrowser(profile, launcher) if engine == ENGINE_SHARED else None
+    context = ScrapeContext(browser_profile=profile, driver_launcher=launcher, shared_browser=shared)
+    opened = []
+    try:
+        started = time.perf_counter()
+        for number in range(1, sessions + 1):
+            session = open_session(context, f"Воркер {number}")
+            session.ensure_healthy()
+            opened.append(session)
+        elapsed = time.perf_counter() - started
+
+        for number, session in enumerate(opened, start=1):
+            session.driver.get(f"{url}/match/bench-{number}/xg-statistics")
+        # Процессы браузеров — потомки этого процесса; его собственная память не учитывается.
+        rss = _process_tree_rss(os.getpid()) - _own_rss()
+        return rss, elapsed
+    finally:
+        for session in opened:
+            session.close()
+        if shared is not None:
+            shared.close()
+
+def _own_rss():
+    with open("/proc/self/statm", "r") as file:
+        return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+def main():
+    parser = argparse.ArgumentParser(description="Память браузеров воркеров: отдельные Chrome и общий Chrome.")
+    parser.add_argument("--sessions", type=int, default=8, help="Количество браузеров воркеров.")
+    parser.add_argument(
+        "--engines", nargs="+", default=[ENGINE_DEDICATED, ENGINE_SHARED], choices=(ENGINE_DEDICATED, ENGINE_SHARED),
+        help="Движки браузера для сравнения."
+    )
+    args = parser.parse_args()
+    logger.remove()
+
+    print(f"{'движок':<12}{'браузеров':>10}{'память, МБ':>12}{'на браузер, МБ':>16}{'запуск, с':>11}")
+    with ReplayServer() as server:
+        for engine in args.engines:
+            rss, elapsed = measure(engine, args.sessions, server.url)
+            megabytes = rss / 1024 / 1024
+            per_session = megabytes / args.sessions
+            print(f"{engine:<12}{args.sessions:>10}{megabytes:>12.0f}{per_session:>16.1f}{elapsed:>11.2f}")
+
+if __name__ == "__main__":
+    main()
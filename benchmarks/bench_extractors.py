@@ -0,0 +1,103 @@
+"""
+Сравнение скорости разбора сохраненных страниц: BeautifulSoup (parse_*) и однопроходное
+извлечение на lxml (extract_*). Перед замером проверяется, что результаты совпадают.
+
+Запуск из корня проекта:
+    python benchmarks/bench_extractors.py [--repeat 200]
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(ROOT, "benchmarks", "fixtures")
+
+os.chdir(ROOT)
+sys.path.insert(0, ROOT)
+
+from bs4 import BeautifulSoup
+
+from src.parser.data_collectors import (
+    parse_xg_statistics,
+    parse_preview,
+    parse_match_score_prediction,
+    parse_fixture_links
+)
+from src.parser.fast_extractors import (
+    extract_xg_statistics,
+    extract_preview,
+    extract_match_score_prediction,
+    extract_fixture_links,
+    extract_match_pages
+)
+from src.utils.logger_setup import logger
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES, name), "r", encoding="utf-8") as file:
+        return file.read()
+
+def parse_match_pages(xg_html, preview_html):
+    """
+    Данные матча из HTML обеих вкладок через BeautifulSoup — эталон для extract_match_pages.
+    """
+    preview_soup = BeautifulSoup(preview_html, "lxml")
+    return {
+        "preview": parse_preview(preview_soup),
+        "match_score_prediction": parse_match_score_prediction(preview_soup),
+        "xg_statistics": parse_xg_statistics(BeautifulSoup(xg_html, "lxml")),
+    }
+
+def measure(func, repeat):
+    """
+    :return: Среднее время одного вызова в миллисекундах.
+    """
+    func()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк извлечения данных со страниц матчей.")
+    parser.add_argument("--repeat", type=int, default=200, help="Количество повторов каждого замера.")
+    args = parser.parse_args()
+
+    # Логирование отключается, чтобы замерять только разбор.
+    logger.remove()
+
+    xg_html = read_fixture("match_xg_statistics.html")
+    preview_html = read_fixture("match_preview.html")
+    fixtures_html = read_fixture("gameweek_fixtures.html")
+
+    cases = [
+        ("xg-statistics",
+         lambda: parse_xg_statistics(BeautifulSoup(xg_html, "lxml")),
+         lambda: extract_xg_statistics(xg_html)),
+        ("preview",
+         lambda: parse_preview(BeautifulSoup(preview_html, "lxml")),
+         lambda: extract_preview(preview_html)),
+        ("score prediction",
+         lambda: parse_match_score_prediction(BeautifulSoup(preview_html, "lxml")),
+         lambda: extract_match_score_prediction(preview_html)),
+        ("fixture links",
+         lambda: parse_fixture_links(BeautifulSoup(fixtures_html, "lxml")),
+         lambda: extract_fixture_links(fixtures_html)),
+        ("match (both tabs)",
+         lambda: parse_match_pages(xg_html, preview_html),
+         lambda: extract_match_pages(xg_html, preview_html)),
+    ]
+
+    for name, legacy, fast in cases:
+        if legacy() != fast():
+            print(f"Результаты различаются для {name}:\n  bs4:  {legacy()}\n  lxml: {fast()}")
+            sys.exit(1)
+
+    print(f"{'страница':<20}{'bs4, мс':>12}{'lxml, мс':>12}{'ускорение':>12}")
+    for name, legacy, fast in cases:
+        legacy_ms = measure(legacy, args.repeat)
+        fast_ms = measure(fast, args.repeat)
+        print(f"{name:<20}{legacy_ms:>12.3f}{fast_ms:>12.3f}{legacy_ms / fast_ms:>11.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Сквозная скорость сбора без сайта: список матчей недели и вкладки матчей загружаются по HTTP
+с локального сервера записанных страниц (benchmarks/replay_server.py), разбираются и записываются
+в выбранные форматы так же, как при обычном запуске с "fetch": {"engine": "http"}.
+С --pipeline матчи обрабатываются конвейером MatchPipeline (загрузка, разбор в пуле процессов и запись одновременно).
+
+Запуск из корня проекта:
+    python benchmarks/bench_replay.py [--leagues 10] [--gameweeks 38] [--concurrency 8]
+                                      [--latency-ms 20] [--formats csv sqlite]
+                                      [--pipeline] [--parse-processes 2]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+os.chdir(ROOT)
+sys.path.insert(0, ROOT)
+
+from benchmarks.replay_server import ReplayServer
+from src.parser.fast_extractors import BASE_URL, extract_fixture_links
+from src.parser.http_fetcher import HttpFetcher
+from src.parser.match_pipeline import MatchPipeline
+from src.parser.pacing import PolitenessLimiter
+from src.parser.scrape_context import ScrapeContext
+from src.utils.logger_setup import logger
+from src.utils.match_record import MatchRecord
+from src.utils.output_writers import create_sink
+from src.utils.stage_metrics import metrics
+
+def collect_gameweek(fetcher, executor, league_name, gameweek):
+    """
+    Загружает список матчей недели и все ее матчи.
+    :return: Список записей MatchRecord.
+    """
+    links = extract_fixture_links(fetcher.fetch(f"{BASE_URL}/stats/{league_name}/{gameweek}"))
+    statistics = executor.map(fetcher.collect_match, links)
+    return [
+        MatchRecord.from_match(statistic, league_name, gameweek)
+        for statistic in statistics if statistic is not None
+    ]
+
+def collect_in_browser(link, pages):
+    raise RuntimeError("браузер в бенчмарке не используется")
+
+def season(leagues, gameweeks):
+    for league in range(1, leagues + 1):
+        for gameweek in range(1, gameweeks + 1):
+            yield f"Bench League {league:02d}", gameweek
+
+def main():
+    parser = argparse.ArgumentParser(description="Сквозной бенчмарк сбора с локального сервера записанных страниц.")
+    parser.add_argument("--leagues", type=int, default=10, help="Количество лиг.")
+    parser.add_argument("--gameweeks", type=int, default=38, help="Количество игровых недель в лиге.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Одновременных HTTP-запросов.")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Задержка каждого ответа сервера.")
+    parser.add_argument("--formats", nargs="+", default=["csv"], help="Форматы вывода (как output.formats).")
+    parser.add_argument("--pipeline", action="store_true", help="Обрабатывать матчи конвейером MatchPipeline.")
+    parser.add_argument("--parse-processes", type=int, default=2, help="Процессов разбора HTML в конвейере.")
+    args = parser.parse_args()
+
+    # Логирование отключается, чтобы не замерять запись логов; время этапов собирается StageMetrics.
+    logger.remove()
+    metrics.configure(True)
+
+    directory = tempfile.mkdtemp(prefix="bench-replay-")
+    sink = create_sink({"formats": args.formats, "directory": directory, "excel_directory": directory})
+    matches = 0
+    try:
+        with ReplayServer(latency=args.latency_ms / 1000) as server:
+            fetcher = HttpFetcher(
+                pool_size=args.concurrency,
+                retries=0,
+                limiter=PolitenessLimiter(max_in_flight=args.concurrency, min_interval=0),
+                base_url=server.url,
+            )
+            pipeline = MatchPipeline(args.concurrency, args.parse_processes) if args.pipeline else None
+            started = time.perf_counter()
+            if pipeline is not None:
+                context = ScrapeContext(sink=sink, fetcher=fetcher, pipeline=pipeline)
+                for league_name, gameweek in season(args.leagues, args.gameweeks):
+                    links = extract_fixture_links(fetcher.fetch(f"{BASE_URL}/stats/{league_name}/{gameweek}"))
+                    pipeline.run(links, league_name, gameweek, context, collect_in_browser)
+                    matches += len(links)
+                sink.close()
+                pipeline.close()
+            else:
+                with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+                    for league_name, gameweek in season(args.leagues, args.gameweeks):
+                        records = collect_gameweek(fetcher, executor, league_name, gameweek)
+                        sink.write(records, league_name)
+                        matches += len(records)
+                    sink.close()
+            elapsed = time.perf_counter() - started
+            fetcher.close()
+            requests = server.requests
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    print(
+        f"Матчей: {matches}, запросов: {requests}, время: {elapsed:.2f} с, "
+        f"{matches / elapsed:.1f} матч/с (задержка ответа {args.latency_ms:.0f} мс, "
+        f"одновременно {args.concurrency}, форматы: {', '.join(args.formats)}).\n"
+    )
+    print(f"{'этап':<28}{'кол-во':>8}{'всего, с':>11}{'p50, мс':>10}{'p95, мс':>10}")
+    for name, stats in metrics.summary().items():
+        print(f"{name:<28}{stats['count']:>8}{stats['total']:>11.2f}{stats['p50'] * 1000:>10.1f}{stats['p95'] * 1000:>10.1f}")
+
+    if pipeline is not None:
+        print(f"\n{'стадия':<28}{'матчей':>8}{'работа':>11}{'ждет вход':>11}{'ждет выход':>12}")
+        for stage in pipeline.occupancy():
+            print(
+                f"{stage.name:<28}{stage.items:>8}{stage.share(stage.busy):>11.0%}"
+                f"{stage.share(stage.starved):>11.0%}{stage.share(stage.blocked):>12.0%}"
+            )
+
+if __name__ == "__main__":
+    main()
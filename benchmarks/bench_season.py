@@ -0,0 +1,139 @@
+"""
+Пропускная способность разбора страниц и записи данных в масштабе сезона: по умолчанию 10 лиг
+по 38 игровых недель (3800 матчей) на основе записанных страниц из benchmarks/fixtures.
+
+Замеряются:
+    - извлечение ссылок на матчи из списка недели (BeautifulSoup и lxml);
+    - разбор вкладок xg-statistics и preview (parse_* на BeautifulSoup и extract_* на lxml);
+    - запись матчей: save_data_to_excel по одному матчу (как до ExcelSink), ExcelSink и остальные форматы вывода.
+
+Запуск из корня проекта:
+    python benchmarks/bench_season.py [--leagues 10] [--gameweeks 38] [--legacy-excel 380]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+os.chdir(ROOT)
+sys.path.insert(0, ROOT)
+
+from bs4 import BeautifulSoup
+
+from benchmarks.replay_server import ReplayServer
+from src.parser.data_collectors import parse_xg_statistics, parse_preview, parse_fixture_links
+from src.parser.fast_extractors import BASE_URL, extract_xg_statistics, extract_preview, extract_fixture_links
+from src.utils.excel_saver import ExcelSink, save_data_to_excel
+from src.utils.logger_setup import logger
+from src.utils.match_record import MatchRecord
+from src.utils.output_writers import CsvSink, JsonlSink, SQLiteSink, ParquetSink
+
+def league_name(number):
+    return f"Bench League {number:02d}"
+
+def build_pages(server, leagues, gameweeks):
+    """
+    Готовит страницы сезона: списки матчей недель и вкладки матчей с уникальными ссылками и командами.
+    :return: Кортеж (страницы списков недель, [(лига, неделя, HTML xg-statistics, HTML preview)]).
+    """
+    fixture_pages = []
+    match_pages = []
+    for league in range(1, leagues + 1):
+        for gameweek in range(1, gameweeks + 1):
+            html = server.render(f"/stats/{league_name(league)}/{gameweek}")
+            fixture_pages.append(html)
+            for link in extract_fixture_links(html):
+                path = link[len(BASE_URL):]
+                match_pages.append((
+                    league_name(league), gameweek,
+                    server.render(path),
+                    server.render(path.replace("/xg-statistics", "/preview")),
+                ))
+    return fixture_pages, match_pages
+
+def timed(func):
+    """
+    :return: Время выполнения функции в секундах.
+    """
+    started = time.perf_counter()
+    func()
+    return time.perf_counter() - started
+
+def print_row(name, count, seconds, unit):
+    print(f"{name:<38}{count:>8}{seconds:>10.2f}{count / seconds:>12.0f} {unit}/с{seconds / count * 1000:>10.3f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк разбора и записи данных в масштабе сезона.")
+    parser.add_argument("--leagues", type=int, default=10, help="Количество лиг.")
+    parser.add_argument("--gameweeks", type=int, default=38, help="Количество игровых недель в лиге.")
+    parser.add_argument("--legacy-excel", type=int, default=380,
+                        help="Сколько матчей записать через save_data_to_excel по одному (0 — пропустить).")
+    args = parser.parse_args()
+
+    # Логирование отключается, чтобы замерять только разбор и запись.
+    logger.remove()
+
+    server = ReplayServer()
+    fixture_pages, match_pages = build_pages(server, args.leagues, args.gameweeks)
+    print(f"Сезон: {args.leagues} лиг x {args.gameweeks} недель, матчей: {len(match_pages)}.\n")
+    print(f"{'этап':<38}{'кол-во':>8}{'всего, с':>10}{'скорость':>15}{'мс/шт':>10}")
+
+    print_row("ссылки недели: bs4", len(fixture_pages), timed(
+        lambda: [parse_fixture_links(BeautifulSoup(html, "lxml")) for html in fixture_pages]), "стр")
+    print_row("ссылки недели: lxml", len(fixture_pages), timed(
+        lambda: [extract_fixture_links(html) for html in fixture_pages]), "стр")
+    print_row("xg-statistics: bs4", len(match_pages), timed(
+        lambda: [parse_xg_statistics(BeautifulSoup(xg, "lxml")) for _, _, xg, _ in match_pages]), "стр")
+    print_row("xg-statistics: lxml", len(match_pages), timed(
+        lambda: [extract_xg_statistics(xg) for _, _, xg, _ in match_pages]), "стр")
+    print_row("preview: bs4", len(match_pages), timed(
+        lambda: [parse_preview(BeautifulSoup(preview, "lxml")) for _, _, _, preview in match_pages]), "стр")
+    print_row("preview: lxml", len(match_pages), timed(
+        lambda: [extract_preview(preview) for _, _, _, preview in match_pages]), "стр")
+
+    records = [
+        MatchRecord.from_match({
+            "xg_statistics": extract_xg_statistics(xg),
+            "preview": extract_preview(preview),
+            "match_score_prediction": {},
+        }, league, gameweek)
+        for league, gameweek, xg, preview in match_pages
+    ]
+
+    directory = tempfile.mkdtemp(prefix="bench-season-")
+    try:
+        if args.legacy_excel:
+            legacy = records[:args.legacy_excel]
+            legacy_dir = os.path.join(directory, "legacy")
+            print_row("save_data_to_excel по одному", len(legacy), timed(
+                lambda: [save_data_to_excel(record, record.league, legacy_dir) for record in legacy]), "матч")
+
+        sinks = [
+            ("ExcelSink (пачки по 20)", lambda: ExcelSink(20, os.path.join(directory, "excel"))),
+            ("CsvSink", lambda: CsvSink(os.path.join(directory, "csv"))),
+            ("JsonlSink", lambda: JsonlSink(os.path.join(directory, "jsonl"))),
+            ("SQLiteSink", lambda: SQLiteSink(os.path.join(directory, "matches.sqlite3"))),
+            ("ParquetSink", lambda: ParquetSink(os.path.join(directory, "parquet"))),
+        ]
+        for name, create in sinks:
+            try:
+                sink = create()
+            except RuntimeError as e:
+                print(f"{name:<38}пропущено: {e}")
+                continue
+
+            def write_all():
+                for record in records:
+                    sink.write(record, record.league)
+                sink.close()
+
+            print_row(name, len(records), timed(write_all), "матч")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Локальный HTTP-сервер, который вместо сайта отдает записанные страницы из benchmarks/fixtures.
+Используется для замера сквозной скорости сбора без обращения к xgscore.io.
+
+Адреса:
+    /stats/<лига>/<неделя>        список матчей недели (ссылки на матчи уникальны для лиги и недели)
+    /match/<матч>/xg-statistics   вкладка xg-statistics
+    /match/<матч>/preview         вкладка preview (названия команд уникальны для матча)
+
+Запуск из корня проекта:
+    python benchmarks/replay_server.py [--port 8765] [--latency-ms 0]
+
+Парсер можно направить на сервер настройкой "fetch": {"engine": "http", "base_url": "http://127.0.0.1:8765"}.
+"""
+import argparse
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+RECORDED_MATCH = "real-betis-leganes-2024-09-18"
+RECORDED_TEAMS = ("Real Betis", "Leganes")
+
+_STATS_PATH = re.compile(r"^/stats/([^/]+)/(\d+)/?$")
+_MATCH_PATH = re.compile(r"^/match/([^/]+)/(xg-statistics|preview)/?$")
+_FIXTURE_LINK = re.compile(r'href="/match/([^/"]+)/xg-statistics"')
+
+class ReplayServer:
+    """
+    Сервер записанных страниц в отдельном потоке. Можно использовать как контекстный менеджер.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, fixtures=FIXTURES):
+        """
+        :param host: Адрес сервера.
+        :param port: Порт; 0 — любой свободный.
+        :param latency: Искусственная задержка каждого ответа в секундах (имитация сети).
+        :param fixtures: Директория с записанными страницами.
+        """
+        self.latency = latency
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._pages = {
+            name: _read(os.path.join(fixtures, f"{name}.html"))
+            for name in ("gameweek_fixtures", "match_xg_statistics", "match_preview")
+        }
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="replay-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+        return False
+
+    def render(self, path):
+        """
+        :param path: Путь запроса.
+        :return: HTML страницы или None, если адрес неизвестен.
+        """
+        path = unquote(path.split("?", 1)[0])
+        match = _STATS_PATH.match(path)
+        if match:
+            suffix = f"{_slug(match.group(1))}-gw{match.group(2)}"
+            return _FIXTURE_LINK.sub(
+                lambda link: f'href="/match/{link.group(1)}--{suffix}/xg-statistics"', self._pages["gameweek_fixtures"]
+            )
+
+        match = _MATCH_PATH.match(path)
+        if not match:
+            return None
+        slug, tab = match.groups()
+        html = self._pages["match_xg_statistics" if tab == "xg-statistics" else "match_preview"]
+        html = html.replace(RECORDED_MATCH, slug)
+        if tab == "preview":
+            home, away = RECORDED_TEAMS
+            html = html.replace(home, f"{slug} (H)").replace(away, f"{slug} (A)")
+        return html
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                with server._lock:
+                    server.requests += 1
+                if server.latency:
+                    time.sleep(server.latency)
+
+                html = server.render(self.path)
+                body = (html if html is not None else "Not found").encode("utf-8")
+                self.send_response(200 if html is not None else 404)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+def _read(path):
+    with open(path, "r", encoding="utf-8") as file:
+        return file.read()
+
+def _slug(text):
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+
+def main():
+    parser = argparse.ArgumentParser(description="Локальный сервер записанных страниц xgscore.io.")
+    parser.add_argument("--port", type=int, default=8765, help="Порт сервера.")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Задержка каждого ответа в миллисекундах.")
+    args = parser.parse_args()
+
+    with ReplayServer(port=args.port, latency=args.latency_ms / 1000) as server:
+        print(f"Сервер записанных страниц: {server.url}  (Ctrl+C — остановить)")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+if __name__ == "__main__":
+    main()
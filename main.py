@@ -1,23 +1,162 @@
+import argparse
+
 from src.parser.browser_manager import parse_data
-from src.utils.config_loader import load_config_from_file
+from src.parser.distributed import DEFAULT_POLL_INTERVAL, run_coordinator, run_queue_workers, worker_name
+from src.parser.offline import offline_output_settings, run_offline
+from src.parser.scrape_context import ScrapeContext
+from src.parser.worker_pool import run_worker_pool
+from src.utils.config_loader import load_config_from_file, load_settings
+from src.utils.excel_saver import DEFAULT_BATCH_SIZE
+from src.utils.job_queue import create_job_queue
+from src.utils.output_writers import QueueSink, create_sink
+
+from src.utils.logger_setup import logger, configure_logger
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Парсер футбольной статистики и прогнозов xGScore.io.")
+    parser.add_argument(
+        "--offline", action="store_true",
+        help="Повторно разобрать страницы матчей из кэша без обращения к сайту и без браузера."
+    )
+    parser.add_argument(
+        "--analytics", action="store_true",
+        help="Вывести аналитику по собранным матчам: точность прогнозов, реализацию xG и калибровку коэффициентов."
+    )
+    parser.add_argument(
+        "--resume", action="store_true",
+        help="Продолжить последний незавершенный запуск по журналу заданий с первой необработанной недели и матча."
+    )
+    parser.add_argument(
+        "--metrics", action="store_true",
+        help="Замерить время этапов работы (p50/p95/сумма) и сохранить сводку в JSON."
+    )
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--coordinator", action="store_true",
+        help="Поставить задания конфигурации в общую очередь и собрать результаты воркеров в один вывод."
+    )
+    mode.add_argument(
+        "--worker", action="store_true",
+        help="Обрабатывать задания из общей очереди и передавать результаты координатору."
+    )
+    parser.add_argument(
+        "--reset-queue", action="store_true",
+        help="Для --coordinator: удалить задания предыдущего запуска (несобранные результаты воркеров сохраняются)."
+    )
+    return parser.parse_args()
+
+def run_analytics(settings):
+    """
+    Загружает собранные матчи и выводит отчет.
+    :param settings: Настройки парсера (используется секция "output").
+    """
+    # pandas и numpy нужны только для отчета, поэтому импортируются здесь, а не при каждом запуске.
+    from src.analytics.match_analytics import build_report, format_report, load_matches
 
-from src.utils.logger_setup import logger
+    output = settings.get("output", {})
+    directory = output.get("directory", "data")
+    frame = load_matches(
+        directory,
+        sqlite_path=output.get("sqlite_path"),
+        parquet_directory=output.get("parquet_directory"),
+    )
+    if frame.empty:
+        logger.warning(f"Нет собранных матчей в {directory}.")
+        return
+    print(format_report(build_report(frame)))
+
+def run_coordinator_mode(config, settings, reset=False):
+    """
+    Режим координатора: задания конфигурации ставятся в общую очередь, результаты воркеров записываются
+    в приемники из секции "output". Браузер не запускается.
+    :param config: Список словарей с конфигурацией.
+    :param settings: Настройки парсера.
+    :param reset: Удалить задания предыдущего запуска перед добавлением новых.
+    """
+    queue_settings = settings.get("queue", {})
+    job_queue = create_job_queue(queue_settings)
+    sink = create_sink(settings.get("output", {}), settings.get("excel", {}).get("batch_size", DEFAULT_BATCH_SIZE))
+    try:
+        run_coordinator(config, job_queue, sink, reset, queue_settings.get("poll_interval", DEFAULT_POLL_INTERVAL))
+    finally:
+        sink.close()
+        job_queue.close()
+
+def run_worker_mode(settings):
+    """
+    Режим воркера: задания берутся из общей очереди, собранные матчи передаются координатору.
+    :param settings: Настройки парсера.
+    """
+    queue_settings = settings.get("queue", {})
+    job_queue = create_job_queue(queue_settings)
+    name = worker_name()
+    sink = QueueSink(job_queue, name, settings.get("excel", {}).get("batch_size", DEFAULT_BATCH_SIZE))
+    context = ScrapeContext.from_settings(settings, sink=sink)
+    try:
+        run_queue_workers(
+            job_queue, context, settings.get("pool", {}).get("workers", 1), name,
+            queue_settings.get("poll_interval", DEFAULT_POLL_INTERVAL)
+        )
+        context.finish_run()
+    finally:
+        context.close()
+        job_queue.close()
 
 def main():
+    args = parse_args()
+    configure_logger()
     try:
         config = load_config_from_file()
+        settings = load_settings()
+        if args.analytics:
+            run_analytics(settings)
+            return
+
+        if args.offline:
+            settings.setdefault("cache", {})["enabled"] = True
+            settings.setdefault("journal", {})["enabled"] = False
+            settings["output"] = offline_output_settings(settings.get("output", {}))
+            logger.info(f"Офлайн-разбор записывается в {settings['output']['directory']}.")
+        elif args.resume:
+            settings.setdefault("journal", {}).update(enabled=True, resume=True)
+        if args.metrics:
+            settings.setdefault("metrics", {})["enabled"] = True
+
+        if args.worker:
+            run_worker_mode(settings)
+            return
 
         if not config:
             logger.error("Конфигурация пуста или невалидна.")
             raise ValueError("Конфигурация пуста или некорректна.")
 
-        for item in config:
-            try:
-                parse_data(item["league"], item["gameweek"])
-                logger.info(f"Завершена обработка для лиги '{item['league']}'")
-                
-            except Exception as e:
-                logger.error(f"Ошибка в процессе для лиги '{item['league']}': {e}", exc_info=True)
+        if args.coordinator:
+            run_coordinator_mode(config, settings, args.reset_queue)
+            return
+
+        workers = settings.get("pool", {}).get("workers", 1)
+        context = ScrapeContext.from_settings(settings)
+
+        try:
+            if args.offline:
+                run_offline(config, context)
+                return
+
+            if workers > 1:
+                run_worker_pool(config, workers, context)
+                context.finish_run()
+                return
+
+            for item in config:
+                try:
+                    parse_data(item["league"], item["gameweek"], context)
+                    logger.info(f"Завершена обработка для лиги '{item['league']}'")
+
+                except Exception as e:
+                    logger.error(f"Ошибка в процессе для лиги '{item['league']}': {e}", exc_info=True)
+            context.finish_run()
+        finally:
+            context.close()
 
     except Exception as e:
         logger.error(f"Ошибка в работе приложения: {e}", exc_info=True)
@@ -0,0 +1,315 @@
+import glob
+import os
+import sqlite3
+
+from src.utils.excel_saver import HEADERS, EXCEL_COLUMNS
+from src.utils.match_record import COLUMNS, COLUMN_NAMES, MARK_FIELDS, PERCENT_FIELDS
+
+try:
+    import numpy as np
+    import pandas as pd
+except ImportError:
+    np = None
+    pd = None
+
+SOURCE_AUTO = "auto"
+SOURCE_SQLITE = "sqlite"
+SOURCE_PARQUET = "parquet"
+SOURCE_JSONL = "jsonl"
+SOURCE_CSV = "csv"
+SOURCE_EXCEL = "excel"
+
+SOURCES = (SOURCE_SQLITE, SOURCE_PARQUET, SOURCE_JSONL, SOURCE_CSV, SOURCE_EXCEL)
+"""Источники данных в порядке предпочтения при source="auto": первый найденный используется целиком."""
+
+OUTCOME_HOME = 1
+OUTCOME_DRAW = 0
+OUTCOME_AWAY = -1
+
+_WINNER_OUTCOMES = {"home win": OUTCOME_HOME, "draw": OUTCOME_DRAW, "away win": OUTCOME_AWAY}
+
+_MARK_PATTERN = r"^\s*(.*?)\s*\(([^()]*)\)\s*$"
+_TOTAL_PATTERN = r"(?i)\b(over|under)\s+(\d+(?:[.,]\d+)?)"
+_BTTS_PATTERN = r"(?i)\b(yes|no)\s*$"
+_SCORE_PATTERN = r"(\d+)\s*[-:]\s*(\d+)"
+
+def _require_pandas():
+    if pd is None:
+        raise RuntimeError("Для аналитики необходимы пакеты numpy и pandas.")
+
+def load_matches(directory="data", source=SOURCE_AUTO, sqlite_path=None, parquet_directory=None):
+    """
+    Загружает собранные матчи в один DataFrame со столбцами COLUMN_NAMES.
+    :param directory: Директория с файлами лиг (Excel, CSV, JSON Lines).
+    :param source: Источник данных: "auto" или один из SOURCES.
+    :param sqlite_path: Путь к базе SQLite (по умолчанию <directory>/matches.sqlite3).
+    :param parquet_directory: Директория наборов Parquet (по умолчанию <directory>/parquet).
+    :return: DataFrame; пустой, если данных нет.
+    """
+    _require_pandas()
+    sqlite_path = sqlite_path or os.path.join(directory, "matches.sqlite3")
+    parquet_directory = parquet_directory or os.path.join(directory, "parquet")
+
+    loaders = {
+        SOURCE_SQLITE: lambda: _load_sqlite(sqlite_path),
+        SOURCE_PARQUET: lambda: _load_parquet(parquet_directory),
+        SOURCE_JSONL: lambda: _load_files(directory, "jsonl", lambda path: pd.read_json(path, lines=True)),
+        SOURCE_CSV: lambda: _load_files(directory, "csv", pd.read_csv),
+        SOURCE_EXCEL: lambda: _load_excel(directory),
+    }
+    if source != SOURCE_AUTO:
+        return _normalize(loaders[source]())
+
+    for name in SOURCES:
+        frame = loaders[name]()
+        if frame is not None and not frame.empty:
+            return _normalize(frame)
+    return _normalize(None)
+
+def prepare(frame):
+    """
+    Добавляет к данным матчей производные столбцы, вычисляемые по всей таблице сразу:
+    исходы (фактический, по метке winner, по прогнозу счета), тотал и обе забьют по меткам
+    и по результату, подразумеваемые вероятности 1 / коэффициент.
+    :param frame: DataFrame из load_matches.
+    :return: Новый DataFrame с дополнительными столбцами.
+    """
+    _require_pandas()
+    df = frame.copy()
+    goals_home = df["goals_home"].astype("float64")
+    goals_away = df["goals_away"].astype("float64")
+
+    df["finished"] = goals_home.notna() & goals_away.notna()
+    df["total_goals"] = goals_home + goals_away
+    df["outcome"] = np.sign(goals_home - goals_away)
+    df["winner_outcome"] = df["winner"].str.strip().str.lower().map(_WINNER_OUTCOMES)
+    df["predicted_outcome"] = np.sign(
+        df["predicted_goals_home"].round() - df["predicted_goals_away"].round()
+    )
+
+    total = df["total"].str.extract(_TOTAL_PATTERN)
+    df["total_over"] = total[0].str.lower().map({"over": True, "under": False})
+    df["total_line"] = pd.to_numeric(total[1].str.replace(",", ".", regex=False), errors="coerce")
+    df["total_hit"] = np.where(
+        df["total_over"] == True, df["total_goals"] > df["total_line"], df["total_goals"] < df["total_line"]  # noqa: E712
+    )
+    df["total_probability"] = 1.0 / df["total_mark"]
+
+    df["btts_yes"] = df["both_to_score"].str.extract(_BTTS_PATTERN)[0].str.lower().map({"yes": True, "no": False})
+    both_scored = (goals_home > 0) & (goals_away > 0)
+    df["btts_hit"] = np.where(df["btts_yes"] == True, both_scored, ~both_scored)  # noqa: E712
+    df["btts_probability"] = 1.0 / df["both_to_score_mark"]
+
+    score = df["correct_score"].str.extract(_SCORE_PATTERN).astype("float64")
+    df["correct_score_hit"] = (score[0] == goals_home) & (score[1] == goals_away)
+    df["correct_score_probability"] = 1.0 / df["correct_score_mark"]
+    return df
+
+def prediction_accuracy(df, by=("league",)):
+    """
+    Точность прогнозов по группам сыгранных матчей.
+    :param df: DataFrame из prepare.
+    :param by: Столбцы группировки, например ("league",) или ("league", "gameweek").
+    :return: DataFrame: matches, winner_accuracy (метка исхода), score_outcome_accuracy (исход по прогнозу счета),
+             correct_score_accuracy (точный счет), goals_mae (средняя абсолютная ошибка прогноза голов).
+    """
+    played = df[df["finished"]]
+    goals_error = (
+        (played["predicted_goals_home"] - played["goals_home"]).abs()
+        + (played["predicted_goals_away"] - played["goals_away"]).abs()
+    ) / 2
+    metrics = pd.DataFrame({
+        **{column: played[column] for column in by},
+        "winner_hit": _hit_or_nan(played["winner_outcome"] == played["outcome"], played["winner_outcome"]),
+        "score_outcome_hit": _hit_or_nan(played["predicted_outcome"] == played["outcome"],
+                                         played["predicted_outcome"]),
+        "correct_score_hit": _hit_or_nan(played["correct_score_hit"], played["correct_score_mark"]),
+        "goals_error": goals_error,
+    })
+    return metrics.groupby(list(by), dropna=False).agg(
+        matches=("goals_error", "size"),
+        winner_accuracy=("winner_hit", "mean"),
+        score_outcome_accuracy=("score_outcome_hit", "mean"),
+        correct_score_accuracy=("correct_score_hit", "mean"),
+        goals_mae=("goals_error", "mean"),
+    ).round(3)
+
+def xg_performance(df):
+    """
+    Реализация xG по командам: сколько команда забила и пропустила относительно ожидаемых голов.
+    :param df: DataFrame из prepare.
+    :return: DataFrame по (league, team), отсортированный по goals_minus_xg:
+             matches, goals, xg, goals_minus_xg, per_match, conceded_minus_xga.
+    """
+    played = df[df["finished"] & df["xg_home"].notna() & df["xg_away"].notna()]
+    sides = [
+        ("home_team", "goals_home", "xg_home", "goals_away", "xg_away"),
+        ("away_team", "goals_away", "xg_away", "goals_home", "xg_home"),
+    ]
+    long = pd.concat([
+        pd.DataFrame({
+            "league": played["league"],
+            "team": played[team],
+            "goals": played[goals],
+            "xg": played[xg],
+            "conceded": played[conceded],
+            "xga": played[xga],
+        })
+        for team, goals, xg, conceded, xga in sides
+    ], ignore_index=True)
+
+    teams = long.groupby(["league", "team"]).agg(
+        matches=("goals", "size"),
+        goals=("goals", "sum"),
+        xg=("xg", "sum"),
+        conceded=("conceded", "sum"),
+        xga=("xga", "sum"),
+    )
+    teams["goals_minus_xg"] = teams["goals"] - teams["xg"]
+    teams["per_match"] = teams["goals_minus_xg"] / teams["matches"]
+    teams["conceded_minus_xga"] = teams["conceded"] - teams["xga"]
+    return teams.sort_values("goals_minus_xg", ascending=False).round(2)
+
+def calibration(df, market="total", bins=5):
+    """
+    Калибровка рынка по коэффициентам: матчи разбиваются на интервалы подразумеваемой вероятности (1 / коэффициент),
+    и в каждом интервале средняя вероятность сравнивается с долей сыгравших прогнозов.
+    :param df: DataFrame из prepare.
+    :param market: "total" (больше/меньше) или "btts" (обе забьют).
+    :param bins: Количество интервалов вероятности на отрезке [0, 1].
+    :return: Кортеж (DataFrame по интервалам: matches, predicted, observed; Brier score или None).
+    """
+    probability_column, hit_column = {
+        "total": ("total_probability", "total_hit"),
+        "btts": ("btts_probability", "btts_hit"),
+    }[market]
+    side_column = "total_over" if market == "total" else "btts_yes"
+
+    played = df[df["finished"] & df[probability_column].notna() & df[side_column].notna()]
+    probability = played[probability_column].clip(0, 1)
+    hit = played[hit_column].astype("float64")
+    if played.empty:
+        return pd.DataFrame(columns=["matches", "predicted", "observed"]), None
+
+    edges = np.linspace(0, 1, bins + 1)
+    table = pd.DataFrame({"bin": pd.cut(probability, edges, include_lowest=True), "p": probability, "hit": hit})
+    grouped = table.groupby("bin", observed=True).agg(
+        matches=("hit", "size"),
+        predicted=("p", "mean"),
+        observed=("hit", "mean"),
+    ).round(3)
+    brier = float(np.mean((probability.to_numpy() - hit.to_numpy()) ** 2))
+    return grouped, round(brier, 4)
+
+def build_report(frame):
+    """
+    Считает все метрики по загруженным матчам.
+    :param frame: DataFrame из load_matches.
+    :return: Словарь с DataFrame и числами; ключи: matches, finished, by_league, by_gameweek,
+             xg_teams, total_calibration, total_brier, btts_calibration, btts_brier.
+    """
+    df = prepare(frame)
+    total_table, total_brier = calibration(df, "total")
+    btts_table, btts_brier = calibration(df, "btts")
+    return {
+        "matches": len(df),
+        "finished": int(df["finished"].sum()),
+        "by_league": prediction_accuracy(df, ("league",)),
+        "by_gameweek": prediction_accuracy(df[df["gameweek"].notna()], ("league", "gameweek")),
+        "xg_teams": xg_performance(df),
+        "total_calibration": total_table,
+        "total_brier": total_brier,
+        "btts_calibration": btts_table,
+        "btts_brier": btts_brier,
+    }
+
+def format_report(report, top=10):
+    """
+    :param report: Словарь из build_report.
+    :param top: Сколько команд показать сверху и снизу таблицы реализации xG.
+    :return: Текст отчета.
+    """
+    teams = report["xg_teams"]
+    sections = [
+        f"Матчей: {report['matches']}, сыграно: {report['finished']}.",
+        "Точность прогнозов по лигам:\n" + _table(report["by_league"]),
+    ]
+    if not report["by_gameweek"].empty:
+        sections.append("Точность прогнозов по игровым неделям:\n" + _table(report["by_gameweek"]))
+    sections.append(f"Реализация xG — лучшие {top}:\n" + _table(teams.head(top)))
+    sections.append(f"Реализация xG — худшие {top}:\n" + _table(teams.tail(top).iloc[::-1]))
+    sections.append(f"Калибровка тотала (Brier: {report['total_brier']}):\n" + _table(report["total_calibration"]))
+    sections.append(f"Калибровка «обе забьют» (Brier: {report['btts_brier']}):\n" + _table(report["btts_calibration"]))
+    return "\n\n".join(sections)
+
+def _table(frame):
+    return frame.to_string() if not frame.empty else "(нет данных)"
+
+def _hit_or_nan(hit, known):
+    """
+    :return: Попадание как 1.0/0.0 и NaN там, где прогноз не собран (чтобы не учитывать его в среднем).
+    """
+    return hit.astype("float64").where(known.notna())
+
+def _normalize(frame):
+    """
+    Приводит таблицу к столбцам COLUMN_NAMES и их типам (int — как Int64 с пропусками).
+    """
+    if frame is None:
+        frame = pd.DataFrame(columns=COLUMN_NAMES)
+    frame = frame.reindex(columns=COLUMN_NAMES)
+    for name, kind in COLUMNS:
+        if kind is str:
+            frame[name] = frame[name].astype("string")
+        elif kind is float:
+            frame[name] = pd.to_numeric(frame[name], errors="coerce").astype("float64")
+        else:
+            frame[name] = pd.to_numeric(frame[name], errors="coerce").round().astype("Int64")
+    frame = frame[frame["home_team"].notna() & frame["away_team"].notna()]
+    return frame.reset_index(drop=True)
+
+def _load_sqlite(path):
+    if not os.path.exists(path):
+        return None
+    with sqlite3.connect(path) as db:
+        return pd.read_sql_query("SELECT * FROM matches", db)
+
+def _load_parquet(directory):
+    if not os.path.isdir(directory) or not glob.glob(os.path.join(directory, "*", "*.parquet")):
+        return None
+    return pd.read_parquet(directory)
+
+def _load_files(directory, extension, reader):
+    paths = sorted(glob.glob(os.path.join(directory, f"*.{extension}")))
+    if not paths:
+        return None
+    return pd.concat([reader(path) for path in paths], ignore_index=True)
+
+def _load_excel(directory):
+    """
+    Загружает файлы Excel лиг (название лиги — имя файла). Значения "метка (оценка)" разделяются на два столбца,
+    проценты — в числа; это работает и для файлов, записанных до перехода на числовые ячейки.
+    """
+    frames = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.xlsx"))):
+        if os.path.basename(path).startswith("~$"):
+            continue
+        sheet = pd.read_excel(path, dtype=object).reindex(columns=HEADERS)
+        sheet.columns = EXCEL_COLUMNS
+        sheet.insert(0, "league", os.path.splitext(os.path.basename(path))[0])
+        frames.append(sheet)
+    if not frames:
+        return None
+
+    frame = pd.concat(frames, ignore_index=True)
+    for column, _ in MARK_FIELDS:
+        parts = frame[column].astype("string").str.extract(_MARK_PATTERN)
+        has_mark = parts[0].notna()
+        frame[f"{column}_mark"] = pd.to_numeric(parts[1].str.replace(",", ".", regex=False), errors="coerce")
+        frame[column] = parts[0].where(has_mark, frame[column].astype("string").str.strip())
+    for column in PERCENT_FIELDS:
+        frame[column] = pd.to_numeric(
+            frame[column].astype("string").str.strip().str.rstrip("%").str.replace(",", ".", regex=False),
+            errors="coerce",
+        )
+    return frame
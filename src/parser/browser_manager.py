@@ -1,76 +1,243 @@
+import os
 import time
-import random
-
-from bs4 import BeautifulSoup
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
 
+from selenium.common.exceptions import (
+    NoSuchWindowException, SessionNotCreatedException, TimeoutException, WebDriverException
+)
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
 from src.parser.user_agent import get_random_user_agent
-from src.parser.data_collectors import (
-    parse_xg_statistics,
-    parse_preview,
-    collect_match_score_prediction
-)
+from src.parser.data_collectors import collect_match_score_prediction
+from src.parser.driver_session import DriverSession, retry_delay
+from src.parser.fast_extractors import extract_xg_statistics, extract_preview, extract_fixture_links
+from src.parser.script_extractors import script_xg_statistics, script_preview, script_fixture_links
 
-from src.utils.excel_saver import save_data_to_excel
-from src.utils.logger_setup import logger
+from src.parser.scrape_context import ScrapeContext, EXTRACTION_SCRIPT
+from src.utils.page_cache import TAB_XG_STATISTICS, TAB_PREVIEW
+from src.utils.logger_setup import logger, log_match
+from src.utils.stage_metrics import metrics
 
-def random_delay(min_sec=2, max_sec=5):
-    """Добавляет случайную задержку."""
-    time.sleep(random.uniform(min_sec, max_sec))
+WEEK_VALUE_SELECTOR = "#mat-select-value-5"
+WEEK_DROPDOWN_SELECTOR = f"{WEEK_VALUE_SELECTOR} > span > span"
 
-def init_driver():
+def init_driver(profile=None, launcher=None):
     """
     Инициализирует Selenium WebDriver с настройками для обхода антибот-защиты.
+    :param profile: BrowserProfile. Если задан, применяется облегченный профиль (блокировка запросов,
+        отключение изображений, уменьшенное окно и кэш).
+    :param launcher: DriverLauncher. Если задан, путь к ChromeDriver берется из него (без webdriver_manager
+        при каждом запуске), а браузер стартует с сохраненным профилем. Закрывать такой браузер нужно через quit_driver.
     :return: WebDriver объект.
     """
+    started = time.monotonic()
     options = webdriver.ChromeOptions()
     options.add_argument("--headless")
     options.add_argument('--disable-blink-features=AutomationControlled')
     options.add_experimental_option("excludeSwitches", ["enable-automation"])
     options.add_experimental_option('useAutomationExtension', False)
     options.add_argument(f'user-agent={get_random_user_agent()}')
+    if profile is not None:
+        profile.apply_options(options)
+
+    profile_path = launcher.acquire_profile() if launcher is not None else None
+    warm = bool(profile_path and os.listdir(profile_path))
+    if profile_path:
+        options.add_argument(f"--user-data-dir={profile_path}")
+
+    try:
+        driver = _start_chrome(options, launcher)
+    except Exception:
+        if launcher is not None:
+            launcher.release(path=profile_path)
+        raise
+    if launcher is not None:
+        launcher.register(driver, profile_path)
 
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
     driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {
         "source": "Object.defineProperty(navigator, 'webdriver', {get: () => false});"
     })
     driver.execute_script("delete window.navigator.__proto__.webdriver;")
     
-    driver.maximize_window()
-    logger.info("WebDriver успешно инициализирован.")
+    if profile is not None:
+        profile.apply_window(driver)
+        profile.apply_blocking(driver)
+    else:
+        driver.maximize_window()
+
+    elapsed = time.monotonic() - started
+    metrics.record("driver.startup", elapsed)
+    if launcher is not None:
+        launcher.record_startup(elapsed, warm)
+    logger.info(f"WebDriver успешно инициализирован за {elapsed:.2f} с{' (теплый профиль)' if warm else ''}.")
     
     return driver
 
-def navigate_to_league_and_gameweek(driver, league_name, gameweek):
+def _start_chrome(options, launcher):
+    """
+    Запускает Chrome. Если закрепленный драйвер не подходит к установленному Chrome,
+    путь к драйверу определяется заново и запуск повторяется один раз.
+    :param options: Объект ChromeOptions.
+    :param launcher: DriverLauncher или None.
+    :return: WebDriver объект.
+    """
+    if launcher is None:
+        return webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+
+    try:
+        return webdriver.Chrome(service=Service(launcher.resolve()), options=options)
+    except SessionNotCreatedException:
+        if not launcher.invalidate():
+            raise
+        logger.warning("Закрепленный ChromeDriver не подходит к установленному Chrome, путь определяется заново.")
+        return webdriver.Chrome(service=Service(launcher.resolve()), options=options)
+
+def quit_driver(driver, context=None):
+    """
+    Закрывает WebDriver и освобождает его профиль Chrome.
+    :param driver: WebDriver объект.
+    :param context: Общий контекст запуска (ScrapeContext).
+    """
+    launcher = context.driver_launcher if context is not None else None
+    try:
+        driver.quit()
+    finally:
+        if launcher is not None:
+            launcher.release(driver)
+
+def open_session(context=None, name="WebDriver"):
+    """
+    Создает браузер воркера, который перезапускается по правилам context.retry_policy.
+    Браузер запускается при первом обращении к session.driver. Если в контексте задан SharedBrowser,
+    браузер воркера — изолированный контекст общего Chrome, и перезапускается только этот контекст.
+    :param context: Общий контекст запуска (ScrapeContext).
+    :param name: Имя браузера для логов.
+    :return: Объект DriverSession.
+    """
+    if context is not None and context.shared_browser is not None:
+        shared = context.shared_browser
+        return DriverSession(
+            start=lambda: shared.open_context(
+                lambda: init_driver(context.browser_profile, context.driver_launcher),
+                lambda driver: quit_driver(driver, context)
+            ),
+            stop=shared.close_context,
+            policy=context.retry_policy,
+            name=name,
+        )
+
+    return DriverSession(
+        start=lambda: init_driver(
+            context.browser_profile if context is not None else None,
+            context.driver_launcher if context is not None else None
+        ),
+        stop=lambda driver: quit_driver(driver, context),
+        policy=context.retry_policy if context is not None else None,
+        name=name,
+    )
+
+def navigate_to_league_and_gameweek(driver, league_name, gameweek, context=None):
     """
     Переходит на страницу лиги и выбирает нужную игровую неделю.
+    Если в контексте задана карта навигации, неделя открывается по сохраненной прямой ссылке,
+    а если ее нет — по ссылке на страницу лиги (без перезагрузки, если лига уже открыта).
+    Через меню сайта навигация выполняется только при первом обращении к лиге.
+    Завершается, когда матчи выбранной недели отрисованы на странице.
     :param driver: WebDriver объект.
     :param league_name: Название лиги (например, "La Liga").
     :param gameweek: Номер игровой недели.
+    :param context: Общий контекст запуска (ScrapeContext).
+    """
+    context = context or ScrapeContext()
+    pacer = context.pacer
+    navigation = context.navigation
+
+    if navigation is not None and _navigate_by_url(driver, league_name, gameweek, context):
+        return
+
+    _open_league(driver, league_name, gameweek, pacer)
+    if navigation is not None:
+        navigation.record_league(league_name, driver.current_url)
+
+    _select_gameweek(driver, league_name, gameweek, pacer)
+    if navigation is not None:
+        navigation.record_gameweek(league_name, gameweek, driver.current_url)
+
+def _navigate_by_url(driver, league_name, gameweek, context):
+    """
+    Открывает игровую неделю по адресам из карты навигации.
+    :param driver: WebDriver объект.
+    :param league_name: Название лиги.
+    :param gameweek: Номер игровой недели.
+    :param context: Общий контекст запуска (ScrapeContext) с заданной картой навигации.
+    :return: True, если неделя открыта; False, если нужна навигация через меню.
+    """
+    navigation = context.navigation
+    pacer = context.pacer
+
+    url = navigation.gameweek_url(league_name, gameweek)
+    if url:
+        try:
+            with pacer.request():
+                driver.get(url)
+            wait_for_fixtures(driver, pacer)
+            if _is_gameweek_selected(driver, gameweek, pacer):
+                logger.info(f"Игровая неделя {gameweek} лиги '{league_name}' открыта по прямой ссылке.")
+                return True
+        except TimeoutException:
+            pass
+        logger.warning(f"Прямая ссылка на неделю {gameweek} лиги '{league_name}' не сработала и будет найдена заново.")
+        navigation.forget_gameweek(league_name, gameweek)
+
+    league_url = navigation.league_url(league_name)
+    if not league_url:
+        return False
+
+    try:
+        if driver.current_url != league_url:
+            with pacer.request():
+                driver.get(league_url)
+            logger.info(f"Страница лиги '{league_name}' открыта по прямой ссылке.")
+        else:
+            logger.info(f"Страница лиги '{league_name}' уже открыта.")
+        _select_gameweek(driver, league_name, gameweek, pacer)
+    except Exception as e:
+        logger.warning(f"Не удалось открыть лигу '{league_name}' по сохраненной ссылке, используется меню сайта: {e}")
+        return False
+
+    navigation.record_gameweek(league_name, gameweek, driver.current_url)
+    return True
+
+def _open_league(driver, league_name, gameweek, pacer):
+    """
+    Открывает главную страницу статистики и выбирает лигу в боковом меню.
+    :param driver: WebDriver объект.
+    :param league_name: Название лиги.
+    :param gameweek: Номер игровой недели (для логов).
+    :param pacer: Объект Pacer.
     """
     base_url = "https://xgscore.io/xg-statistics/"
-    driver.get(base_url)
+    with pacer.request():
+        driver.get(base_url)
     logger.info("Открыта главная страница статистики.")
 
     try:
-        random_delay()
-        league_element = WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.CSS_SELECTOR, "li.xgs-sidebar-nav_item a"))
+        pacer.wait_until(
+            driver, EC.element_to_be_clickable((By.CSS_SELECTOR, "li.xgs-sidebar-nav_item a")), replaces_delay=True
         )
 
         leagues = driver.find_elements(By.CSS_SELECTOR, "li.xgs-sidebar-nav_item a")
         league_found = False
         for league in leagues:
             if league_name.lower() in league.text.lower():
-                random_delay()
-                league.click()
+                with pacer.request():
+                    league.click()
                 league_found = True
                 logger.info(f"Лига '{league_name}' выбрана.")
                 break
@@ -78,33 +245,45 @@ def navigate_to_league_and_gameweek(driver, league_name, gameweek):
         if not league_found:
             raise ValueError(f"Лига '{league_name}' не найдена.")
 
+        pacer.wait_until(driver, EC.element_to_be_clickable((By.CSS_SELECTOR, WEEK_DROPDOWN_SELECTOR)))
+
     except Exception as e:
         logger.error(f"Ошибка при выборе лиги '{league_name}': {e}")
         logger.warning(f"Программа остановлена на лиге '{league_name}', неделя {gameweek}.")
         raise
 
+def _select_gameweek(driver, league_name, gameweek, pacer):
+    """
+    Выбирает игровую неделю в выпадающем списке на открытой странице лиги.
+    :param driver: WebDriver объект.
+    :param league_name: Название лиги (для логов).
+    :param gameweek: Номер игровой недели.
+    :param pacer: Объект Pacer.
+    """
     try:
-        random_delay()
-        week_dropdown_icon = WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.CSS_SELECTOR, "#mat-select-value-5 > span > span"))
+        week_dropdown_icon = pacer.wait_until(
+            driver, EC.element_to_be_clickable((By.CSS_SELECTOR, WEEK_DROPDOWN_SELECTOR)),
+            replaces_delay=True
         )
         week_dropdown_icon.click()
         logger.info("Открыт список игровых недель.")
 
-        random_delay()
-        gameweeks = WebDriverWait(driver, 10).until(
-            EC.presence_of_all_elements_located((By.CSS_SELECTOR, ".mat-option"))
+        gameweeks = pacer.wait_until(
+            driver, EC.presence_of_all_elements_located((By.CSS_SELECTOR, ".mat-option")), replaces_delay=True
         )
 
         gameweek_found = False
         for gw in gameweeks:
-            logger.info(gw.text)
-            
-            if f"{gameweek} Gameweek" in gw.text:
-                random_delay()
-                gw.click()
+            text = gw.text
+            logger.debug("Вариант списка недель: {}", text)
+
+            if f"{gameweek} Gameweek" in text:
+                previous_fixtures = driver.find_elements(By.CSS_SELECTOR, "xgs-xg-game-fixture")
+                with pacer.request():
+                    gw.click()
                 gameweek_found = True
                 logger.info(f"Игровая неделя {gameweek} выбрана.")
+                wait_for_fixtures(driver, pacer, previous_fixtures[0] if previous_fixtures else None)
                 break
 
         if not gameweek_found:
@@ -115,88 +294,464 @@ def navigate_to_league_and_gameweek(driver, league_name, gameweek):
         logger.warning(f"Программа остановлена на лиге '{league_name}', неделя {gameweek}.")
         raise
 
-def parse_statistics_data(driver, league_name):
+def _is_gameweek_selected(driver, gameweek, pacer):
+    """
+    Проверяет, что в выпадающем списке выбрана нужная игровая неделя.
+    :param driver: WebDriver объект.
+    :param gameweek: Номер игровой недели.
+    :param pacer: Объект Pacer.
+    :return: True, если выбрана нужная неделя.
+    """
+    try:
+        value = pacer.wait_until(driver, EC.presence_of_element_located((By.CSS_SELECTOR, WEEK_VALUE_SELECTOR)))
+    except TimeoutException:
+        return False
+    words = value.text.split()
+    return bool(words) and words[0] == str(gameweek)
+
+def wait_for_fixtures(driver, pacer, previous_fixture=None):
+    """
+    Ожидает, пока на странице отрисуются матчи выбранной игровой недели.
+    :param driver: WebDriver объект.
+    :param pacer: Объект Pacer.
+    :param previous_fixture: Элемент матча предыдущей недели, который должен исчезнуть со страницы.
+    """
+    if previous_fixture is not None:
+        try:
+            pacer.wait_until(driver, EC.staleness_of(previous_fixture))
+        except TimeoutException:
+            logger.debug("Список матчей не перерисован, вероятно, неделя уже была выбрана.")
+
+    pacer.wait_until(
+        driver, EC.presence_of_element_located((By.CSS_SELECTOR, "xgs-xg-game-fixture")), replaces_delay=True
+    )
+
+def collect_match_with_browser(driver, link, context, pages=None):
+    """
+    Собирает данные одного матча через WebDriver: вкладки xg-statistics и preview.
+    :param driver: WebDriver объект.
+    :param link: Ссылка на страницу матча.
+    :param context: Общий контекст запуска (ScrapeContext).
+    :param pages: Словарь, в который записывается HTML вкладок (для кэша страниц).
+    :return: Словарь с данными матча.
+    """
+    with context.pacer.request(), metrics.stage("browser.get"):
+        driver.get(link)
+    wait_for_statistics(driver, context.pacer)
+    return collect_opened_match(driver, context, pages)
+
+def wait_for_statistics(driver, pacer):
+    """
+    Ожидает отрисовки строк статистики на вкладке xg-statistics.
+    Если статистики нет (матч еще не сыгран), ожидание завершается по таймауту без ошибки.
+    :param driver: WebDriver объект.
+    :param pacer: Объект Pacer.
+    """
+    try:
+        pacer.wait_until(
+            driver, EC.presence_of_element_located((By.CSS_SELECTOR, "div.xgs-game-statistics-details-row")),
+            replaces_delay=True
+        )
+    except TimeoutException:
+        logger.warning("Строки статистики xg-statistics не появились на странице.")
+
+def collect_opened_match(driver, context, pages=None):
+    """
+    Собирает данные матча, страница которого уже открыта в текущей вкладке браузера.
+    В режиме "script" данные каждой вкладки извлекаются на странице одним вызовом execute_script,
+    без передачи HTML; страницы при этом не записываются в pages. Если вкладки preview нет на странице
+    (ожидание завершилось по таймауту), данные preview остаются пустыми; остальные ошибки WebDriver
+    передаются вызывающему коду, чтобы сбор матча можно было повторить.
+    :param driver: WebDriver объект.
+    :param context: Общий контекст запуска (ScrapeContext).
+    :param pages: Словарь, в который записывается HTML вкладок (для кэша страниц).
+    :return: Словарь с данными матча.
+    """
+    pacer = context.pacer
+    use_script = context.extraction == EXTRACTION_SCRIPT
+    if context.browser_metrics is not None:
+        context.browser_metrics.record_navigation(driver)
+
+    logger.debug("Парсинг данных с вкладки xg-statistics.")
+    if use_script:
+        xg_data = script_xg_statistics(driver)
+    else:
+        xg_html = page_source(driver)
+        xg_data = extract_xg_statistics(xg_html)
+
+    try:
+        preview_tab = pacer.wait_until(
+            driver, EC.element_to_be_clickable((By.CSS_SELECTOR, ".xgs-tab_link[href*='/preview']"))
+        )
+        pacer.pause()
+        preview_tab.click()
+        logger.debug("Переключение на вкладку preview.")
+        
+        pacer.wait_until(
+            driver, EC.presence_of_element_located((By.CSS_SELECTOR, "div.xgs-category-forecast-card_header")),
+            replaces_delay=True
+        )
+
+        if use_script:
+            try:
+                pacer.wait_until(driver, EC.presence_of_element_located((By.CSS_SELECTOR, "[id*='xgs-game-result']")))
+                prediction_loaded = True
+            except TimeoutException as e:
+                # Как и в режиме "html": без блока прогноза счета данные вкладки preview все равно собираются.
+                logger.error(f"Ошибка при сборе данных о прогнозах счета: {e}")
+                prediction_loaded = False
+            logger.debug("Сбор данных вкладки preview и прогноза счета в браузере.")
+            preview_data, match_score_prediction = script_preview(driver)
+            if not prediction_loaded:
+                match_score_prediction = {}
+        else:
+            logger.debug("Сбор данных о прогнозах счета матча.")
+            match_score_prediction = collect_match_score_prediction(driver)
+
+            preview_html = page_source(driver)
+            logger.debug("Парсинг данных с вкладки preview.")
+            preview_data = extract_preview(preview_html)
+
+            if pages is not None:
+                pages[TAB_XG_STATISTICS] = xg_html
+                pages[TAB_PREVIEW] = preview_html
+
+    except WebDriverException as e:
+        if not isinstance(e, TimeoutException):
+            raise
+        logger.error(f"Вкладка preview не появилась на странице: {e}")
+        preview_data = {}
+        match_score_prediction = {}
+    except Exception as e:
+        logger.error(f"Ошибка при разборе вкладки preview: {e}")
+        preview_data = {}
+        match_score_prediction = {}
+
+    return {
+        "preview": preview_data,
+        "match_score_prediction": match_score_prediction,
+        "xg_statistics": xg_data,
+    }
+
+def page_source(driver):
+    """
+    :param driver: WebDriver объект.
+    :return: HTML открытой страницы (передача из браузера учитывается в метриках этапов).
+    """
+    with metrics.stage("browser.page_source"):
+        return driver.page_source
+
+def collect_matches_in_tabs(driver, links, context, pages=None):
+    """
+    Загружает страницы матчей одновременно в отдельных вкладках браузера, пачками по limiter.max_in_flight,
+    и затем собирает данные из каждой вкладки. Между открытием вкладок выдерживается интервал из limiter.
+    :param driver: WebDriver объект.
+    :param links: Список ссылок на страницы матчей.
+    :param context: Общий контекст запуска (ScrapeContext) с заданным limiter.
+    :param pages: Список словарей (по одному на ссылку), в которые записывается HTML вкладок.
+    :return: Список словарей с данными матчей (None для матчей, которые не удалось собрать).
+    """
+    results = []
+    limiter = context.limiter
+    pages = pages or [None] * len(links)
+    origin = driver.current_window_handle
+
+    for start in range(0, len(links), limiter.max_in_flight):
+        batch = links[start:start + limiter.max_in_flight]
+        handles = []
+        for link in batch:
+            limiter.wait_turn()
+            handles.append(_open_tab(driver, link, context.browser_profile, origin))
+
+        for offset, (link, handle) in enumerate(zip(batch, handles)):
+            if handle is None:
+                logger.error(f"Не удалось открыть вкладку для матча: {link}")
+                results.append(None)
+                continue
+            try:
+                driver.switch_to.window(handle)
+            except Exception as e:
+                # Закрывать нечего: текущей осталась исходная вкладка, и close() закрыл бы ее.
+                logger.error(f"Не удалось переключиться на вкладку матча {link}: {e}")
+                results.append(None)
+                continue
+            try:
+                wait_for_statistics(driver, context.pacer)
+                results.append(collect_opened_match(driver, context, pages[start + offset]))
+            except Exception as e:
+                logger.error(f"Ошибка при сборе данных матча во вкладке {link}: {e}")
+                results.append(None)
+            finally:
+                driver.close()
+                driver.switch_to.window(origin)
+
+    return results
+
+def _open_tab(driver, link, profile, origin):
+    """
+    Открывает страницу матча в новой вкладке, не дожидаясь ее загрузки.
+    Блокировка запросов через CDP действует на одну вкладку, поэтому при облегченном профиле
+    вкладка сначала открывается пустой, настраивается и только затем переходит по ссылке.
+    Вкладка находится по уникальному имени окна: в общем браузере одновременно открывают вкладки
+    и другие воркеры, поэтому новую вкладку нельзя определить по разнице списков window_handles.
+    :param driver: WebDriver объект.
+    :param link: Ссылка на страницу матча.
+    :param profile: BrowserProfile или None.
+    :param origin: Дескриптор вкладки, в которую нужно вернуться.
+    :return: Дескриптор новой вкладки или None.
+    """
+    name = f"match-{uuid.uuid4().hex}"
+    blocking = profile is not None and profile.blocks_requests
+    driver.execute_script("window.open(arguments[0], arguments[1]);", "about:blank" if blocking else link, name)
+    try:
+        driver.switch_to.window(name)
+    except NoSuchWindowException:
+        return None
+    handle = driver.current_window_handle
+
+    if blocking:
+        profile.apply_blocking(driver)
+        driver.execute_script("window.location.href = arguments[0];", link)
+    driver.switch_to.window(origin)
+    return handle
+
+def collect_match_with_retry(session, link, context, pages=None, use_fetcher=True):
+    """
+    Собирает данные матча с повторами: по HTTP (если задан HttpFetcher), затем в браузере.
+    Повторяются только ошибки WebDriver и загрузки: между попытками выдерживается пауза с экспоненциальным
+    ростом, ошибки учитываются браузером воркера, который перезапускается перед следующей попыткой,
+    если он деградировал. Матч без вкладки preview — окончательный результат: он не повторяется
+    и не считается ошибкой браузера. Если HTML, загруженный по HTTP, не содержит данных, следующие
+    попытки выполняются только в браузере.
+    :param session: DriverSession воркера.
+    :param link: Ссылка на страницу матча.
+    :param context: Общий контекст запуска (ScrapeContext).
+    :param pages: Словарь, в который записывается HTML вкладок (для кэша страниц).
+    :param use_fetcher: Пробовать загрузку по HTTP. False — матч собирается только в браузере
+        (например, когда HTTP-загрузка этого матча уже не удалась).
+    :return: Словарь с данными матча.
+    """
+    with metrics.stage("match"):
+        return _collect_match_with_retry(session, link, context, pages, use_fetcher)
+
+def _collect_match_with_retry(session, link, context, pages, use_fetcher):
+    policy = context.retry_policy
+    pages = pages if pages is not None else {}
+    for attempt in range(1, policy.attempts + 1):
+        pages.clear()
+        try:
+            if use_fetcher and context.fetcher is not None:
+                statistic = context.fetcher.collect_match(link, pages)
+                if statistic is not None:
+                    return statistic
+                use_fetcher = False
+            statistic = collect_match_with_browser(session.driver, link, context, pages)
+        except Exception as e:
+            session.failure(e)
+            if attempt == policy.attempts:
+                raise
+            retry_delay(policy, attempt, link, e)
+            continue
+
+        if not statistic["preview"]:
+            logger.warning(f"Вкладка preview не собрана, матч сохраняется без нее: {link}")
+        session.page_done()
+        return statistic
+
+def collect_matches_concurrently(driver, links, context, pages=None):
+    """
+    Собирает данные всех матчей игровой недели одновременно.
+    Если задан HttpFetcher, матчи загружаются по HTTP в пуле потоков,
+    оставшиеся загружаются во вкладках браузера.
+    :param driver: WebDriver объект.
+    :param links: Список ссылок на страницы матчей.
+    :param context: Общий контекст запуска (ScrapeContext) с заданным limiter.
+    :param pages: Список словарей (по одному на ссылку), в которые записывается HTML вкладок.
+    :return: Список словарей с данными матчей в порядке ссылок (None для несобранных матчей).
+    """
+    results = [None] * len(links)
+    pages = pages or [None] * len(links)
+
+    if context.fetcher is not None:
+        with ThreadPoolExecutor(max_workers=context.limiter.max_in_flight) as executor:
+            futures = {
+                executor.submit(context.fetcher.collect_match, link, pages[idx]): idx
+                for idx, link in enumerate(links)
+            }
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+
+    pending = [idx for idx, statistic in enumerate(results) if statistic is None]
+    if pending:
+        logger.info(f"Загрузка {len(pending)} матчей во вкладках браузера.")
+        collected = collect_matches_in_tabs(
+            driver, [links[idx] for idx in pending], context, [pages[idx] for idx in pending]
+        )
+        for idx, statistic in zip(pending, collected):
+            results[idx] = statistic
+
+    return results
+
+def parse_statistics_data(session, league_name, context=None, gameweek=None):
     """
     Парсит данные матчей с текущей страницы, переходя по каждой ссылке матча.
     Собирает информацию с вкладок xg-statistics и preview.
-    :param driver: WebDriver объект.
+    Сыгранные матчи, уже отмеченные в индексе собранных матчей, и матчи, собранные в продолжаемом запуске, пропускаются.
+    Матчи, страницы которых есть в кэше, разбираются без обращения к сайту.
+    Если в контексте задан HttpFetcher, матч сначала загружается по HTTP, а браузер используется как запасной путь.
+    Если в контексте задан PolitenessLimiter, матчи недели загружаются одновременно.
+    Если в контексте задан MatchPipeline, загрузка, разбор и запись матчей недели идут одновременно в стадиях конвейера.
+    Сбор матча повторяется по правилам context.retry_policy, а деградировавший браузер перезапускается.
+    :param session: DriverSession воркера.
     :param league_name: Название лиги (например, "La Liga").
+    :param context: Общий контекст запуска (ScrapeContext).
+    :param gameweek: Номер игровой недели (сохраняется в кэше страниц и индексе собранных матчей).
     """
-    random_delay()
-    soup = BeautifulSoup(driver.page_source, "lxml")
-    logger.info("HTML страницы загружен и передан в BeautifulSoup.")
+    context = context or ScrapeContext()
+    driver = session.driver
 
-    links = [
-        "https://xgscore.io" + block.find("a")["href"]
-        for block in soup.find_all("xgs-xg-game-fixture", class_="xgs-panel ng-star-inserted")
-    ]
+    wait_for_fixtures(driver, context.pacer)
+    if context.extraction == EXTRACTION_SCRIPT:
+        links = script_fixture_links(driver)
+    else:
+        links = extract_fixture_links(page_source(driver))
     logger.info(f"Найдено {len(links)} матчей для парсинга.")
 
-    for idx, link in enumerate(links):
+    collected_links = {link for link in links if context.is_collected(link)}
+    if collected_links:
+        links = [link for link in links if link not in collected_links]
+        logger.info(f"Пропущено уже собранных матчей: {len(collected_links)}. Осталось: {len(links)}.")
+
+    if context.pipeline is not None:
+        context.pipeline.run(
+            links, league_name, gameweek, context,
+            lambda link, pages: collect_match_with_retry(session, link, context, pages, use_fetcher=False)
+        )
+        context.save_index()
+        return
+
+    statistics = [context.load_cached_match(link) for link in links]
+    pending = [idx for idx, statistic in enumerate(statistics) if statistic is None]
+    if len(pending) < len(links):
+        logger.info(f"Из кэша страниц взято матчей: {len(links) - len(pending)}.")
+
+    if context.limiter is not None:
+        pages = [{} for _ in pending]
         try:
-            logger.info(f"Переход по ссылке {idx + 1}/{len(links)}: {link}")
-            driver.get(link)
-            random_delay()
+            collected = collect_matches_concurrently(driver, [links[idx] for idx in pending], context, pages)
+            session.page_done(sum(1 for statistic in collected if statistic is not None))
+        except Exception as e:
+            logger.error(f"Ошибка при одновременной загрузке матчей: {e}")
+            session.failure(e)
+            collected = [None] * len(pending)
+        for idx, statistic, match_pages in zip(pending, collected, pages):
+            statistics[idx] = statistic
+            if statistic is not None:
+                context.store_pages(links[idx], statistic, match_pages, league_name, gameweek)
 
-            soup = BeautifulSoup(driver.page_source, "lxml")
-            logger.info("Парсинг данных с вкладки xg-statistics.")
-            xg_data = parse_xg_statistics(soup)
+        for idx, (link, statistic) in enumerate(zip(links, statistics)):
+            if statistic is None:
+                logger.info(f"Повторная загрузка матча {idx + 1}/{len(links)}: {link}")
+                try:
+                    match_pages = {}
+                    statistic = collect_match_with_retry(session, link, context, match_pages)
+                    context.store_pages(link, statistic, match_pages, league_name, gameweek)
+                except Exception as e:
+                    logger.warning(f"Данные матча {idx + 1}/{len(links)} не собраны: {link}: {e}.")
+                    context.record_failure(link, league_name, gameweek, e)
+                    continue
+            logger.debug("Данные матча собраны: {}", statistic)
+            record = context.save(statistic, league_name, gameweek)
+            context.record_match(link, statistic, league_name, gameweek)
+            log_match("Матч {}/{} сохранен: {} - {}", idx + 1, len(links), record.home_team, record.away_team)
+        context.save_index()
+        return
 
-            try:
-                preview_tab = WebDriverWait(driver, 10).until(
-                    EC.element_to_be_clickable((By.CSS_SELECTOR, ".xgs-tab_link[href*='/preview']"))
-                )
-                random_delay()
-                preview_tab.click()
-                logger.info("Переключение на вкладку preview.")
-                
-                random_delay()
-                soup = BeautifulSoup(driver.page_source, "lxml")
-                logger.info("Парсинг данных с вкладки preview.")
-                preview_data = parse_preview(soup)
-
-                logger.info("Сбор данных о прогнозах счета матча.")
-                match_score_prediction = collect_match_score_prediction(driver)
+    for idx, link in enumerate(links):
+        try:
+            logger.debug("Переход по ссылке {}/{}: {}", idx + 1, len(links), link)
 
-            except Exception as e:
-                logger.error(f"Ошибка при переключении на вкладку preview: {e}")
-                preview_data = {}
-                match_score_prediction = {}
+            statistic = statistics[idx]
+            if statistic is None:
+                pages = {}
+                statistic = collect_match_with_retry(session, link, context, pages)
+                context.store_pages(link, statistic, pages, league_name, gameweek)
 
-            statistic = {
-                "preview": preview_data,
-                "match_score_prediction": match_score_prediction,
-                "xg_statistics": xg_data,
-            }
-            
-            logger.info(f"Данные матча собраны: {statistic}")
-            
-            save_data_to_excel(statistic, league_name)
-            logger.info(f"Данные сохранены для матча: {link}")
+            logger.debug("Данные матча собраны: {}", statistic)
+
+            record = context.save(statistic, league_name, gameweek)
+            context.record_match(link, statistic, league_name, gameweek)
+            log_match("Матч {}/{} сохранен: {} - {}", idx + 1, len(links), record.home_team, record.away_team)
 
         except Exception as e:
             logger.error(f"Ошибка при парсинге данных матча по ссылке {link}: {e}")
             logger.warning(f"Программа остановилась на матче {idx + 1}/{len(links)}: {link}.")
+            context.record_failure(link, league_name, gameweek, e)
             continue
 
-def parse_data(league_name, gameweeks):
+    context.save_index()
+
+def normalize_gameweeks(gameweeks):
+    """
+    Приводит значение игровых недель из конфигурации к списку.
+    :param gameweeks: Список игровых недель или одно число.
+    :return: Список игровых недель.
+    """
+    if isinstance(gameweeks, int):
+        return [gameweeks]
+    return list(gameweeks)
+
+def process_gameweek(session, league_name, gameweek, context=None):
+    """
+    Обрабатывает одну игровую неделю лиги в браузере воркера. Перед заданием браузер проходит быструю проверку
+    и перезапускается, если не отвечает.
+    :param session: DriverSession воркера.
+    :param league_name: Название лиги.
+    :param gameweek: Номер игровой недели.
+    :param context: Общий контекст запуска (ScrapeContext).
+    """
+    if context is not None and not context.start_gameweek(league_name, gameweek):
+        return
+
+    logger.info(f"Начало парсинга для лиги '{league_name}' и игровой недели {gameweek}.")
+    try:
+        driver = session.ensure_healthy()
+        with metrics.stage("navigation"):
+            navigate_to_league_and_gameweek(driver, league_name, gameweek, context)
+        parse_statistics_data(session, league_name, context, gameweek)
+    except Exception as e:
+        session.failure(e)
+        if context is not None:
+            context.finish_gameweek(league_name, gameweek, e)
+        raise
+    if context is not None:
+        context.finish_gameweek(league_name, gameweek)
+        # Замер не должен запускать браузер: если назначен перезапуск, текущий браузер уже не замеряется.
+        driver = session.current_driver
+        if context.browser_metrics is not None and driver is not None:
+            context.browser_metrics.sample_memory(driver)
+
+def parse_data(league_name, gameweeks, context=None):
     """
     Основная функция для парсинга данных. Обрабатывает как одиночные, так и множественные игровые недели.
     :param league_name: Название лиги.
     :param gameweeks: Список игровых недель или одно число.
+    :param context: Общий контекст запуска (ScrapeContext).
     """
-    if isinstance(gameweeks, int):
-        gameweeks = [gameweeks]
+    gameweeks = normalize_gameweeks(gameweeks)
+    if context is not None and context.journal is not None:
+        gameweeks = [gw for gw in gameweeks if not context.journal.is_gameweek_done(league_name, gw)]
+        if not gameweeks:
+            logger.info(f"Все недели лиги '{league_name}' уже обработаны в этом запуске.")
+            return
 
-    driver = init_driver()
+    session = open_session(context)
     try:
         for gameweek in gameweeks:
             try:
-                logger.info(f"Начало парсинга для лиги '{league_name}' и игровой недели {gameweek}.")
-                navigate_to_league_and_gameweek(driver, league_name, gameweek)
-                parse_statistics_data(driver, league_name)
+                process_gameweek(session, league_name, gameweek, context)
             except Exception as e:
                 logger.error(f"Ошибка при обработке недели {gameweek} для лиги '{league_name}': {e}", exc_info=True)
     finally:
-        driver.quit()
+        session.close()
         logger.info("WebDriver закрыт.")
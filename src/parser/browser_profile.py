@@ -0,0 +1,200 @@
+import os
+import threading
+
+from src.utils.logger_setup import logger
+
+DEFAULT_BLOCKED_URLS = (
+    # Изображения и шрифты не нужны для чтения статистики.
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    # Аналитика и реклама.
+    "*googletagmanager.com*", "*google-analytics.com*", "*doubleclick.net*", "*googlesyndication.com*",
+    "*adservice.google.*", "*facebook.net*", "*connect.facebook.*", "*mc.yandex.ru*", "*hotjar.com*",
+)
+
+NAVIGATION_TIMING_SCRIPT = """
+const nav = performance.getEntriesByType('navigation')[0];
+const resources = performance.getEntriesByType('resource');
+return {
+    duration: nav ? nav.duration : 0,
+    resources: resources.length,
+    transfer: resources.reduce((total, entry) => total + (entry.transferSize || 0), nav ? nav.transferSize : 0),
+};
+"""
+
+class BrowserProfile:
+    """
+    Облегченный профиль Chrome: блокировка ненужных запросов через CDP (Network.setBlockedURLs),
+    отключение изображений, уменьшенное окно и дисковый кэш.
+    """
+
+    def __init__(self, enabled=True, blocked_urls=DEFAULT_BLOCKED_URLS, disable_images=True,
+                 window_size=(1366, 900), disk_cache_mb=32):
+        """
+        :param enabled: Применять ли профиль. Если False, браузер запускается как раньше (развернутое окно).
+        :param blocked_urls: Шаблоны адресов, запросы к которым блокируются (синтаксис Network.setBlockedURLs).
+        :param disable_images: Отключить загрузку изображений настройками Chrome.
+        :param window_size: Размер окна (ширина, высота). None — развернуть окно.
+        :param disk_cache_mb: Размер дискового кэша в мегабайтах. None — размер по умолчанию.
+        """
+        self.enabled = enabled
+        self.blocked_urls = list(blocked_urls or [])
+        self.disable_images = disable_images
+        self.window_size = tuple(window_size) if window_size else None
+        self.disk_cache_mb = disk_cache_mb
+
+    @property
+    def blocks_requests(self):
+        return self.enabled and bool(self.blocked_urls)
+
+    @classmethod
+    def from_settings(cls, browser_settings):
+        """
+        :param browser_settings: Секция "browser" настроек.
+        :return: Объект BrowserProfile.
+        """
+        return cls(
+            enabled=browser_settings.get("lightweight", False),
+            blocked_urls=browser_settings.get("blocked_urls", DEFAULT_BLOCKED_URLS),
+            disable_images=browser_settings.get("disable_images", True),
+            window_size=browser_settings.get("window_size", (1366, 900)),
+            disk_cache_mb=browser_settings.get("disk_cache_mb", 32),
+        )
+
+    def apply_options(self, options):
+        """
+        Добавляет аргументы запуска Chrome.
+        :param options: Объект ChromeOptions.
+        """
+        if not self.enabled:
+            return
+        if self.window_size:
+            options.add_argument(f"--window-size={self.window_size[0]},{self.window_size[1]}")
+        if self.disk_cache_mb is not None:
+            options.add_argument(f"--disk-cache-size={int(self.disk_cache_mb * 1024 * 1024)}")
+        if self.disable_images:
+            options.add_argument("--blink-settings=imagesEnabled=false")
+            options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+
+    def apply_window(self, driver):
+        """
+        Устанавливает размер окна: уменьшенный в облегченном профиле, иначе развернутый.
+        :param driver: WebDriver объект.
+        """
+        if self.enabled and self.window_size:
+            driver.set_window_size(*self.window_size)
+        else:
+            driver.maximize_window()
+
+    def apply_blocking(self, driver):
+        """
+        Включает блокировку запросов в текущей вкладке. Настройка CDP действует на одну вкладку,
+        поэтому вызывается и для каждой вкладки, открытой вручную.
+        :param driver: WebDriver объект.
+        """
+        if not self.blocks_requests:
+            return
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.blocked_urls})
+        except Exception as e:
+            logger.warning(f"Не удалось включить блокировку запросов в браузере: {e}")
+
+class BrowserMetrics:
+    """
+    Статистика браузеров за запуск: время загрузки страниц матчей (Navigation Timing),
+    количество и объем загруженных ресурсов, память процессов Chrome.
+    Позволяет сравнить запуски с облегченным профилем и без него.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loads = []
+        self._resources = 0
+        self._transfer = 0
+        self._memory = []
+
+    def record_navigation(self, driver):
+        """
+        Учитывает загрузку открытой страницы.
+        :param driver: WebDriver объект.
+        """
+        try:
+            timing = driver.execute_script(NAVIGATION_TIMING_SCRIPT)
+        except Exception as e:
+            logger.debug(f"Не удалось получить время загрузки страницы: {e}")
+            return
+
+        with self._lock:
+            if timing["duration"]:
+                self._loads.append(timing["duration"])
+            self._resources += timing["resources"]
+            self._transfer += timing["transfer"]
+
+    def sample_memory(self, driver):
+        """
+        Замеряет суммарную резидентную память процессов Chrome этого драйвера. Для контекста общего браузера
+        память всего общего Chrome делится на число открытых контекстов: каждый воркер учитывает свою долю,
+        а не весь общий Chrome, поэтому замеры сопоставимы с отдельным браузером на воркера.
+        :param driver: WebDriver объект.
+        """
+        shared = getattr(driver, "shared_browser", None)
+        try:
+            rss = _process_tree_rss(driver.browser_pid if shared is not None else driver.service.process.pid)
+        except Exception as e:
+            logger.debug(f"Не удалось замерить память браузера: {e}")
+            return
+        if rss and shared is not None:
+            rss //= max(1, shared.open_contexts)
+
+        if rss:
+            with self._lock:
+                self._memory.append(rss)
+
+    def summary(self):
+        """
+        :return: Словарь со статистикой или None, если замеров не было.
+        """
+        with self._lock:
+            if not self._loads and not self._memory:
+                return None
+            loads = sorted(self._loads)
+            return {
+                "pages": len(loads),
+                "avg_load_ms": round(sum(loads) / len(loads)) if loads else None,
+                "p95_load_ms": round(loads[min(len(loads) - 1, int(len(loads) * 0.95))]) if loads else None,
+                "resources_per_page": round(self._resources / len(loads), 1) if loads else None,
+                "kb_per_page": round(self._transfer / len(loads) / 1024, 1) if loads else None,
+                "max_memory_mb": round(max(self._memory) / 1024 / 1024) if self._memory else None,
+            }
+
+def _process_tree_rss(pid):
+    """
+    Суммирует резидентную память процесса и всех его потомков (только Linux, через /proc).
+    :param pid: Идентификатор корневого процесса (chromedriver).
+    :return: Память в байтах или None, если /proc недоступен.
+    """
+    if not os.path.isdir("/proc"):
+        return None
+
+    children = {}
+    rss_pages = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "r") as file:
+                fields = file.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        # Поля после имени процесса: state, ppid, ..., rss (24-е поле /proc/<pid>/stat).
+        children.setdefault(int(fields[1]), []).append(int(entry))
+        rss_pages[int(entry)] = int(fields[21])
+
+    total = 0
+    stack = [pid]
+    while stack:
+        current = stack.pop()
+        total += rss_pages.get(current, 0)
+        stack.extend(children.get(current, []))
+    return total * os.sysconf("SC_PAGE_SIZE")
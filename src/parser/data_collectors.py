@@ -3,7 +3,9 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
 from src.utils.logger_setup import logger
+from src.utils.stage_metrics import metrics
 
+@metrics.timed("parse.bs4.xg_statistics")
 def parse_xg_statistics(soup):
     """
     Собирает данные с вкладки xg-statistics.
@@ -37,7 +39,7 @@ def parse_xg_statistics(soup):
             "expected_goals_team_2": xg_team_2.text.strip() if xg_team_2 else None,
         }
 
-        logger.info(f"Данные с xg-statistics собраны: {data}")
+        logger.debug("Данные с xg-statistics собраны: {}", data)
         return data
 
     except Exception as e:
@@ -49,6 +51,7 @@ def parse_xg_statistics(soup):
             "expected_goals_team_2": None,
         }
 
+@metrics.timed("parse.bs4.preview")
 def parse_preview(soup):
     """
     Собирает данные с вкладки preview.
@@ -92,7 +95,7 @@ def parse_preview(soup):
 
         # Key Stats
         blocks = soup.find_all("div", class_="mb-6")
-        logger.info(f"Найдено {len(blocks)} блоков с классом 'mb-6'.")
+        logger.debug("Найдено {} блоков с классом 'mb-6'.", len(blocks))
 
         if blocks:
             team_rating_home = blocks[0].find_all("span", class_="text-sm-small ng-star-inserted")
@@ -137,13 +140,14 @@ def parse_preview(soup):
                     data["avg_xg_conceded_home"] = values[0].text.strip()
                     data["avg_xg_conceded_away"] = values[1].text.strip()
 
-        logger.info(f"Данные с вкладки preview собраны: {data}")
+        logger.debug("Данные с вкладки preview собраны: {}", data)
         return data
 
     except Exception as e:
         logger.error(f"Ошибка при парсинге вкладки preview: {e}")
         return {}
 
+@metrics.timed("browser.score_prediction")
 def collect_match_score_prediction(driver):
     """
     Собирает информацию о прогнозах счета матча (Match Score Prediction) с помощью Selenium.
@@ -154,10 +158,10 @@ def collect_match_score_prediction(driver):
         prediction_block = WebDriverWait(driver, 10).until(
             EC.presence_of_element_located((By.CSS_SELECTOR, "[id*='xgs-game-result']"))
         )
-        logger.info("Найден блок с прогнозом счета.")
+        logger.debug("Найден блок с прогнозом счета.")
         
         marks = prediction_block.find_elements(By.CSS_SELECTOR, "mark.xgs-mark.-huge strong")
-        logger.info(f"Найдено {len(marks)} элементов с прогнозами.")
+        logger.debug("Найдено {} элементов с прогнозами.", len(marks))
 
         if len(marks) >= 2:
             return {
@@ -171,3 +175,48 @@ def collect_match_score_prediction(driver):
     except Exception as e:
         logger.error(f"Ошибка при сборе данных о прогнозах счета: {e}")
         return {}
+
+def parse_match_score_prediction(soup):
+    """
+    Собирает прогноз счета матча из HTML вкладки preview, без обращения к WebDriver.
+    :param soup: Объект BeautifulSoup вкладки preview.
+    :return: Словарь с данными прогноза счета.
+    """
+    try:
+        prediction_block = soup.select_one("[id*='xgs-game-result']")
+        if not prediction_block:
+            logger.warning("Блок с прогнозом счета не найден в HTML.")
+            return {}
+
+        marks = prediction_block.select("mark.xgs-mark.-huge strong")
+        if len(marks) >= 2:
+            return {
+                "match_score_prediction_home": marks[0].text.strip(),
+                "match_score_prediction_away": marks[1].text.strip(),
+            }
+
+        logger.warning("Недостаточно данных для прогноза счета.")
+        return {}
+
+    except Exception as e:
+        logger.error(f"Ошибка при разборе прогноза счета из HTML: {e}")
+        return {}
+
+def parse_fixture_links(soup):
+    """
+    Собирает ссылки на страницы матчей со страницы игровой недели.
+    :param soup: Объект BeautifulSoup страницы со списком матчей.
+    :return: Список абсолютных ссылок.
+    """
+    return [
+        "https://xgscore.io" + block.find("a")["href"]
+        for block in soup.find_all("xgs-xg-game-fixture", class_="xgs-panel ng-star-inserted")
+    ]
+
+def is_match_finished(xg_data):
+    """
+    Проверяет, сыгран ли матч: на вкладке xg-statistics указаны забитые голы.
+    :param xg_data: Данные вкладки xg-statistics.
+    :return: True, если матч сыгран.
+    """
+    return bool(xg_data) and xg_data.get("goals_team_1") not in (None, "")
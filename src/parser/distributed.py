@@ -0,0 +1,180 @@
+import os
+import socket
+import threading
+import time
+
+from src.parser.browser_manager import open_session, process_gameweek
+from src.parser.worker_pool import build_jobs
+from src.utils.job_queue import STATUS_PENDING, STATUS_LEASED, STATUS_DONE, STATUS_FAILED
+from src.utils.logger_setup import logger
+
+DEFAULT_POLL_INTERVAL = 10
+
+def worker_name():
+    """
+    :return: Имя воркера, уникальное среди машин и процессов: "<хост>:<pid>".
+    """
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+def run_coordinator(config, job_queue, sink, reset=False, poll_interval=DEFAULT_POLL_INTERVAL):
+    """
+    Режим координатора: разворачивает конфигурацию в задания (лига, игровая неделя) общей очереди
+    и, пока воркеры на любых машинах их обрабатывают, собирает переданные ими записи матчей в один приемник.
+    Неудачные задания предыдущего запуска снова ставятся в очередь. Завершается, когда в очереди
+    не остается свободных и арендованных заданий.
+    :param config: Список словарей с конфигурацией.
+    :param job_queue: Очередь заданий (SQLiteJobQueue или RedisJobQueue).
+    :param sink: Приемник, в который записываются результаты всех воркеров.
+    :param reset: Удалить задания предыдущего запуска; несобранные результаты воркеров сохраняются.
+    :param poll_interval: Интервал проверки очереди в секундах.
+    """
+    added = job_queue.enqueue(build_jobs(config), reset)
+    logger.info(f"Координатор: добавлено заданий в очередь: {added}.")
+
+    merged = 0
+    last_counts = None
+    while True:
+        merged += merge_results(job_queue, sink)
+        counts = job_queue.counts()
+        if counts != last_counts:
+            logger.info(
+                f"Очередь заданий: свободно {counts[STATUS_PENDING]}, в работе {counts[STATUS_LEASED]}, "
+                f"выполнено {counts[STATUS_DONE]}, с ошибкой {counts[STATUS_FAILED]}. Собрано матчей: {merged}."
+            )
+            last_counts = counts
+        if not counts[STATUS_PENDING] and not counts[STATUS_LEASED]:
+            break
+        time.sleep(poll_interval)
+
+    # Воркер передает записи до завершения задания, поэтому после последней проверки остаток забирается еще раз.
+    merged += merge_results(job_queue, sink)
+    for league_name, gameweek, error in job_queue.failed():
+        logger.error(f"Задание не выполнено: лига '{league_name}', неделя {gameweek}: {error}")
+    logger.info(f"Координатор завершил работу. Собрано матчей: {merged}.")
+
+def merge_results(job_queue, sink):
+    """
+    Переносит записи матчей, переданные воркерами, в приемник координатора. Записи удаляются из очереди
+    только после того, как приемник их записал; если записать не удалось, они остаются в очереди
+    и будут перенесены при следующем запуске координатора.
+    :param job_queue: Очередь заданий.
+    :param sink: Приемник координатора.
+    :return: Количество перенесенных записей.
+    :raises RuntimeError: Если приемник не смог записать данные.
+    """
+    total = 0
+    while True:
+        results = job_queue.peek_results()
+        if not results:
+            return total
+        for league_name, record in results:
+            sink.write(record, league_name)
+        if not sink.flush():
+            raise RuntimeError(
+                f"Приемник координатора не записал данные; записей в очереди: {len(results)}, они не удалены."
+            )
+        job_queue.ack_results(len(results))
+        total += len(results)
+
+def run_queue_workers(job_queue, context, workers=1, name=None, poll_interval=DEFAULT_POLL_INTERVAL):
+    """
+    Режим воркера: браузеры этой машины берут задания из общей очереди в аренду, пока задания не закончатся.
+    Пока неделя обрабатывается, аренда продлевается; если воркер остановится, задание вернется в очередь
+    по истечении срока аренды и будет выдано другому воркеру.
+    :param job_queue: Очередь заданий (SQLiteJobQueue или RedisJobQueue).
+    :param context: Общий контекст запуска (ScrapeContext) с приемником QueueSink.
+    :param workers: Количество браузеров на этой машине.
+    :param name: Имя воркера; по умолчанию "<хост>:<pid>".
+    :param poll_interval: Интервал ожидания, пока другие воркеры держат задания в аренде.
+    """
+    name = name or worker_name()
+    names = [name] if workers <= 1 else [f"{name}-{number}" for number in range(1, workers + 1)]
+    threads = [
+        threading.Thread(
+            target=_queue_worker, args=(worker, job_queue, context, poll_interval), name=f"queue-{worker}", daemon=True
+        )
+        for worker in names
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    logger.info(f"Воркер {name}: в очереди не осталось заданий.")
+
+def _queue_worker(worker, job_queue, context, poll_interval):
+    """
+    Цикл одного браузера воркера.
+    :param worker: Имя воркера.
+    :param job_queue: Очередь заданий.
+    :param context: Общий контекст запуска (ScrapeContext).
+    :param poll_interval: Интервал ожидания, пока другие воркеры держат задания в аренде.
+    """
+    session = open_session(context, f"Воркер {worker}")
+    heartbeat_interval = max(1.0, job_queue.lease_seconds / 3)
+    try:
+        while True:
+            job = job_queue.lease(worker)
+            if job is None:
+                # Арендованные другими воркерами задания могут вернуться в очередь, если воркер остановится.
+                if not job_queue.counts()[STATUS_LEASED]:
+                    break
+                time.sleep(poll_interval)
+                continue
+
+            league_name, gameweek = job
+            logger.info(f"Воркер {worker} взял задание: лига '{league_name}', неделя {gameweek}.")
+            error = None
+            with _Heartbeat(job_queue, worker, job, heartbeat_interval):
+                try:
+                    process_gameweek(session, league_name, gameweek, context)
+                    context.save_index()
+                    if context.sink is not None and not context.sink.flush():
+                        raise RuntimeError("записи матчей не переданы в очередь результатов")
+                except Exception as e:
+                    error = e
+                    logger.error(
+                        f"Воркер {worker}: ошибка при обработке недели {gameweek} для лиги '{league_name}': {e}",
+                        exc_info=True
+                    )
+
+            status = job_queue.complete(worker, job, error)
+            if status is None:
+                logger.warning(
+                    f"Воркер {worker}: аренда задания '{league_name}', неделя {gameweek} истекла до завершения."
+                )
+            elif status == STATUS_PENDING:
+                logger.warning(f"Воркер {worker}: задание '{league_name}', неделя {gameweek} возвращено в очередь.")
+    finally:
+        session.close()
+        logger.info(f"Воркер {worker}: WebDriver закрыт.")
+
+class _Heartbeat:
+    """
+    Фоновый поток, продлевающий аренду задания, пока воркер его обрабатывает.
+    """
+
+    def __init__(self, job_queue, worker, job, interval):
+        self.job_queue = job_queue
+        self.worker = worker
+        self.job = job
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"heartbeat-{worker}", daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._stop.set()
+        self._thread.join()
+        return False
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                if not self.job_queue.heartbeat(self.worker, self.job):
+                    logger.warning(f"Воркер {self.worker}: аренда задания {self.job} потеряна.")
+                    return
+            except Exception as e:
+                logger.warning(f"Воркер {self.worker}: не удалось продлить аренду задания: {e}")
@@ -0,0 +1,253 @@
+import json
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from webdriver_manager.chrome import ChromeDriverManager
+
+from src.utils.logger_setup import logger
+
+DEFAULT_PIN_FILE = ".cache/chromedriver.json"
+DEFAULT_MAX_AGE_DAYS = 7
+
+class DriverLauncher:
+    """
+    Запуск ChromeDriver без обращения к webdriver_manager при каждом старте.
+    Путь к драйверу определяется один раз за процесс и закрепляется в файле pin_file,
+    так что следующие запуски берут готовый бинарный файл. Драйвер можно указать явно
+    и работать полностью офлайн. Профили Chrome хранятся в profile_dir по одному на слот,
+    чтобы браузер стартовал с уже прогретым профилем. Слот занимается блокировкой файла slot-N.lock,
+    поэтому одну директорию профилей могут использовать несколько процессов. Время каждого запуска учитывается.
+    """
+
+    def __init__(self, driver_path=None, offline=False, pin_file=DEFAULT_PIN_FILE,
+                 max_age_days=DEFAULT_MAX_AGE_DAYS, profile_dir=None):
+        """
+        :param driver_path: Путь к локальному ChromeDriver. Если задан, webdriver_manager не используется.
+        :param offline: Не обращаться к сети: использовать только driver_path или закрепленный путь.
+        :param pin_file: Файл, в котором закрепляется найденный путь к драйверу. None — не закреплять.
+        :param max_age_days: Через сколько дней закрепленный путь проверяется заново (кроме офлайн-режима).
+        :param profile_dir: Директория профилей Chrome для теплого старта. None — временный профиль.
+        """
+        self.driver_path = driver_path
+        self.offline = offline
+        self.pin_file = pin_file
+        self.max_age_days = max_age_days
+        self.profile_dir = profile_dir
+        self._lock = threading.Lock()
+        self._resolved = None
+        self._pinned = False
+        self._slot_locks = {}
+        self._profiles = {}
+        self._startups = []
+
+    @classmethod
+    def from_settings(cls, driver_settings):
+        """
+        :param driver_settings: Секция "driver" настроек.
+        :return: Объект DriverLauncher.
+        """
+        return cls(
+            driver_path=driver_settings.get("path"),
+            offline=driver_settings.get("offline", False),
+            pin_file=driver_settings.get("pin_file", DEFAULT_PIN_FILE),
+            max_age_days=driver_settings.get("max_age_days", DEFAULT_MAX_AGE_DAYS),
+            profile_dir=driver_settings.get("profile_dir"),
+        )
+
+    def resolve(self):
+        """
+        Возвращает путь к ChromeDriver: явно заданный, закрепленный или найденный webdriver_manager.
+        :return: Путь к исполняемому файлу драйвера.
+        """
+        with self._lock:
+            if self._resolved is None:
+                started = time.monotonic()
+                self._resolved = self._resolve_locked()
+                logger.info(f"ChromeDriver: {self._resolved} (определен за {time.monotonic() - started:.2f} с).")
+            return self._resolved
+
+    def invalidate(self):
+        """
+        Сбрасывает закрепленный путь (например, после обновления Chrome драйвер перестал подходить).
+        :return: True, если путь можно определить заново.
+        """
+        with self._lock:
+            if self.driver_path or self.offline or not self._pinned:
+                return False
+            self._resolved = None
+            self._pinned = False
+            if self.pin_file and os.path.exists(self.pin_file):
+                os.remove(self.pin_file)
+            return True
+
+    def acquire_profile(self):
+        """
+        Выделяет директорию профиля Chrome. Одну директорию не могут использовать два браузера одновременно,
+        поэтому каждому запущенному браузеру выдается свой слот, освобождаемый при закрытии. Слот занят,
+        пока на его файл slot-N.lock держится исключительная блокировка, в том числе другим процессом;
+        блокировка снимается и при аварийном завершении процесса.
+        :return: Путь к директории профиля или None, если теплый старт не настроен.
+        """
+        if not self.profile_dir:
+            return None
+        os.makedirs(self.profile_dir, exist_ok=True)
+        with self._lock:
+            slot = 1
+            while True:
+                if slot not in self._slot_locks:
+                    lock_file = _try_lock(os.path.join(self.profile_dir, f"slot-{slot}.lock"))
+                    if lock_file is not None:
+                        self._slot_locks[slot] = lock_file
+                        break
+                slot += 1
+        path = os.path.abspath(os.path.join(self.profile_dir, f"slot-{slot}"))
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def register(self, driver, path):
+        """
+        Связывает запущенный браузер с выделенной ему директорией профиля.
+        :param driver: WebDriver объект.
+        :param path: Путь, полученный из acquire_profile.
+        """
+        if path:
+            with self._lock:
+                self._profiles[driver.session_id] = path
+
+    def release(self, driver=None, path=None):
+        """
+        Возвращает директорию профиля закрытого браузера (или явно переданную) в пул.
+        :param driver: WebDriver объект.
+        :param path: Путь, полученный из acquire_profile (если браузер не был запущен).
+        """
+        with self._lock:
+            if driver is not None:
+                path = self._profiles.pop(driver.session_id, None)
+            if path:
+                lock_file = self._slot_locks.pop(int(os.path.basename(path).split("-", 1)[1]), None)
+                if lock_file is not None:
+                    _unlock(lock_file)
+
+    def record_startup(self, seconds, warm):
+        """
+        Учитывает время запуска браузера.
+        :param seconds: Длительность запуска в секундах.
+        :param warm: Запущен ли браузер с существующим профилем.
+        """
+        with self._lock:
+            self._startups.append((seconds, warm))
+
+    def stats(self):
+        """
+        :return: Словарь со статистикой запусков или None, если запусков не было.
+        """
+        with self._lock:
+            if not self._startups:
+                return None
+            times = [seconds for seconds, _ in self._startups]
+            return {
+                "starts": len(times),
+                "warm_starts": sum(1 for _, warm in self._startups if warm),
+                "avg_seconds": round(sum(times) / len(times), 2),
+                "max_seconds": round(max(times), 2),
+            }
+
+    def _resolve_locked(self):
+        """
+        Определяет путь к драйверу. Вызывается под блокировкой.
+        """
+        if self.driver_path:
+            if not os.path.isfile(self.driver_path):
+                raise FileNotFoundError(f"ChromeDriver не найден: {self.driver_path}")
+            return self.driver_path
+
+        pinned = self._read_pin()
+        if pinned:
+            self._pinned = True
+            return pinned
+
+        if self.offline:
+            raise RuntimeError("Офлайн-запуск: укажите driver.path или запустите парсер один раз с доступом к сети.")
+
+        path = ChromeDriverManager().install()
+        self._write_pin(path)
+        return path
+
+    def _read_pin(self):
+        """
+        :return: Закрепленный путь к драйверу, если он существует и не устарел.
+        """
+        if not self.pin_file or not os.path.exists(self.pin_file):
+            return None
+        try:
+            with open(self.pin_file, "r", encoding="utf-8") as file:
+                pin = json.load(file)
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning(f"Не удалось прочитать закрепленный путь к ChromeDriver: {e}")
+            return None
+
+        path = pin.get("path")
+        if not path or not os.path.isfile(path):
+            return None
+        age_days = (time.time() - pin.get("resolved_at", 0)) / 86400
+        if age_days > self.max_age_days and not self.offline:
+            logger.info("Закрепленный путь к ChromeDriver устарел, версия будет проверена заново.")
+            return None
+        return path
+
+    def _write_pin(self, path):
+        """
+        Закрепляет путь к драйверу в pin_file.
+        :param path: Путь к исполняемому файлу драйвера.
+        """
+        if not self.pin_file:
+            return
+        try:
+            directory = os.path.dirname(os.path.abspath(self.pin_file))
+            os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.pin_file}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump({"path": path, "resolved_at": int(time.time())}, file)
+            os.replace(tmp_path, self.pin_file)
+            self._pinned = True
+        except OSError as e:
+            logger.warning(f"Не удалось закрепить путь к ChromeDriver: {e}")
+
+def _try_lock(path):
+    """
+    Пытается без ожидания взять исключительную блокировку файла.
+    :param path: Путь к файлу блокировки (создается при необходимости).
+    :return: Открытый файл, который держит блокировку, или None, если файл заблокирован.
+    """
+    lock_file = open(path, "a+")
+    try:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        lock_file.close()
+        return None
+    return lock_file
+
+def _unlock(lock_file):
+    """
+    Снимает блокировку, взятую _try_lock, и закрывает файл.
+    :param lock_file: Файл, возвращенный _try_lock.
+    """
+    try:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+    finally:
+        lock_file.close()
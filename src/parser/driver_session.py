@@ -0,0 +1,213 @@
+import random
+import threading
+import time
+
+from selenium.common.exceptions import InvalidSessionIdException, NoSuchWindowException, WebDriverException
+
+from src.utils.logger_setup import logger
+
+_FATAL_MESSAGES = ("tab crashed", "session deleted", "disconnected", "not connected to devtools", "chrome not reachable")
+"""Фрагменты сообщений WebDriverException, после которых браузер уже не восстановится."""
+
+class RetryPolicy:
+    """
+    Правила повторов и перезапуска браузера: сколько раз повторять сбор матча, паузы между попытками
+    (экспоненциальный рост со случайным разбросом) и после скольких ошибок подряд или страниц браузер перезапускается.
+    """
+
+    def __init__(self, attempts=3, base_delay=2.0, max_delay=30.0, jitter=0.2,
+                 recycle_after_failures=3, recycle_after_pages=200):
+        """
+        :param attempts: Количество попыток сбора одного матча.
+        :param base_delay: Пауза перед второй попыткой в секундах; перед каждой следующей удваивается.
+        :param max_delay: Верхняя граница паузы в секундах.
+        :param jitter: Доля случайного разброса паузы (0.2 — ±20%).
+        :param recycle_after_failures: После скольких ошибок подряд браузер перезапускается. 0 — не перезапускать.
+        :param recycle_after_pages: После скольких страниц матчей браузер перезапускается,
+            чтобы ограничить рост памяти Chrome. 0 — не перезапускать.
+        """
+        self.attempts = max(1, attempts)
+        self.base_delay = max(0.0, base_delay)
+        self.max_delay = max(self.base_delay, max_delay)
+        self.jitter = max(0.0, jitter)
+        self.recycle_after_failures = recycle_after_failures
+        self.recycle_after_pages = recycle_after_pages
+
+    @classmethod
+    def from_settings(cls, retry_settings):
+        """
+        :param retry_settings: Секция "retry" настроек.
+        :return: Объект RetryPolicy.
+        """
+        return cls(
+            attempts=retry_settings.get("attempts", 3),
+            base_delay=retry_settings.get("base_delay", 2.0),
+            max_delay=retry_settings.get("max_delay", 30.0),
+            jitter=retry_settings.get("jitter", 0.2),
+            recycle_after_failures=retry_settings.get("recycle_after_failures", 3),
+            recycle_after_pages=retry_settings.get("recycle_after_pages", 200),
+        )
+
+    def delay(self, attempt):
+        """
+        :param attempt: Номер неудачной попытки (с 1).
+        :return: Пауза перед следующей попыткой в секундах.
+        """
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+class DriverSession:
+    """
+    Браузер воркера, который перезапускается при деградации: после recycle_after_failures ошибок подряд,
+    после recycle_after_pages загруженных страниц, при потере сессии или падении вкладки,
+    а также если браузер не отвечает на проверку перед заданием. Перезапуск выполняется
+    в безопасной точке — перед следующим матчем или заданием, — а не посреди сбора страницы.
+    """
+
+    def __init__(self, start, stop, policy=None, name="WebDriver"):
+        """
+        :param start: Функция без аргументов, запускающая браузер и возвращающая WebDriver.
+        :param stop: Функция, закрывающая переданный WebDriver.
+        :param policy: RetryPolicy с порогами перезапуска.
+        :param name: Имя браузера для логов (например, "Воркер 2").
+        """
+        self.policy = policy or RetryPolicy()
+        self.name = name
+        self.restarts = 0
+        self._start = start
+        self._stop = stop
+        self._driver = None
+        self._pages = 0
+        self._failures = 0
+        self._recycle_reason = None
+        self._lock = threading.Lock()
+
+    @property
+    def driver(self):
+        """
+        :return: Рабочий WebDriver; если назначен перезапуск, браузер перезапускается.
+        """
+        with self._lock:
+            if self._recycle_reason is not None and self._driver is not None:
+                self._restart_locked()
+            if self._driver is None:
+                self._driver = self._start()
+            return self._driver
+
+    @property
+    def current_driver(self):
+        """
+        :return: Запущенный WebDriver без перезапуска и запуска браузера; None, если браузер не запущен
+            или назначен его перезапуск.
+        """
+        with self._lock:
+            return self._driver if self._recycle_reason is None else None
+
+    def ensure_healthy(self):
+        """
+        Быстрая проверка браузера перед заданием: вкладка доступна и выполняет скрипт.
+        Неотвечающий браузер перезапускается.
+        :return: Рабочий WebDriver.
+        """
+        driver = self.driver
+        try:
+            driver.execute_script("return document.readyState")
+            if not driver.window_handles:
+                raise NoSuchWindowException("нет открытых вкладок")
+        except Exception as e:
+            self.recycle(f"браузер не прошел проверку: {e.__class__.__name__}")
+            driver = self.driver
+        return driver
+
+    def page_done(self, pages=1):
+        """
+        Учитывает успешно загруженные страницы матчей и сбрасывает счетчик ошибок подряд.
+        :param pages: Количество страниц.
+        """
+        with self._lock:
+            self._pages += pages
+            self._failures = 0
+            limit = self.policy.recycle_after_pages
+            if limit and self._pages >= limit and self._recycle_reason is None:
+                self._recycle_reason = f"загружено страниц: {self._pages}"
+
+    def failure(self, error):
+        """
+        Учитывает ошибку сбора. После recycle_after_failures ошибок подряд или ошибки,
+        означающей потерю браузера, назначается перезапуск.
+        :param error: Исключение.
+        """
+        with self._lock:
+            self._failures += 1
+            limit = self.policy.recycle_after_failures
+            if self._recycle_reason is not None:
+                return
+            if is_fatal_error(error):
+                self._recycle_reason = f"браузер недоступен: {error.__class__.__name__}"
+            elif limit and self._failures >= limit:
+                self._recycle_reason = f"ошибок подряд: {self._failures}"
+
+    def recycle(self, reason):
+        """
+        Назначает перезапуск браузера; он выполняется при следующем обращении к driver.
+        :param reason: Причина для лога.
+        """
+        with self._lock:
+            self._recycle_reason = reason
+
+    def close(self):
+        """
+        Закрывает браузер.
+        """
+        with self._lock:
+            if self._driver is not None:
+                self._quit_locked()
+        if self.restarts:
+            logger.info(f"{self.name}: браузер перезапускался {self.restarts} раз.")
+
+    def _restart_locked(self):
+        """
+        Закрывает текущий браузер. Новый запускается при следующем обращении к driver. Вызывается под блокировкой.
+        """
+        logger.warning(f"{self.name}: перезапуск браузера ({self._recycle_reason}).")
+        self._quit_locked()
+        self.restarts += 1
+
+    def _quit_locked(self):
+        """
+        Закрывает браузер и сбрасывает счетчики. Вызывается под блокировкой.
+        """
+        driver, self._driver = self._driver, None
+        self._pages = 0
+        self._failures = 0
+        self._recycle_reason = None
+        try:
+            self._stop(driver)
+        except Exception as e:
+            logger.warning(f"{self.name}: ошибка при закрытии браузера: {e}")
+
+def is_fatal_error(error):
+    """
+    :param error: Исключение.
+    :return: True, если после такой ошибки браузер нужно перезапустить.
+    """
+    if isinstance(error, InvalidSessionIdException):
+        return True
+    if isinstance(error, WebDriverException):
+        message = (error.msg or str(error)).lower()
+        return any(fragment in message for fragment in _FATAL_MESSAGES)
+    return False
+
+def retry_delay(policy, attempt, link, error):
+    """
+    Выдерживает паузу перед повтором сбора матча.
+    :param policy: RetryPolicy.
+    :param attempt: Номер неудачной попытки.
+    :param link: Ссылка на страницу матча.
+    :param error: Ошибка или описание неполных данных.
+    """
+    delay = policy.delay(attempt)
+    logger.warning(
+        f"Попытка {attempt}/{policy.attempts} сбора матча не удалась: {link}: {error}. Повтор через {delay:.1f} с."
+    )
+    time.sleep(delay)
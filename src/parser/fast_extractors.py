@@ -0,0 +1,373 @@
+from collections import namedtuple
+
+from bs4 import BeautifulSoup
+
+from src.parser.data_collectors import (
+    parse_xg_statistics,
+    parse_preview,
+    parse_match_score_prediction,
+    parse_fixture_links
+)
+from src.utils.logger_setup import logger
+from src.utils.stage_metrics import metrics
+
+try:
+    import lxml.html
+except ImportError:
+    lxml = None
+
+BASE_URL = "https://xgscore.io"
+
+Selector = namedtuple("Selector", ["tag", "cls", "id_contains", "all_classes"], defaults=(None, None, ()))
+"""
+Селектор элемента: тег и класс с семантикой BeautifulSoup (строка с пробелами сравнивается
+с атрибутом class целиком, одиночный класс ищется среди классов элемента),
+подстрока атрибута id или набор классов, каждый из которых должен присутствовать (как в CSS).
+"""
+
+Field = namedtuple(
+    "Field",
+    ["keys", "kind", "anchor", "index", "within", "children", "min_anchors", "min_values", "default"],
+    defaults=(0, None, (), 1, 2, None)
+)
+"""
+Описание поля результата:
+- keys: имена полей результата;
+- kind: "text" (текст первого дочернего элемента), "mark" ("метка (оценка)" из двух дочерних элементов),
+  "pair" (два значения из списка дочерних элементов), "values" (href первого дочернего элемента каждого якоря);
+- anchor: селектор якорного элемента, найденного за один проход по документу;
+- index: номер якорного элемента среди найденных (поддерживаются отрицательные);
+- within: селектор промежуточного элемента внутри якоря;
+- children: селекторы дочерних элементов;
+- min_anchors: минимальное количество найденных якорей;
+- min_values: минимальное количество значений для "pair";
+- default: значение по умолчанию, если поле не найдено (None — поле не добавляется).
+"""
+
+LABEL = Selector("p", "bold-text text-medium text-sm-small")
+MARK = Selector("span", "text-medium text-sm-tiny")
+KEY_STAT_VALUE = Selector("span", "text-sm-small ng-star-inserted")
+FORECAST_CARD = Selector("div", "xgs-category-forecast-card_header")
+FORECAST_COLUMN = Selector("div", "col-3 col-lg-6 m-xs-0 p-xs-0 ng-star-inserted")
+KEY_STAT_BLOCK = Selector("div", "mb-6")
+RECENT_GOALS = Selector("xgs-recent-goals-bar-group", "ng-star-inserted")
+
+PREVIEW_SPEC = (
+    Field(("team_name_1",), "text", Selector("div", "mx-4 mx-lg-3 mx-xs-1 text-md-center my-md-1"),
+          children=(Selector("strong", "xgs-game-header_team-name"),), default=""),
+    Field(("team_name_2",), "text", Selector("div", "mx-4 mx-lg-3 mx-xs-1 text-right text-md-center my-md-1"),
+          children=(Selector("strong", "xgs-game-header_team-name"),), default=""),
+    Field(("winner",), "mark", FORECAST_CARD, 0, children=(LABEL, MARK)),
+    Field(("total_under",), "mark", FORECAST_CARD, 1, children=(LABEL, MARK), min_anchors=2),
+    Field(("both_to_score",), "mark", FORECAST_COLUMN, 0, children=(LABEL, MARK)),
+    Field(("correct_score",), "mark", FORECAST_COLUMN, 1, children=(LABEL, MARK), min_anchors=2),
+    Field(("team_rating_home", "team_rating_away"), "pair", KEY_STAT_BLOCK, 0, children=(KEY_STAT_VALUE,)),
+    Field(("team_form_home", "team_form_away"), "pair", KEY_STAT_BLOCK, 1, children=(KEY_STAT_VALUE,),
+          min_anchors=2),
+    Field(("xg_luckiness_home", "xg_luckiness_away"), "pair", KEY_STAT_BLOCK, -1, children=(KEY_STAT_VALUE,),
+          min_anchors=3),
+    Field(("xg_predictability_home", "xg_predictability_away"), "pair", Selector("div", "mb-3 ng-star-inserted"),
+          children=(KEY_STAT_VALUE,)),
+    Field(("avg_xg_scored_home", "avg_xg_scored_away"), "pair", RECENT_GOALS, within=Selector("div", "mb-6"),
+          children=(KEY_STAT_VALUE,)),
+    Field(("avg_xg_conceded_home", "avg_xg_conceded_away"), "pair", RECENT_GOALS, within=Selector("div", "mb-3"),
+          children=(KEY_STAT_VALUE,)),
+)
+
+XG_ROW = Selector("div", "xgs-game-statistics-details-row")
+
+XG_STATISTICS_SPEC = (
+    Field(("goals_team_1",), "text", XG_ROW, 0, children=(Selector("strong", "text-primary"),), min_anchors=2),
+    Field(("goals_team_2",), "text", XG_ROW, 0, children=(Selector("strong", "text-secondary"),), min_anchors=2),
+    Field(("expected_goals_team_1",), "text", XG_ROW, 1, children=(Selector("strong", "text-primary"),),
+          min_anchors=2),
+    Field(("expected_goals_team_2",), "text", XG_ROW, 1, children=(Selector("strong", "text-secondary"),),
+          min_anchors=2),
+)
+
+PREDICTION_SPEC = (
+    Field(("match_score_prediction_home", "match_score_prediction_away"), "pair",
+          Selector(None, id_contains="xgs-game-result"),
+          children=(Selector("mark", all_classes=("xgs-mark", "-huge")), Selector("strong"))),
+)
+
+FIXTURE_LINKS_SPEC = (
+    Field(("links",), "values", Selector("xgs-xg-game-fixture", "xgs-panel ng-star-inserted"), index=None,
+          children=(Selector("a"),)),
+)
+
+class CompiledSpec:
+    """
+    Набор полей, скомпилированный в таблицу селекторов по тегам.
+    Все якорные элементы находятся за один проход по дереву lxml,
+    после чего поля извлекаются из небольших поддеревьев якорей.
+    """
+
+    def __init__(self, fields):
+        """
+        :param fields: Последовательность объектов Field.
+        """
+        self.fields = tuple(fields)
+        self.anchors = []
+        for field in self.fields:
+            if field.anchor not in self.anchors:
+                self.anchors.append(field.anchor)
+
+        self._anchor_of = tuple(self.anchors.index(field.anchor) for field in self.fields)
+
+        self._by_tag = {}
+        self._by_id = []
+        for idx, anchor in enumerate(self.anchors):
+            if anchor.id_contains is not None:
+                self._by_id.append((idx, anchor))
+            else:
+                self._by_tag.setdefault(anchor.tag, []).append((idx, _class_matcher(anchor)))
+
+    def extract(self, root):
+        """
+        Извлекает поля из дерева документа.
+        :param root: Корневой элемент lxml.
+        :return: Словарь с данными.
+        """
+        hits = [[] for _ in self.anchors]
+        by_tag = self._by_tag
+        by_id = self._by_id
+
+        for element in root.iter():
+            tag = element.tag
+            if not isinstance(tag, str):
+                continue
+            matchers = by_tag.get(tag)
+            if matchers:
+                tokens = (element.get("class") or "").split()
+                for idx, matcher in matchers:
+                    if matcher(tokens):
+                        hits[idx].append(element)
+            if by_id:
+                element_id = element.get("id")
+                if element_id:
+                    for idx, anchor in by_id:
+                        if anchor.id_contains in element_id and (anchor.tag is None or anchor.tag == tag):
+                            hits[idx].append(element)
+
+        data = {}
+        for field, anchor_idx in zip(self.fields, self._anchor_of):
+            _apply_field(field, hits[anchor_idx], data)
+        return data
+
+@metrics.timed("parse.preview")
+def extract_preview(html, root=None):
+    """
+    Собирает данные вкладки preview из HTML за один проход по дереву lxml.
+    При ошибке использует parse_preview (BeautifulSoup).
+    :param html: HTML вкладки preview.
+    :param root: Уже построенное дерево lxml этого HTML (необязательно).
+    :return: Словарь с данными вкладки preview.
+    """
+    try:
+        data = _PREVIEW.extract(root if root is not None else _parse(html))
+        logger.debug("Данные с вкладки preview собраны: {}", data)
+        return data
+    except Exception as e:
+        logger.warning(f"Быстрое извлечение preview не удалось, используется BeautifulSoup: {e}")
+        return parse_preview(BeautifulSoup(html, "lxml"))
+
+@metrics.timed("parse.xg_statistics")
+def extract_xg_statistics(html, root=None):
+    """
+    Собирает данные вкладки xg-statistics из HTML за один проход по дереву lxml.
+    При ошибке использует parse_xg_statistics (BeautifulSoup).
+    :param html: HTML вкладки xg-statistics.
+    :param root: Уже построенное дерево lxml этого HTML (необязательно).
+    :return: Словарь с данными вкладки xg-statistics.
+    """
+    try:
+        data = _XG_STATISTICS.extract(root if root is not None else _parse(html))
+        result = {key: data.get(key) for key in (
+            "goals_team_1", "goals_team_2", "expected_goals_team_1", "expected_goals_team_2"
+        )}
+        logger.debug("Данные с xg-statistics собраны: {}", result)
+        return result
+    except Exception as e:
+        logger.warning(f"Быстрое извлечение xg-statistics не удалось, используется BeautifulSoup: {e}")
+        return parse_xg_statistics(BeautifulSoup(html, "lxml"))
+
+@metrics.timed("parse.match_score_prediction")
+def extract_match_score_prediction(html, root=None):
+    """
+    Собирает прогноз счета матча из HTML вкладки preview.
+    При ошибке использует parse_match_score_prediction (BeautifulSoup).
+    :param html: HTML вкладки preview.
+    :param root: Уже построенное дерево lxml этого HTML (необязательно).
+    :return: Словарь с данными прогноза счета.
+    """
+    try:
+        return _PREDICTION.extract(root if root is not None else _parse(html))
+    except Exception as e:
+        logger.warning(f"Быстрое извлечение прогноза счета не удалось, используется BeautifulSoup: {e}")
+        return parse_match_score_prediction(BeautifulSoup(html, "lxml"))
+
+@metrics.timed("parse.fixture_links")
+def extract_fixture_links(html):
+    """
+    Собирает ссылки на страницы матчей из HTML списка матчей игровой недели.
+    При ошибке использует parse_fixture_links (BeautifulSoup).
+    :param html: HTML страницы со списком матчей.
+    :return: Список абсолютных ссылок.
+    """
+    try:
+        return [BASE_URL + href for href in _FIXTURE_LINKS.extract(_parse(html)).get("links", [])]
+    except Exception as e:
+        logger.warning(f"Быстрое извлечение ссылок на матчи не удалось, используется BeautifulSoup: {e}")
+        return parse_fixture_links(BeautifulSoup(html, "lxml"))
+
+def extract_match_pages(xg_html, preview_html, xg_root=None):
+    """
+    Собирает данные матча из HTML вкладок xg-statistics и preview.
+    Дерево каждой вкладки строится один раз.
+    :param xg_html: HTML вкладки xg-statistics.
+    :param preview_html: HTML вкладки preview.
+    :param xg_root: Уже построенное дерево lxml вкладки xg-statistics (необязательно).
+    :return: Словарь с данными матча.
+    """
+    preview_root = _parse_or_none(preview_html)
+    if xg_root is None:
+        xg_root = _parse_or_none(xg_html)
+    return {
+        "preview": extract_preview(preview_html, preview_root),
+        "match_score_prediction": extract_match_score_prediction(preview_html, preview_root),
+        "xg_statistics": extract_xg_statistics(xg_html, xg_root),
+    }
+
+def _parse(html):
+    """
+    Строит дерево lxml из HTML.
+    :param html: Текст HTML.
+    :return: Корневой элемент.
+    """
+    if lxml is None:
+        raise RuntimeError("lxml не установлен.")
+    return lxml.html.fromstring(html)
+
+def _parse_or_none(html):
+    """
+    Строит дерево lxml, возвращая None при ошибке (тогда извлечение перейдет на BeautifulSoup).
+    :param html: Текст HTML.
+    :return: Корневой элемент или None.
+    """
+    try:
+        return _parse(html)
+    except Exception:
+        return None
+
+def _class_matcher(selector):
+    """
+    Создает проверку классов элемента по селектору с семантикой BeautifulSoup.
+    :param selector: Объект Selector.
+    :return: Функция от списка классов элемента.
+    """
+    cls = selector.cls
+    if selector.all_classes:
+        wanted = set(selector.all_classes)
+        return lambda tokens: wanted.issubset(tokens)
+    if cls is None:
+        return lambda tokens: True
+    if " " in cls:
+        wanted = cls.split()
+        return lambda tokens: tokens == wanted
+    return lambda tokens: cls in tokens
+
+def _matches(element, selector):
+    """
+    Проверяет элемент на соответствие селектору.
+    :param element: Элемент lxml.
+    :param selector: Объект Selector.
+    :return: True при совпадении.
+    """
+    if selector.tag is not None and element.tag != selector.tag:
+        return False
+    if selector.id_contains is not None and selector.id_contains not in (element.get("id") or ""):
+        return False
+    return _class_matcher(selector)((element.get("class") or "").split())
+
+def _find_all(element, selector):
+    """
+    Находит потомков элемента, соответствующих селектору, в порядке документа.
+    :param element: Элемент lxml.
+    :param selector: Объект Selector.
+    :return: Список элементов.
+    """
+    iterator = element.iterdescendants(selector.tag) if selector.tag else element.iterdescendants()
+    return [child for child in iterator if isinstance(child.tag, str) and _matches(child, selector)]
+
+def _find_first(element, selector):
+    """
+    Находит первого потомка элемента, соответствующего селектору.
+    :param element: Элемент lxml.
+    :param selector: Объект Selector.
+    :return: Элемент или None.
+    """
+    iterator = element.iterdescendants(selector.tag) if selector.tag else element.iterdescendants()
+    for child in iterator:
+        if isinstance(child.tag, str) and _matches(child, selector):
+            return child
+    return None
+
+def _text(element):
+    """
+    :param element: Элемент lxml.
+    :return: Текст элемента и его потомков без пробелов по краям.
+    """
+    return "".join(element.itertext()).strip()
+
+def _apply_field(field, anchors, data):
+    """
+    Извлекает значение поля из найденных якорных элементов и записывает его в data.
+    :param field: Объект Field.
+    :param anchors: Якорные элементы в порядке документа.
+    :param data: Словарь результата.
+    """
+    if field.kind == "values":
+        values = []
+        for anchor in anchors:
+            child = _find_first(anchor, field.children[0])
+            if child is not None and child.get("href"):
+                values.append(child.get("href"))
+        data[field.keys[0]] = values
+        return
+
+    if len(anchors) < field.min_anchors:
+        if field.default is not None:
+            data[field.keys[0]] = field.default
+        return
+
+    element = anchors[field.index]
+    if field.within is not None:
+        element = _find_first(element, field.within)
+        if element is None:
+            return
+
+    if field.kind == "text":
+        child = _find_first(element, field.children[0])
+        if child is not None:
+            data[field.keys[0]] = _text(child)
+        elif field.default is not None:
+            data[field.keys[0]] = field.default
+
+    elif field.kind == "mark":
+        label = _find_first(element, field.children[0])
+        mark = _find_first(element, field.children[1])
+        data[field.keys[0]] = f"{_text(label) if label is not None else ''} ({_text(mark) if mark is not None else ''})"
+
+    elif field.kind == "pair":
+        values = _find_all(element, field.children[0])
+        if len(field.children) > 1:
+            values = [child for value in values for child in _find_all(value, field.children[1])]
+        if len(values) >= field.min_values:
+            data[field.keys[0]] = _text(values[0])
+            data[field.keys[1]] = _text(values[1])
+
+_PREVIEW = CompiledSpec(PREVIEW_SPEC)
+_XG_STATISTICS = CompiledSpec(XG_STATISTICS_SPEC)
+_PREDICTION = CompiledSpec(PREDICTION_SPEC)
+_FIXTURE_LINKS = CompiledSpec(FIXTURE_LINKS_SPEC)
@@ -0,0 +1,145 @@
+import re
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from src.parser.user_agent import get_random_user_agent
+from src.parser.fast_extractors import BASE_URL, extract_match_pages
+from src.utils.page_cache import TAB_XG_STATISTICS, TAB_PREVIEW
+
+from src.utils.logger_setup import logger
+from src.utils.stage_metrics import metrics
+
+_ANCHOR = re.compile(r"<a\b[^>]*>", re.IGNORECASE)
+_ATTRIBUTE = re.compile(r'\b(class|href)\s*=\s*"([^"]*)"')
+
+class HttpFetcher:
+    """
+    Легковесный путь получения данных матча: загружает HTML вкладок xg-statistics и preview
+    через пул HTTP-соединений, без запуска браузера.
+    Если сервер отдает страницу без отрендеренных данных, возвращает None,
+    и матч обрабатывается через WebDriver.
+    """
+
+    def __init__(self, timeout=10, pool_size=10, retries=2, limiter=None, pacer=None, base_url=None):
+        """
+        :param timeout: Таймаут одного запроса в секундах.
+        :param pool_size: Максимальное количество соединений в пуле.
+        :param retries: Количество повторов при сетевых ошибках и ответах 5xx.
+        :param limiter: Общий PolitenessLimiter для всех запросов к сайту.
+        :param pacer: Общий Pacer, ограничивающий частоту запросов.
+        :param base_url: Адрес, по которому запросы к сайту отправляются вместо BASE_URL
+            (например, локальный сервер с записанными страницами). None — запросы идут на сайт.
+        """
+        self.timeout = timeout
+        self.base_url = base_url.rstrip("/") if base_url else None
+        self.limiter = limiter
+        self.pacer = pacer
+        self.session = requests.Session()
+        self.session.headers.update({
+            "User-Agent": get_random_user_agent(),
+            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+            "Accept-Language": "en-US,en;q=0.9",
+        })
+
+        retry = Retry(total=retries, backoff_factor=0.5, status_forcelist=(500, 502, 503, 504))
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def fetch(self, url):
+        """
+        Загружает HTML страницы.
+        :param url: Адрес страницы.
+        :return: Текст HTML.
+        """
+        if self.base_url and url.startswith(BASE_URL):
+            url = self.base_url + url[len(BASE_URL):]
+        with metrics.stage("http.fetch"):
+            if self.limiter is not None:
+                with self.limiter:
+                    return self._get(url)
+            return self._get(url)
+
+    def _get(self, url):
+        """
+        Выполняет GET-запрос с учетом темпа работы.
+        :param url: Адрес страницы.
+        :return: Текст HTML.
+        """
+        if self.pacer is not None:
+            with self.pacer.request():
+                response = self.session.get(url, timeout=self.timeout)
+                response.raise_for_status()
+        else:
+            response = self.session.get(url, timeout=self.timeout)
+            response.raise_for_status()
+        return response.text
+
+    def fetch_pages(self, link):
+        """
+        Загружает HTML вкладок xg-statistics и preview матча без разбора.
+        :param link: Ссылка на страницу матча (вкладка xg-statistics).
+        :return: Словарь {вкладка: HTML}.
+        """
+        xg_html = self.fetch(link)
+        preview_html = self.fetch(_preview_url(xg_html, link))
+        return {TAB_XG_STATISTICS: xg_html, TAB_PREVIEW: preview_html}
+
+    def collect_match(self, link, pages=None):
+        """
+        Собирает данные матча по HTTP.
+        :param link: Ссылка на страницу матча (вкладка xg-statistics).
+        :param pages: Словарь, в который записывается HTML загруженных вкладок (для кэша страниц).
+        :return: Словарь с данными матча или None, если данные получить не удалось.
+        """
+        try:
+            fetched = self.fetch_pages(link)
+            statistic = extract_match_pages(fetched[TAB_XG_STATISTICS], fetched[TAB_PREVIEW])
+
+        except Exception as e:
+            logger.warning(f"HTTP-загрузка матча не удалась, будет использован браузер: {link}: {e}")
+            return None
+
+        if not is_complete(statistic):
+            logger.info(f"HTML матча не содержит отрендеренных данных, будет использован браузер: {link}")
+            return None
+
+        if pages is not None:
+            pages.update(fetched)
+        return statistic
+
+    def close(self):
+        """
+        Закрывает пул соединений.
+        """
+        self.session.close()
+
+def _preview_url(html, link):
+    """
+    Определяет адрес вкладки preview по ссылке на вкладку в HTML, либо по адресу матча.
+    Ссылка ищется по тегам <a> без построения дерева, чтобы загрузка не ждала разбора страницы.
+    :param html: HTML вкладки xg-statistics.
+    :param link: Ссылка на страницу матча.
+    :return: Адрес вкладки preview.
+    """
+    for tag in _ANCHOR.findall(html or ""):
+        attributes = dict(_ATTRIBUTE.findall(tag))
+        href = attributes.get("href", "")
+        if "xgs-tab_link" in attributes.get("class", "").split() and "/preview" in href:
+            return href if href.startswith("http") else BASE_URL + href
+    return link.rstrip("/") + "/preview"
+
+def is_complete(statistic):
+    """
+    Проверяет, что HTML содержал отрендеренные данные матча.
+    :param statistic: Словарь с данными матча.
+    :return: True, если данных достаточно для записи.
+    """
+    preview_data = statistic["preview"]
+    return bool(
+        preview_data.get("team_name_1")
+        and preview_data.get("team_name_2")
+        and statistic["match_score_prediction"]
+    )
@@ -0,0 +1,405 @@
+import multiprocessing
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from src.parser.fast_extractors import extract_match_pages
+from src.parser.http_fetcher import is_complete
+from src.utils.logger_setup import logger, log_match
+from src.utils.match_record import MatchRecord
+from src.utils.page_cache import TAB_XG_STATISTICS, TAB_PREVIEW
+from src.utils.stage_metrics import metrics
+
+STAGES = ("fetch", "parse", "write")
+"""Стадии конвейера: загрузка страниц, разбор HTML с приведением к MatchRecord, запись в приемник."""
+
+_DONE = object()
+"""Маркер конца потока заданий в очереди стадии."""
+
+_QUEUE_TIMEOUT = 0.5
+"""Интервал в секундах, с которым ожидающий очередь поток проверяет, не остановлен ли конвейер."""
+
+class MatchPipeline:
+    """
+    Поточная обработка матчей игровой недели. Загрузка страниц, разбор HTML и запись выполняются одновременно
+    в отдельных стадиях, связанных ограниченными очередями: пока браузер или HTTP-клиент загружает следующий матч,
+    предыдущие разбираются и записываются. Если очередь следующей стадии заполнена, предыдущая ждет
+    (обратное давление), поэтому между стадиями хранится не больше queue_size матчей. Если поток стадии
+    завершается с необработанной ошибкой, конвейер останавливается: остальные стадии перестают ждать очередей,
+    а проход завершается исключением.
+    HTML разбирается в пуле процессов, чтобы lxml использовал остальные ядра процессора.
+    По каждой стадии учитывается загрузка: доля времени работы, ожидания входной очереди и места в выходной.
+    """
+
+    def __init__(self, fetch_threads=4, parse_processes=2, queue_size=8):
+        """
+        :param fetch_threads: Количество потоков загрузки по HTTP. Браузер всегда загружает матчи в одном потоке.
+        :param parse_processes: Количество процессов разбора HTML. 0 — разбор в одном потоке текущего процесса.
+        :param queue_size: Емкость очередей между стадиями.
+        """
+        self.fetch_threads = max(1, fetch_threads)
+        self.parse_processes = max(0, parse_processes)
+        self.queue_size = max(1, queue_size)
+        self._executor = None
+        self._lock = threading.Lock()
+        self._totals = {stage: StageOccupancy(stage) for stage in STAGES}
+
+    @classmethod
+    def from_settings(cls, pipeline_settings):
+        """
+        :param pipeline_settings: Секция "pipeline" настроек.
+        :return: Объект MatchPipeline.
+        """
+        return cls(
+            fetch_threads=pipeline_settings.get("fetch_threads", 4),
+            parse_processes=pipeline_settings.get("parse_processes", 2),
+            queue_size=pipeline_settings.get("queue_size", 8),
+        )
+
+    def run(self, links, league_name, gameweek, context, collect):
+        """
+        Обрабатывает матчи игровой недели. Страницы берутся из кэша, загружаются по HTTP (если задан HttpFetcher)
+        или собираются в браузере функцией collect. Матчи, которые не удалось получить по HTTP,
+        после основного прохода собираются в браузере вторым проходом конвейера.
+        :param links: Список ссылок на страницы матчей.
+        :param league_name: Название лиги.
+        :param gameweek: Номер игровой недели.
+        :param context: Общий контекст запуска (ScrapeContext).
+        :param collect: Функция (ссылка, словарь страниц) -> данные матча, собирающая матч в браузере.
+        :raises RuntimeError: Если стадия конвейера остановилась с ошибкой.
+        """
+        items = [_MatchItem(idx, link) for idx, link in enumerate(links)]
+        job = _Job(len(links), league_name, gameweek, context, collect)
+
+        fallback = self._run_pass(items, job, use_http=context.fetcher is not None)
+        if fallback:
+            logger.info(f"Загрузка {len(fallback)} матчей в браузере.")
+            self._run_pass(sorted(fallback, key=lambda item: item.idx), job, use_http=False)
+
+    def occupancy(self):
+        """
+        :return: Список StageOccupancy стадий за весь запуск в порядке STAGES.
+        """
+        return [self._totals[stage] for stage in STAGES]
+
+    def report(self):
+        """
+        Выводит в лог загрузку стадий за весь запуск и стадию, которая ограничивает скорость.
+        """
+        stages = self.occupancy()
+        if not any(stage.items for stage in stages):
+            return
+        lines = [f"{'стадия':<10}{'матчей':>8}{'работа':>9}{'ждет вход':>11}{'ждет выход':>12}"]
+        for stage in stages:
+            lines.append(
+                f"{stage.name:<10}{stage.items:>8}{stage.share(stage.busy):>9.0%}"
+                f"{stage.share(stage.starved):>11.0%}{stage.share(stage.blocked):>12.0%}"
+            )
+        bottleneck = max(stages, key=lambda stage: stage.share(stage.busy))
+        logger.info(
+            "Загрузка стадий конвейера матчей:\n" + "\n".join(lines)
+            + f"\nУзкое место: {bottleneck.name} ({bottleneck.share(bottleneck.busy):.0%} времени в работе)."
+        )
+
+    def close(self):
+        """
+        Выводит отчет о загрузке стадий и останавливает пул процессов разбора.
+        """
+        self.report()
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    def _run_pass(self, items, job, use_http):
+        """
+        Один проход конвейера по списку матчей.
+        :param items: Список _MatchItem.
+        :param job: Параметры игровой недели (_Job).
+        :param use_http: Загружать страницы по HTTP; иначе матчи собираются в браузере.
+        :return: Список матчей, которые нужно собрать в браузере.
+        """
+        fallback = []
+        fetch_workers = self.fetch_threads if use_http else 1
+        parse_workers = max(1, self.parse_processes)
+        stats = {stage: StageOccupancy(stage) for stage in STAGES}
+
+        def fetch(item):
+            item.pages = job.context.cached_pages(item.link)
+            if item.pages is not None:
+                item.cached = True
+                return item
+            if use_http:
+                try:
+                    item.pages = job.context.fetcher.fetch_pages(item.link)
+                except Exception as e:
+                    logger.warning(f"HTTP-загрузка матча не удалась, будет использован браузер: {item.link}: {e}")
+                    fallback.append(item)
+                    return None
+                return item
+            item.pages = {}
+            item.statistic = job.collect(item.link, item.pages)
+            return item
+
+        def parse(item):
+            if item.statistic is None:
+                item.statistic = self._extract(item.pages)
+                if use_http and not item.cached and not is_complete(item.statistic):
+                    logger.info(f"HTML матча не содержит отрендеренных данных, будет использован браузер: {item.link}")
+                    item.statistic = item.pages = None
+                    fallback.append(item)
+                    return None
+            item.record = MatchRecord.from_match(item.statistic, job.league_name, job.gameweek)
+            return item
+
+        def write(item):
+            context = job.context
+            if not item.cached:
+                context.store_pages(item.link, item.statistic, item.pages, job.league_name, job.gameweek)
+            context.write(item.record, job.league_name)
+            context.record_match(item.link, item.statistic, job.league_name, job.gameweek)
+            log_match(
+                "Матч {}/{} сохранен: {} - {}", item.idx + 1, job.total, item.record.home_team, item.record.away_team
+            )
+
+        def fail(item, error):
+            logger.warning(f"Данные матча {item.idx + 1}/{job.total} не собраны: {item.link}: {error}.")
+            job.context.record_failure(item.link, job.league_name, job.gameweek, error)
+
+        links = queue.Queue()
+        for item in items:
+            links.put(item)
+        for _ in range(fetch_workers):
+            links.put(_DONE)
+        fetched = queue.Queue(maxsize=self.queue_size)
+        parsed = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+
+        started = time.perf_counter()
+        threads = (
+            _start_stage(stats["fetch"], fetch_workers, fetch, fail, links, fetched, parse_workers, stop)
+            + _start_stage(stats["parse"], parse_workers, parse, fail, fetched, parsed, 1, stop)
+            + _start_stage(stats["write"], 1, write, fail, parsed, None, 0, stop)
+        )
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        if stop.is_set():
+            raise RuntimeError(
+                f"Конвейер недели {job.gameweek} лиги '{job.league_name}' остановлен из-за ошибки стадии."
+            )
+
+        for stage, workers in zip(STAGES, (fetch_workers, parse_workers, 1)):
+            stats[stage].worker_seconds = workers * elapsed
+            self._totals[stage].merge(stats[stage])
+        logger.debug(
+            "Конвейер недели {} лиги '{}': {} матчей за {:.1f} с, работа стадий: {}.",
+            job.gameweek, job.league_name, len(items), elapsed,
+            ", ".join(f"{stage} {stats[stage].share(stats[stage].busy):.0%}" for stage in STAGES)
+        )
+        return fallback
+
+    def _extract(self, pages):
+        """
+        Разбирает HTML вкладок матча в пуле процессов (или в текущем потоке, если пул не используется).
+        :param pages: Словарь {вкладка: HTML}.
+        :return: Словарь с данными матча.
+        """
+        with metrics.stage("parse.match"):
+            executor = self._pool()
+            if executor is None:
+                return extract_match_pages(pages[TAB_XG_STATISTICS], pages[TAB_PREVIEW])
+            return executor.submit(extract_match_pages, pages[TAB_XG_STATISTICS], pages[TAB_PREVIEW]).result()
+
+    def _pool(self):
+        """
+        :return: Пул процессов разбора (создается при первом обращении) или None.
+        """
+        if not self.parse_processes:
+            return None
+        with self._lock:
+            if self._executor is None:
+                # Процессы запускаются через spawn: копировать fork-ом процесс с потоками браузеров и логгера небезопасно.
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.parse_processes,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_parse_process,
+                )
+            return self._executor
+
+class StageOccupancy:
+    """
+    Загрузка стадии конвейера: время работы, ожидания входной очереди и ожидания места в выходной очереди
+    в сумме по всем потокам стадии.
+    """
+
+    def __init__(self, name):
+        """
+        :param name: Имя стадии.
+        """
+        self.name = name
+        self.items = 0
+        self.busy = 0.0
+        self.starved = 0.0
+        self.blocked = 0.0
+        self.worker_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, busy=0.0, starved=0.0, blocked=0.0, items=0):
+        """
+        Добавляет замеры одного потока стадии.
+        """
+        with self._lock:
+            self.items += items
+            self.busy += busy
+            self.starved += starved
+            self.blocked += blocked
+
+    def merge(self, other):
+        """
+        Добавляет замеры другого прохода конвейера.
+        :param other: StageOccupancy той же стадии.
+        """
+        with self._lock:
+            self.items += other.items
+            self.busy += other.busy
+            self.starved += other.starved
+            self.blocked += other.blocked
+            self.worker_seconds += other.worker_seconds
+
+    def share(self, seconds):
+        """
+        :param seconds: Время в секундах (сумма по потокам стадии).
+        :return: Доля от общего времени потоков стадии.
+        """
+        return seconds / self.worker_seconds if self.worker_seconds else 0.0
+
+class _MatchItem:
+    """
+    Матч, передаваемый между стадиями конвейера.
+    """
+
+    __slots__ = ("idx", "link", "pages", "statistic", "record", "cached")
+
+    def __init__(self, idx, link):
+        self.idx = idx
+        self.link = link
+        self.pages = None
+        self.statistic = None
+        self.record = None
+        self.cached = False
+
+class _Job:
+    """
+    Параметры обработки одной игровой недели, общие для всех стадий.
+    """
+
+    __slots__ = ("total", "league_name", "gameweek", "context", "collect")
+
+    def __init__(self, total, league_name, gameweek, context, collect):
+        self.total = total
+        self.league_name = league_name
+        self.gameweek = gameweek
+        self.context = context
+        self.collect = collect
+
+def _start_stage(stats, workers, handler, fail, source, target, downstream_workers, stop):
+    """
+    Запускает потоки стадии. Каждый поток берет матч из source, обрабатывает его и кладет результат в target.
+    Когда завершается последний поток стадии, в target кладется по маркеру конца на каждый поток следующей стадии.
+    Если поток завершается с необработанной ошибкой, устанавливается stop; потоки всех стадий ждут очередей
+    с таймаутом и, увидев stop, завершаются, поэтому остановка одной стадии не блокирует остальные.
+    :param stats: StageOccupancy стадии.
+    :param workers: Количество потоков.
+    :param handler: Обработчик матча; возвращает матч для следующей стадии или None.
+    :param fail: Функция (матч, ошибка), вызываемая при исключении в обработчике.
+    :param source: Входная очередь.
+    :param target: Выходная очередь или None для последней стадии.
+    :param downstream_workers: Количество потоков следующей стадии.
+    :param stop: threading.Event остановки конвейера, общий для всех стадий прохода.
+    :return: Список запущенных потоков.
+    """
+    remaining = [workers]
+    lock = threading.Lock()
+
+    def work():
+        try:
+            while True:
+                waited = time.perf_counter()
+                item = _get(source, stop)
+                started = time.perf_counter()
+                if item is _DONE or item is None:
+                    stats.add(starved=started - waited)
+                    break
+
+                try:
+                    result = handler(item)
+                except Exception as e:
+                    fail(item, e)
+                    result = None
+                finished = time.perf_counter()
+                if result is not None and target is not None and not _put(target, result, stop):
+                    break
+                stats.add(
+                    busy=finished - started, starved=started - waited,
+                    blocked=time.perf_counter() - finished, items=1
+                )
+        except BaseException as e:
+            logger.error(f"Стадия конвейера {stats.name} остановлена из-за ошибки: {e}", exc_info=True)
+            stop.set()
+        finally:
+            with lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last and target is not None:
+                for _ in range(downstream_workers):
+                    if not _put(target, _DONE, stop):
+                        break
+
+    threads = [
+        threading.Thread(target=work, name=f"pipeline-{stats.name}-{number}", daemon=True)
+        for number in range(1, workers + 1)
+    ]
+    for thread in threads:
+        thread.start()
+    return threads
+
+def _get(source, stop):
+    """
+    Берет элемент из очереди, пока конвейер не остановлен.
+    :param source: Очередь.
+    :param stop: threading.Event остановки конвейера.
+    :return: Элемент или None, если конвейер остановлен.
+    """
+    while not stop.is_set():
+        try:
+            return source.get(timeout=_QUEUE_TIMEOUT)
+        except queue.Empty:
+            continue
+    return None
+
+def _put(target, item, stop):
+    """
+    Кладет элемент в ограниченную очередь, пока конвейер не остановлен.
+    :param target: Очередь.
+    :param item: Элемент.
+    :param stop: threading.Event остановки конвейера.
+    :return: True, если элемент положен; False, если конвейер остановлен.
+    """
+    while not stop.is_set():
+        try:
+            target.put(item, timeout=_QUEUE_TIMEOUT)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+def _init_parse_process():
+    """
+    Настраивает логгер процесса разбора: в консоль выводятся только предупреждения и ошибки
+    (например, переход на BeautifulSoup), подробные данные матчей не дублируются.
+    """
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
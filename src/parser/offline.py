@@ -0,0 +1,49 @@
+import os
+import time
+
+from src.parser.browser_manager import normalize_gameweeks
+from src.utils.logger_setup import logger
+from src.utils.output_writers import FORMAT_HISTORY
+
+def offline_output_settings(output_settings):
+    """
+    Настройки вывода офлайн-разбора. Сыгранные матчи в файлах лиг только дописываются, поэтому повторный разбор
+    в те же файлы продублировал бы их строки; все форматы записываются в отдельную директорию
+    <output.directory>/offline/<время запуска>. История прогнозов не пишется: время разбора — не время опроса сайта.
+    :param output_settings: Секция "output" настроек.
+    :return: Новая секция "output".
+    """
+    directory = os.path.join(output_settings.get("directory", "data"), "offline", time.strftime("%Y%m%d-%H%M%S"))
+    return dict(
+        output_settings,
+        formats=[name for name in output_settings.get("formats", ["excel"]) if name != FORMAT_HISTORY],
+        directory=directory,
+        excel_directory=directory,
+        sqlite_path=os.path.join(directory, "matches.sqlite3"),
+        parquet_directory=os.path.join(directory, "parquet"),
+    )
+
+def run_offline(config, context):
+    """
+    Повторно разбирает сохраненные в кэше страницы матчей без обращения к сайту и без браузера.
+    Используются в том числе просроченные записи кэша.
+    :param config: Список словарей с конфигурацией (лиги и игровые недели).
+    :param context: Общий контекст запуска (ScrapeContext) с заданным кэшем страниц.
+    """
+    if context.cache is None:
+        raise ValueError("Для офлайн-режима необходим кэш страниц (cache.enabled).")
+
+    for item in config:
+        league_name = item["league"]
+        gameweeks = normalize_gameweeks(item["gameweek"])
+        entries = context.cache.entries(league_name, gameweeks)
+        logger.info(f"Офлайн-разбор лиги '{league_name}': найдено {len(entries)} матчей в кэше.")
+
+        for url, _, gameweek in entries:
+            statistic = context.load_cached_match(url, allow_expired=True)
+            if statistic is None:
+                logger.warning(f"Страницы матча недоступны в кэше: {url}")
+                continue
+            context.save(statistic, league_name, gameweek)
+
+        logger.info(f"Завершен офлайн-разбор лиги '{league_name}'.")
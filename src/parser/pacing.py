@@ -0,0 +1,212 @@
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from selenium.webdriver.support.ui import WebDriverWait
+
+from src.utils.stage_metrics import metrics
+
+class PolitenessLimiter:
+    """
+    Глобальное ограничение нагрузки на сайт: не более max_in_flight одновременных запросов
+    и не менее min_interval секунд между началом соседних запросов.
+    Используется как контекстный менеджер вокруг каждого запроса.
+    """
+
+    def __init__(self, max_in_flight=4, min_interval=0.5):
+        """
+        :param max_in_flight: Максимальное количество одновременных запросов.
+        :param min_interval: Минимальный интервал между началом запросов в секундах.
+        """
+        self.max_in_flight = max(1, max_in_flight)
+        self.min_interval = max(0.0, min_interval)
+        self._slots = threading.BoundedSemaphore(self.max_in_flight)
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+
+    def wait_turn(self):
+        """
+        Ждет, пока с начала предыдущего запроса не пройдет min_interval.
+        """
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self.min_interval
+        if start > now:
+            time.sleep(start - now)
+
+    def __enter__(self):
+        self._slots.acquire()
+        try:
+            self.wait_turn()
+        except BaseException:
+            self._slots.release()
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._slots.release()
+        return False
+
+class AdaptiveRateLimiter:
+    """
+    Ограничитель частоты запросов по схеме token bucket.
+    При медленных ответах и ошибках скорость уменьшается в backoff_factor раз,
+    при быстрых успешных ответах постепенно восстанавливается на recovery_step.
+    """
+
+    def __init__(self, rate=0.5, burst=2, min_rate=0.05, max_rate=2.0,
+                 slow_threshold=8.0, backoff_factor=0.5, recovery_step=0.05):
+        """
+        :param rate: Начальная скорость (запросов в секунду).
+        :param burst: Емкость корзины (сколько запросов можно выполнить подряд без ожидания).
+        :param min_rate: Нижняя граница скорости.
+        :param max_rate: Верхняя граница скорости.
+        :param slow_threshold: Время ответа в секундах, начиная с которого ответ считается медленным.
+        :param backoff_factor: Множитель скорости при медленном ответе или ошибке.
+        :param recovery_step: Прибавка к скорости после быстрого успешного ответа.
+        """
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.slow_threshold = slow_threshold
+        self.backoff_factor = backoff_factor
+        self.recovery_step = recovery_step
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Забирает один токен, при необходимости ожидая его появления.
+        :return: Время ожидания в секундах.
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def report(self, elapsed, ok=True):
+        """
+        Учитывает результат запроса и подстраивает скорость.
+        :param elapsed: Длительность запроса в секундах.
+        :param ok: Завершился ли запрос успешно.
+        """
+        with self._lock:
+            if not ok or elapsed > self.slow_threshold:
+                self.rate = max(self.min_rate, self.rate * self.backoff_factor)
+            else:
+                self.rate = min(self.max_rate, self.rate + self.recovery_step)
+
+class Pacer:
+    """
+    Темп работы парсера. В режиме "adaptive" фиксированные случайные паузы заменяются
+    ожиданием нужных элементов страницы и ограничителем AdaptiveRateLimiter.
+    В режиме "fixed" сохраняется прежнее поведение со случайными паузами.
+    Считает, сколько времени сэкономлено относительно фиксированных пауз.
+    """
+
+    def __init__(self, mode="adaptive", limiter=None, legacy_delay=(2, 5)):
+        """
+        :param mode: "adaptive" или "fixed".
+        :param limiter: AdaptiveRateLimiter. По умолчанию создается с настройками по умолчанию.
+        :param legacy_delay: Границы прежней случайной паузы (для режима fixed и оценки экономии).
+        """
+        self.mode = mode
+        self.limiter = limiter or AdaptiveRateLimiter()
+        self.legacy_delay = legacy_delay
+        self._legacy_mean = sum(legacy_delay) / 2
+        self._lock = threading.Lock()
+        self._replaced = 0
+        self._spent = 0.0
+
+    @property
+    def adaptive(self):
+        return self.mode == "adaptive"
+
+    def pause(self):
+        """
+        Пауза перед действием на странице, которое не загружает новый документ.
+        В адаптивном режиме не ждет.
+        """
+        if not self.adaptive:
+            with metrics.stage("pacing.pause"):
+                time.sleep(random.uniform(*self.legacy_delay))
+            return
+        self._account(0.0)
+
+    @contextmanager
+    def request(self):
+        """
+        Оборачивает запрос к сайту: ждет токен ограничителя, измеряет длительность запроса
+        и сообщает ограничителю о медленных ответах и ошибках.
+        """
+        with metrics.stage("pacing.throttle"):
+            if self.adaptive:
+                self._account(self.limiter.acquire())
+            else:
+                time.sleep(random.uniform(*self.legacy_delay))
+
+        started = time.monotonic()
+        try:
+            yield
+        except Exception:
+            self.limiter.report(time.monotonic() - started, ok=False)
+            raise
+        self.limiter.report(time.monotonic() - started, ok=True)
+
+    def wait_until(self, driver, condition, timeout=10, replaces_delay=False):
+        """
+        Ожидает выполнения условия на странице.
+        :param driver: WebDriver объект.
+        :param condition: Условие из selenium.webdriver.support.expected_conditions.
+        :param timeout: Максимальное время ожидания в секундах.
+        :param replaces_delay: Заменяет ли ожидание прежнюю фиксированную паузу (для подсчета экономии).
+        :return: Результат условия.
+        """
+        if replaces_delay and not self.adaptive:
+            with metrics.stage("pacing.pause"):
+                time.sleep(random.uniform(*self.legacy_delay))
+
+        started = time.monotonic()
+        try:
+            return WebDriverWait(driver, timeout).until(condition)
+        finally:
+            spent = time.monotonic() - started
+            metrics.record("pacing.wait", spent)
+            if replaces_delay and self.adaptive:
+                self._account(spent)
+
+    def stats(self):
+        """
+        :return: Словарь со статистикой: количество замененных пауз, прежняя оценка времени,
+            фактически потраченное время и сэкономленное время в секундах.
+        """
+        with self._lock:
+            baseline = self._replaced * self._legacy_mean
+            return {
+                "replaced_delays": self._replaced,
+                "legacy_seconds": round(baseline, 2),
+                "spent_seconds": round(self._spent, 2),
+                "saved_seconds": round(baseline - self._spent, 2),
+                "rate": round(self.limiter.rate, 3),
+            }
+
+    def _account(self, spent):
+        """
+        Учитывает одну замененную паузу.
+        :param spent: Фактически затраченное на нее время в секундах.
+        """
+        with self._lock:
+            self._replaced += 1
+            self._spent += spent
@@ -0,0 +1,416 @@
+import sqlite3
+import threading
+
+from src.parser.browser_profile import BrowserProfile, BrowserMetrics
+from src.parser.data_collectors import is_match_finished
+from src.parser.driver_launcher import DriverLauncher
+from src.parser.driver_session import RetryPolicy
+from src.parser.fast_extractors import extract_match_pages
+from src.parser.http_fetcher import HttpFetcher
+from src.parser.match_pipeline import MatchPipeline
+from src.parser.pacing import AdaptiveRateLimiter, Pacer, PolitenessLimiter
+from src.parser.shared_browser import ENGINE_DEDICATED, ENGINE_SHARED, SharedBrowser
+from src.utils.excel_saver import DEFAULT_BATCH_SIZE, save_data_to_excel
+from src.utils.logger_setup import logger
+from src.utils.job_journal import JobJournal
+from src.utils.match_index import MatchIndex
+from src.utils.match_record import MatchRecord
+from src.utils.navigation_map import NavigationMap
+from src.utils.output_writers import create_sink
+from src.utils.page_cache import PageCache, TAB_XG_STATISTICS, TAB_PREVIEW
+from src.utils.stage_metrics import metrics
+
+DEFAULT_UPCOMING_TTL = 3600
+DEFAULT_CHECKPOINT_EVERY = 20
+EXTRACTION_HTML = "html"
+EXTRACTION_SCRIPT = "script"
+
+class ScrapeContext:
+    """
+    Общие для всего запуска объекты: приемник данных, HTTP-клиент, темп работы, ограничитель нагрузки,
+    кэш страниц, индекс собранных матчей и журнал заданий. Передается во все функции парсинга и разделяется между воркерами пула.
+    """
+
+    def __init__(self, sink=None, fetcher=None, limiter=None, pacer=None, cache=None,
+                 upcoming_ttl=DEFAULT_UPCOMING_TTL, index=None, extraction=EXTRACTION_HTML,
+                 browser_profile=None, browser_metrics=None, driver_launcher=None, navigation=None,
+                 journal=None, checkpoint_every=DEFAULT_CHECKPOINT_EVERY, retry_policy=None, metrics_path=None,
+                 pipeline=None, shared_browser=None):
+        """
+        :param sink: Открытый приемник данных (ExcelSink, MultiSink и др. из output_writers).
+            Если не задан, каждый матч сохраняется в Excel отдельно.
+        :param fetcher: HttpFetcher для загрузки матчей без браузера. Если не задан, используется только браузер.
+        :param limiter: PolitenessLimiter. Если задан, матчи игровой недели загружаются одновременно.
+        :param pacer: Объект Pacer. По умолчанию используется адаптивный темп.
+        :param cache: PageCache. Если не задан, страницы не кэшируются.
+        :param upcoming_ttl: Срок жизни кэша страниц несыгранных матчей в секундах.
+        :param index: MatchIndex. Если задан, уже собранные сыгранные матчи пропускаются.
+        :param extraction: Способ сбора данных в браузере: "html" (разбор page_source)
+            или "script" (извлечение на странице одним вызовом execute_script).
+        :param browser_profile: BrowserProfile для запуска браузеров. Если не задан, используется обычный профиль.
+        :param browser_metrics: BrowserMetrics. Если задан, замеряется время загрузки страниц и память браузеров.
+        :param driver_launcher: DriverLauncher. Если задан, путь к ChromeDriver определяется один раз и закрепляется.
+        :param navigation: NavigationMap. Если задана, лиги и игровые недели открываются по сохраненным ссылкам.
+        :param journal: JobJournal с начатым запуском. Если задан, состояние недель и матчей записывается в журнал,
+            а при продолжении запуска уже обработанные недели и матчи пропускаются.
+        :param checkpoint_every: Через сколько собранных матчей сохранять контрольную точку
+            (сброс буферов приемника, индекс и журнал).
+        :param retry_policy: RetryPolicy: повторы сбора матча и пороги перезапуска браузера.
+        :param metrics_path: Путь к JSON-файлу с метриками этапов (если замеры включены).
+        :param pipeline: MatchPipeline. Если задан, загрузка, разбор и запись матчей недели выполняются одновременно.
+        :param shared_browser: SharedBrowser. Если задан, браузеры воркеров — изолированные контексты одного Chrome,
+            а не отдельные процессы Chrome.
+        """
+        self.sink = sink
+        self.fetcher = fetcher
+        self.limiter = limiter
+        self.pacer = pacer or Pacer()
+        self.cache = cache
+        self.upcoming_ttl = upcoming_ttl
+        self.index = index
+        self.extraction = extraction
+        self.browser_profile = browser_profile
+        self.browser_metrics = browser_metrics
+        self.driver_launcher = driver_launcher
+        self.navigation = navigation
+        self.journal = journal
+        self.checkpoint_every = max(1, checkpoint_every)
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.metrics_path = metrics_path
+        self.pipeline = pipeline
+        self.shared_browser = shared_browser
+        self._since_checkpoint = 0
+        self._checkpoint_lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings, sink=None):
+        """
+        Создает контекст по настройкам из config/parser_settings.json.
+        :param settings: Словарь настроек.
+        :param sink: Приемник данных вместо приемников из секции "output" (например, QueueSink воркера).
+        :return: Объект ScrapeContext.
+        """
+        metrics_settings = settings.get("metrics", {})
+        metrics.configure(metrics_settings.get("enabled", False))
+
+        batch_size = settings.get("excel", {}).get("batch_size", DEFAULT_BATCH_SIZE)
+        sink = sink or create_sink(settings.get("output", {}), batch_size)
+
+        pacing_settings = settings.get("pacing", {})
+        pacer = Pacer(
+            mode=pacing_settings.get("mode", "adaptive"),
+            limiter=AdaptiveRateLimiter(
+                rate=pacing_settings.get("rate", 0.5),
+                burst=pacing_settings.get("burst", 2),
+                min_rate=pacing_settings.get("min_rate", 0.05),
+                max_rate=pacing_settings.get("max_rate", 2.0),
+                slow_threshold=pacing_settings.get("slow_threshold", 8.0),
+                backoff_factor=pacing_settings.get("backoff_factor", 0.5),
+                recovery_step=pacing_settings.get("recovery_step", 0.05),
+            ),
+        )
+
+        concurrency_settings = settings.get("concurrency", {})
+        limiter = None
+        if concurrency_settings.get("enabled", False):
+            limiter = PolitenessLimiter(
+                max_in_flight=concurrency_settings.get("max_in_flight", 4),
+                min_interval=concurrency_settings.get("min_interval", 0.5),
+            )
+
+        fetch_settings = settings.get("fetch", {})
+        fetcher = None
+        if fetch_settings.get("engine", "browser") == "http":
+            fetcher = HttpFetcher(
+                timeout=fetch_settings.get("timeout", 10),
+                pool_size=fetch_settings.get("pool_size", 10),
+                retries=fetch_settings.get("retries", 2),
+                limiter=limiter,
+                pacer=pacer,
+                base_url=fetch_settings.get("base_url"),
+            )
+
+        cache_settings = settings.get("cache", {})
+        cache = None
+        if cache_settings.get("enabled", False):
+            cache = PageCache(
+                directory=cache_settings.get("directory", ".cache/pages"),
+                max_bytes=cache_settings.get("max_mb", 500) * 1024 * 1024,
+            )
+
+        incremental_settings = settings.get("incremental", {})
+        index = None
+        if incremental_settings.get("enabled", False):
+            index = MatchIndex(incremental_settings.get("index_path", "data/match_index.json"))
+
+        extraction = settings.get("extraction", {}).get("mode", EXTRACTION_HTML)
+        if extraction == EXTRACTION_SCRIPT and cache is not None:
+            logger.info("Извлечение в браузере не передает HTML: страницы, собранные браузером, не кэшируются.")
+
+        navigation_settings = settings.get("navigation", {})
+        navigation = None
+        if navigation_settings.get("enabled", False):
+            navigation = NavigationMap(navigation_settings.get("map_path", "data/navigation_map.json"))
+
+        journal_settings = settings.get("journal", {})
+        journal = None
+        if journal_settings.get("enabled", False):
+            journal = JobJournal(journal_settings.get("path", "data/job_journal.sqlite3"))
+            journal.begin(resume=journal_settings.get("resume", False))
+
+        pipeline_settings = settings.get("pipeline", {})
+        pipeline = None
+        if pipeline_settings.get("enabled", False):
+            pipeline = MatchPipeline.from_settings(pipeline_settings)
+
+        browser_settings = settings.get("browser", {})
+        browser_profile = BrowserProfile.from_settings(browser_settings)
+        browser_metrics = BrowserMetrics() if browser_settings.get("report_metrics", True) else None
+        driver_launcher = DriverLauncher.from_settings(settings.get("driver", {}))
+        shared_browser = None
+        if browser_settings.get("engine", ENGINE_DEDICATED) == ENGINE_SHARED:
+            shared_browser = SharedBrowser(browser_profile, driver_launcher)
+
+        return cls(
+            sink=sink,
+            fetcher=fetcher,
+            limiter=limiter,
+            pacer=pacer,
+            cache=cache,
+            upcoming_ttl=cache_settings.get("upcoming_ttl", DEFAULT_UPCOMING_TTL),
+            index=index,
+            extraction=extraction,
+            browser_profile=browser_profile,
+            browser_metrics=browser_metrics,
+            driver_launcher=driver_launcher,
+            navigation=navigation,
+            journal=journal,
+            checkpoint_every=journal_settings.get("checkpoint_every", DEFAULT_CHECKPOINT_EVERY),
+            retry_policy=RetryPolicy.from_settings(settings.get("retry", {})),
+            metrics_path=metrics_settings.get("path", "data/metrics.json"),
+            pipeline=pipeline,
+            shared_browser=shared_browser,
+        )
+
+    def is_collected(self, link):
+        """
+        Проверяет по индексу, собран ли уже сыгранный матч, а по журналу — собран ли матч в продолжаемом запуске.
+        :param link: Ссылка на страницу матча.
+        :return: True, если матч можно пропустить.
+        """
+        if self.journal is not None and self.journal.is_match_done(link):
+            return True
+        return self.index is not None and self.index.is_finished(link)
+
+    def record_match(self, link, statistic, league_name, gameweek):
+        """
+        Отмечает матч в индексе собранных матчей.
+        :param link: Ссылка на страницу матча.
+        :param statistic: Собранные данные матча.
+        :param league_name: Название лиги.
+        :param gameweek: Номер игровой недели.
+        """
+        if self.index is not None:
+            self.index.record(link, league_name, gameweek, statistic, is_match_finished(statistic["xg_statistics"]))
+        if self.journal is not None:
+            self.journal.record_match(link, league_name, gameweek)
+            with self._checkpoint_lock:
+                self._since_checkpoint += 1
+                checkpoint = self._since_checkpoint >= self.checkpoint_every
+            if checkpoint:
+                self.save_index()
+
+    def record_failure(self, link, league_name, gameweek, error):
+        """
+        Отмечает в журнале матч, который не удалось собрать (при продолжении запуска он загружается снова).
+        :param link: Ссылка на страницу матча.
+        :param league_name: Название лиги.
+        :param gameweek: Номер игровой недели.
+        :param error: Текст ошибки.
+        """
+        if self.journal is not None:
+            self.journal.record_match(link, league_name, gameweek, error=str(error))
+
+    def save_index(self):
+        """
+        Контрольная точка: сохраняет индекс собранных матчей и журнал заданий. Перед этим сбрасывает
+        буферы приемника, чтобы индекс и журнал не отмечали матчи, строки которых еще не записаны.
+        Если записать буферы не удалось, ни индекс, ни журнал не сохраняются: непереданные строки остаются
+        в буфере, и матчи будут отмечены на следующей контрольной точке, после успешной записи.
+        :return: False, если контрольная точка пропущена из-за ошибки записи.
+        """
+        if self.index is None and self.journal is None:
+            return True
+        with self._checkpoint_lock:
+            self._since_checkpoint = 0
+        if self.sink is not None and not self.sink.flush():
+            logger.error("Данные не записаны в приемник, контрольная точка пропущена.")
+            return False
+        if self.index is not None:
+            try:
+                self.index.save()
+            except OSError as e:
+                logger.error(f"Не удалось сохранить индекс собранных матчей: {e}")
+        if self.journal is not None:
+            try:
+                self.journal.commit()
+            except sqlite3.Error as e:
+                logger.error(f"Не удалось записать журнал заданий: {e}")
+        return True
+
+    def start_gameweek(self, league_name, gameweek):
+        """
+        Проверяет по журналу, нужно ли обрабатывать игровую неделю, и отмечает начало ее обработки.
+        :param league_name: Название лиги.
+        :param gameweek: Номер игровой недели.
+        :return: False, если неделя уже обработана в продолжаемом запуске.
+        """
+        if self.journal is None:
+            return True
+        if self.journal.is_gameweek_done(league_name, gameweek):
+            logger.info(f"Неделя {gameweek} лиги '{league_name}' уже обработана в этом запуске, пропуск.")
+            return False
+        self.journal.start_gameweek(league_name, gameweek)
+        return True
+
+    def finish_gameweek(self, league_name, gameweek, error=None):
+        """
+        Отмечает в журнале завершение обработки игровой недели.
+        :param league_name: Название лиги.
+        :param gameweek: Номер игровой недели.
+        :param error: Ошибка, прервавшая обработку недели.
+        """
+        if self.journal is not None:
+            self.journal.finish_gameweek(league_name, gameweek, None if error is None else str(error))
+
+    def finish_run(self):
+        """
+        Отмечает в журнале, что все задания конфигурации пройдены. Если данные не записаны в приемник,
+        запуск остается незавершенным и может быть продолжен.
+        """
+        if self.journal is not None and self.save_index():
+            self.journal.finish_run()
+
+    def load_cached_match(self, link, allow_expired=False):
+        """
+        Собирает данные матча из кэша страниц.
+        :param link: Ссылка на страницу матча.
+        :param allow_expired: Использовать просроченные записи (офлайн-режим).
+        :return: Словарь с данными матча или None, если в кэше нет обеих вкладок.
+        """
+        pages = self.cached_pages(link, allow_expired)
+        if pages is None:
+            return None
+
+        logger.debug("Матч разобран из кэша страниц: {}", link)
+        return extract_match_pages(pages[TAB_XG_STATISTICS], pages[TAB_PREVIEW])
+
+    def cached_pages(self, link, allow_expired=False):
+        """
+        Читает HTML вкладок матча из кэша страниц без разбора.
+        :param link: Ссылка на страницу матча.
+        :param allow_expired: Использовать просроченные записи.
+        :return: Словарь {вкладка: HTML} или None, если в кэше нет обеих вкладок.
+        """
+        if self.cache is None:
+            return None
+
+        xg_html = self.cache.get(link, TAB_XG_STATISTICS, allow_expired)
+        preview_html = self.cache.get(link, TAB_PREVIEW, allow_expired) if xg_html else None
+        if not preview_html:
+            return None
+        return {TAB_XG_STATISTICS: xg_html, TAB_PREVIEW: preview_html}
+
+    def store_pages(self, link, statistic, pages, league_name, gameweek):
+        """
+        Сохраняет HTML вкладок матча в кэш. Страницы сыгранных матчей хранятся бессрочно,
+        несыгранных — upcoming_ttl секунд.
+        :param link: Ссылка на страницу матча.
+        :param statistic: Собранные данные матча.
+        :param pages: Словарь {вкладка: HTML}.
+        :param league_name: Название лиги.
+        :param gameweek: Номер игровой недели.
+        """
+        if self.cache is None or len(pages) < 2:
+            return
+
+        ttl = None if is_match_finished(statistic["xg_statistics"]) else self.upcoming_ttl
+        try:
+            for tab, html in pages.items():
+                self.cache.put(link, tab, html, ttl, league_name, gameweek)
+        except Exception as e:
+            logger.warning(f"Не удалось сохранить страницы матча в кэш: {link}: {e}")
+
+    def save(self, statistic, league_name, gameweek=None):
+        """
+        Преобразует данные матча в MatchRecord (числа разбираются один раз) и передает запись в приемник.
+        :param statistic: Словарь данных матча.
+        :param league_name: Название лиги.
+        :param gameweek: Номер игровой недели.
+        :return: Объект MatchRecord.
+        """
+        record = MatchRecord.from_match(statistic, league_name, gameweek)
+        self.write(record, league_name)
+        return record
+
+    def write(self, record, league_name):
+        """
+        Передает готовую запись матча в приемник.
+        :param record: Объект MatchRecord.
+        :param league_name: Название лиги.
+        """
+        if self.sink is not None:
+            self.sink.write(record, league_name)
+        else:
+            save_data_to_excel(record, league_name)
+
+    def close(self):
+        """
+        Сохраняет буферы и освобождает ресурсы.
+        """
+        if self.sink is not None:
+            self.sink.close()
+        self.save_index()
+        if self.journal is not None:
+            self.journal.close()
+        if self.navigation is not None:
+            try:
+                self.navigation.save()
+            except OSError as e:
+                logger.error(f"Не удалось сохранить карту навигации: {e}")
+        if self.fetcher is not None:
+            self.fetcher.close()
+        if self.pipeline is not None:
+            self.pipeline.close()
+        if self.shared_browser is not None:
+            self.shared_browser.close()
+        if self.cache is not None:
+            self.cache.close()
+
+        stats = self.pacer.stats()
+        if stats["replaced_delays"]:
+            logger.info(
+                f"Темп работы: заменено пауз {stats['replaced_delays']}, "
+                f"прежняя оценка {stats['legacy_seconds']} с, потрачено {stats['spent_seconds']} с, "
+                f"сэкономлено {stats['saved_seconds']} с, итоговая скорость {stats['rate']} запр./с."
+            )
+
+        browser_stats = self.browser_metrics.summary() if self.browser_metrics is not None else None
+        if browser_stats:
+            profile = "облегченный" if self.browser_profile is not None and self.browser_profile.enabled else "обычный"
+            logger.info(
+                f"Браузер ({profile} профиль): страниц {browser_stats['pages']}, "
+                f"загрузка в среднем {browser_stats['avg_load_ms']} мс (p95 {browser_stats['p95_load_ms']} мс), "
+                f"ресурсов на страницу {browser_stats['resources_per_page']}, "
+                f"передано на страницу {browser_stats['kb_per_page']} КБ, "
+                f"пиковая память Chrome на браузер воркера {browser_stats['max_memory_mb']} МБ."
+            )
+
+        startup_stats = self.driver_launcher.stats() if self.driver_launcher is not None else None
+        if startup_stats:
+            logger.info(
+                f"Запуск браузеров: {startup_stats['starts']} (с теплым профилем {startup_stats['warm_starts']}), "
+                f"в среднем {startup_stats['avg_seconds']} с, максимум {startup_stats['max_seconds']} с."
+            )
+
+        metrics.report(self.metrics_path)
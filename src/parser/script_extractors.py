@@ -0,0 +1,167 @@
+from src.parser.fast_extractors import (
+    BASE_URL,
+    PREVIEW_SPEC,
+    XG_STATISTICS_SPEC,
+    PREDICTION_SPEC,
+    FIXTURE_LINKS_SPEC
+)
+from src.utils.logger_setup import logger
+from src.utils.stage_metrics import metrics
+
+EXTRACT_SCRIPT = """
+const specs = arguments[0];
+
+function classes(el) {
+    return (el.getAttribute('class') || '').split(/\\s+/).filter(Boolean);
+}
+
+function matches(el, sel) {
+    if (sel.tag !== null && el.localName !== sel.tag) return false;
+    if (sel.id_contains !== null && !(el.id || '').includes(sel.id_contains)) return false;
+    const tokens = classes(el);
+    if (sel.all_classes.length) return sel.all_classes.every(c => tokens.includes(c));
+    if (sel.cls === null) return true;
+    const wanted = sel.cls.split(/\\s+/);
+    if (wanted.length > 1) return wanted.length === tokens.length && wanted.every((c, i) => tokens[i] === c);
+    return tokens.includes(sel.cls);
+}
+
+function findAll(root, sel) {
+    const found = [];
+    for (const el of root.getElementsByTagName(sel.tag || '*')) {
+        if (matches(el, sel)) found.push(el);
+    }
+    return found;
+}
+
+function findFirst(root, sel) {
+    for (const el of root.getElementsByTagName(sel.tag || '*')) {
+        if (matches(el, sel)) return el;
+    }
+    return null;
+}
+
+function text(el) {
+    return el.textContent.trim();
+}
+
+function apply(field, anchors, data) {
+    if (field.kind === 'values') {
+        data[field.keys[0]] = anchors
+            .map(anchor => findFirst(anchor, field.children[0]))
+            .filter(child => child !== null && child.getAttribute('href'))
+            .map(child => child.getAttribute('href'));
+        return;
+    }
+
+    if (anchors.length < field.min_anchors) {
+        if (field.default !== null) data[field.keys[0]] = field.default;
+        return;
+    }
+
+    let el = anchors[field.index < 0 ? anchors.length + field.index : field.index];
+    if (field.within !== null) {
+        el = findFirst(el, field.within);
+        if (el === null) return;
+    }
+
+    if (field.kind === 'text') {
+        const child = findFirst(el, field.children[0]);
+        if (child !== null) data[field.keys[0]] = text(child);
+        else if (field.default !== null) data[field.keys[0]] = field.default;
+    } else if (field.kind === 'mark') {
+        const label = findFirst(el, field.children[0]);
+        const mark = findFirst(el, field.children[1]);
+        data[field.keys[0]] = `${label ? text(label) : ''} (${mark ? text(mark) : ''})`;
+    } else if (field.kind === 'pair') {
+        let values = findAll(el, field.children[0]);
+        if (field.children.length > 1) {
+            values = values.flatMap(value => findAll(value, field.children[1]));
+        }
+        if (values.length >= field.min_values) {
+            data[field.keys[0]] = text(values[0]);
+            data[field.keys[1]] = text(values[1]);
+        }
+    }
+}
+
+const result = {};
+for (const [name, fields] of Object.entries(specs)) {
+    const anchors = new Map();
+    const data = {};
+    for (const field of fields) {
+        const key = JSON.stringify(field.anchor);
+        if (!anchors.has(key)) anchors.set(key, findAll(document, field.anchor));
+        apply(field, anchors.get(key), data);
+    }
+    result[name] = data;
+}
+return result;
+"""
+
+def _spec_to_json(fields):
+    """
+    Преобразует описание полей в структуру, которую можно передать в execute_script.
+    :param fields: Последовательность объектов Field.
+    :return: Список словарей.
+    """
+    def selector(value):
+        return None if value is None else {**value._asdict(), "all_classes": list(value.all_classes)}
+
+    return [
+        {
+            **field._asdict(),
+            "anchor": selector(field.anchor),
+            "within": selector(field.within),
+            "children": [selector(child) for child in field.children],
+        }
+        for field in fields
+    ]
+
+_SPECS = {
+    "preview": _spec_to_json(PREVIEW_SPEC),
+    "xg_statistics": _spec_to_json(XG_STATISTICS_SPEC),
+    "match_score_prediction": _spec_to_json(PREDICTION_SPEC),
+    "fixture_links": _spec_to_json(FIXTURE_LINKS_SPEC),
+}
+
+def run_extraction(driver, *names):
+    """
+    Извлекает поля из открытой страницы одним вызовом execute_script.
+    :param driver: WebDriver объект.
+    :param names: Имена наборов полей ("preview", "xg_statistics", "match_score_prediction", "fixture_links").
+    :return: Словарь {имя набора: данные}.
+    """
+    with metrics.stage("parse.script"):
+        return driver.execute_script(EXTRACT_SCRIPT, {name: _SPECS[name] for name in names})
+
+def script_xg_statistics(driver):
+    """
+    Собирает данные вкладки xg-statistics в браузере, без передачи HTML страницы.
+    :param driver: WebDriver объект.
+    :return: Словарь с данными вкладки xg-statistics.
+    """
+    data = run_extraction(driver, "xg_statistics")["xg_statistics"]
+    result = {key: data.get(key) for key in (
+        "goals_team_1", "goals_team_2", "expected_goals_team_1", "expected_goals_team_2"
+    )}
+    logger.debug("Данные с xg-statistics собраны в браузере: {}", result)
+    return result
+
+def script_preview(driver):
+    """
+    Собирает данные вкладки preview и прогноз счета в браузере одним вызовом.
+    :param driver: WebDriver объект.
+    :return: Кортеж (данные вкладки preview, данные прогноза счета).
+    """
+    data = run_extraction(driver, "preview", "match_score_prediction")
+    logger.debug("Данные с вкладки preview собраны в браузере: {}", data)
+    return data["preview"], data["match_score_prediction"]
+
+def script_fixture_links(driver):
+    """
+    Собирает ссылки на страницы матчей со страницы игровой недели в браузере.
+    :param driver: WebDriver объект.
+    :return: Список абсолютных ссылок.
+    """
+    return [BASE_URL + href for href in run_extraction(driver, "fixture_links")["fixture_links"].get("links", [])]
@@ -0,0 +1,224 @@
+import json
+import threading
+import time
+from urllib.request import urlopen
+
+import websocket
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+
+from src.parser.user_agent import get_random_user_agent
+from src.utils.logger_setup import logger
+from src.utils.stage_metrics import metrics
+
+ENGINE_DEDICATED = "dedicated"
+ENGINE_SHARED = "shared"
+
+DEFAULT_CDP_TIMEOUT = 30
+
+class SharedBrowser:
+    """
+    Один Chrome на все браузеры воркеров. Вместо отдельного процесса Chrome каждый воркер получает
+    изолированный контекст (Target.createBrowserContext: свои cookies, кэш и хранилище) с одной вкладкой
+    и легкий ChromeDriver, подключенный к общему Chrome по debuggerAddress. Навигация и извлечение данных
+    работают через обычный WebDriver, переключенный на вкладку своего контекста, поэтому browser_manager
+    не отличает такой браузер от отдельного. Процесс браузера, GPU и сетевой сервис общие для всех воркеров,
+    а перезапуск браузера воркера пересоздает только его контекст.
+    """
+
+    def __init__(self, profile=None, launcher=None, cdp_timeout=DEFAULT_CDP_TIMEOUT):
+        """
+        :param profile: BrowserProfile: размер окна и блокировка запросов во вкладке каждого контекста.
+        :param launcher: DriverLauncher. Если задан, путь к ChromeDriver берется из него.
+        :param cdp_timeout: Таймаут команд DevTools Protocol в секундах.
+        """
+        self.profile = profile
+        self.launcher = launcher
+        self.cdp_timeout = cdp_timeout
+        self.contexts = 0
+        self.open_contexts = 0
+        self._lock = threading.Lock()
+        self._host = None
+        self._stop_host = None
+        self._connection = None
+
+    def open_context(self, start_host, stop_host):
+        """
+        Открывает изолированный контекст в общем Chrome. Chrome запускается при первом вызове
+        и перезапускается, если перестал отвечать.
+        :param start_host: Функция без аргументов, запускающая Chrome и возвращающая его WebDriver (init_driver).
+        :param stop_host: Функция, закрывающая WebDriver общего Chrome.
+        :return: WebDriver, переключенный на вкладку нового контекста.
+        """
+        with self._lock:
+            self._ensure_host_locked(start_host, stop_host)
+            address = self._host.capabilities["goog:chromeOptions"]["debuggerAddress"]
+            browser_pid = self._host.service.process.pid
+            with metrics.stage("browser.context"):
+                context_id = self._connection.call("Target.createBrowserContext")["browserContextId"]
+                params = {"url": "about:blank", "browserContextId": context_id}
+                if self.profile is not None and self.profile.enabled and self.profile.window_size:
+                    params["width"], params["height"] = self.profile.window_size
+                target_id = self._connection.call("Target.createTarget", params)["targetId"]
+
+        started = time.monotonic()
+        try:
+            options = webdriver.ChromeOptions()
+            options.debugger_address = address
+            driver = _ContextDriver(service=Service(self._driver_path()), options=options)
+        except Exception:
+            self._dispose(context_id)
+            raise
+        driver.browser_context_id = context_id
+        driver.browser_pid = browser_pid
+
+        try:
+            handle = next(handle for handle in driver.window_handles if handle.endswith(target_id))
+            driver.switch_to.window(handle)
+            driver.execute_cdp_cmd("Network.setUserAgentOverride", {"userAgent": get_random_user_agent()})
+            driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {
+                "source": "Object.defineProperty(navigator, 'webdriver', {get: () => false});"
+            })
+            if self.profile is not None:
+                self.profile.apply_blocking(driver)
+        except Exception:
+            self.close_context(driver)
+            raise
+
+        with self._lock:
+            self.contexts += 1
+            self.open_contexts += 1
+        driver.shared_browser = self
+        logger.info(f"Контекст общего браузера открыт за {time.monotonic() - started:.2f} с.")
+        return driver
+
+    def close_context(self, driver):
+        """
+        Отключает ChromeDriver контекста и закрывает контекст со всеми его вкладками. Общий Chrome продолжает работу.
+        :param driver: WebDriver, полученный из open_context.
+        """
+        try:
+            driver.quit()
+        finally:
+            self._dispose(driver.browser_context_id)
+            if driver.shared_browser is self:
+                driver.shared_browser = None
+                with self._lock:
+                    self.open_contexts -= 1
+
+    def close(self):
+        """
+        Закрывает общий Chrome.
+        """
+        with self._lock:
+            self._stop_host_locked()
+        if self.contexts:
+            logger.info(f"Общий браузер: открыто контекстов {self.contexts}.")
+
+    def _ensure_host_locked(self, start_host, stop_host):
+        """
+        Запускает общий Chrome или перезапускает неотвечающий. Вызывается под блокировкой.
+        """
+        if self._connection is not None:
+            try:
+                self._connection.call("Browser.getVersion")
+                return
+            except Exception as e:
+                logger.warning(f"Общий браузер не отвечает и будет перезапущен: {e}")
+                self._stop_host_locked()
+
+        self._host = start_host()
+        self._stop_host = stop_host
+        try:
+            address = self._host.capabilities["goog:chromeOptions"]["debuggerAddress"]
+            self._connection = _BrowserConnection(address, self.cdp_timeout)
+        except Exception:
+            self._stop_host_locked()
+            raise
+
+    def _stop_host_locked(self):
+        """
+        Закрывает соединение DevTools и общий Chrome. Вызывается под блокировкой.
+        """
+        connection, self._connection = self._connection, None
+        host, self._host = self._host, None
+        if connection is not None:
+            connection.close()
+        if host is not None:
+            try:
+                self._stop_host(host)
+            except Exception as e:
+                logger.warning(f"Ошибка при закрытии общего браузера: {e}")
+
+    def _dispose(self, context_id):
+        """
+        :param context_id: Идентификатор закрываемого контекста.
+        """
+        with self._lock:
+            if self._connection is None:
+                return
+            try:
+                self._connection.call("Target.disposeBrowserContext", {"browserContextId": context_id})
+            except Exception as e:
+                # Контекст мог исчезнуть вместе с перезапущенным Chrome.
+                logger.debug("Контекст {} не закрыт: {}", context_id, e)
+
+    def _driver_path(self):
+        """
+        :return: Путь к ChromeDriver для подключения к общему Chrome.
+        """
+        if self.launcher is not None:
+            return self.launcher.resolve()
+        return ChromeDriverManager().install()
+
+class _ContextDriver(webdriver.Chrome):
+    """
+    WebDriver, подключенный к контексту общего Chrome. Знает свой контекст (browser_context_id),
+    процесс ChromeDriver общего Chrome (browser_pid), по дереву которого замеряется память,
+    и открывший его SharedBrowser (shared_browser), пока контекст открыт.
+    """
+
+    browser_context_id = None
+    browser_pid = None
+    shared_browser = None
+
+class _BrowserConnection:
+    """
+    Соединение с DevTools Protocol общего Chrome на уровне браузера (а не вкладки): только через него
+    создаются и закрываются контексты. Команды выполняются по одной под блокировкой SharedBrowser.
+    """
+
+    def __init__(self, address, timeout):
+        """
+        :param address: Адрес отладки Chrome ("127.0.0.1:port").
+        :param timeout: Таймаут соединения и ответа в секундах.
+        """
+        with urlopen(f"http://{address}/json/version", timeout=timeout) as response:
+            url = json.load(response)["webSocketDebuggerUrl"]
+        self._socket = websocket.create_connection(url, timeout=timeout, suppress_origin=True)
+        self._next_id = 0
+
+    def call(self, method, params=None):
+        """
+        :param method: Команда DevTools Protocol, например "Target.createBrowserContext".
+        :param params: Параметры команды.
+        :return: Результат команды.
+        """
+        self._next_id += 1
+        message_id = self._next_id
+        self._socket.send(json.dumps({"id": message_id, "method": method, "params": params or {}}))
+        while True:
+            message = json.loads(self._socket.recv())
+            # События браузера, на которые соединение не подписывалось, пропускаются.
+            if message.get("id") != message_id:
+                continue
+            if "error" in message:
+                raise RuntimeError(f"{method}: {message['error'].get('message')}")
+            return message.get("result", {})
+
+    def close(self):
+        try:
+            self._socket.close()
+        except Exception:
+            pass
@@ -0,0 +1,86 @@
+import queue
+import threading
+
+from src.parser.browser_manager import open_session, normalize_gameweeks, process_gameweek
+from src.utils.logger_setup import logger
+
+def build_jobs(config):
+    """
+    Разворачивает конфигурацию в список заданий (лига, игровая неделя).
+    :param config: Список словарей с конфигурацией.
+    :return: Список кортежей (лига, игровая неделя).
+    """
+    jobs = []
+    for item in config:
+        for gameweek in normalize_gameweeks(item["gameweek"]):
+            jobs.append((item["league"], gameweek))
+    return jobs
+
+def run_worker_pool(config, workers=2, context=None):
+    """
+    Запускает пул из нескольких браузеров, которые разбирают задания из общей очереди.
+    Каждый воркер использует свой браузер для всех своих заданий и перезапускает его при деградации.
+    :param config: Список словарей с конфигурацией.
+    :param workers: Количество одновременно работающих браузеров.
+    :param context: Общий для всех воркеров контекст запуска (ScrapeContext).
+    """
+    journal = context.journal if context is not None else None
+    jobs = queue.Queue()
+    for league_name, gameweek in build_jobs(config):
+        if journal is None or not journal.is_gameweek_done(league_name, gameweek):
+            jobs.put((league_name, gameweek))
+    if jobs.empty():
+        logger.info("Все задания уже обработаны в этом запуске.")
+        return
+
+    workers = max(1, min(workers, jobs.qsize()))
+    logger.info(f"Запуск пула из {workers} воркеров для {jobs.qsize()} заданий.")
+
+    threads = [
+        threading.Thread(target=_worker, args=(worker_id, jobs, context), name=f"worker-{worker_id}", daemon=True)
+        for worker_id in range(1, workers + 1)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    if not jobs.empty():
+        logger.warning(f"Пул завершил работу, не обработано заданий: {jobs.qsize()}.")
+
+    logger.info("Пул воркеров завершил работу.")
+
+def _worker(worker_id, jobs, context):
+    """
+    Цикл воркера: забирает задания из очереди, пока она не опустеет.
+    :param worker_id: Номер воркера (для логов).
+    :param jobs: Очередь заданий (лига, игровая неделя).
+    :param context: Общий контекст запуска (ScrapeContext).
+    """
+    session = open_session(context, f"Воркер {worker_id}")
+    try:
+        session.ensure_healthy()
+    except Exception as e:
+        logger.error(f"Воркер {worker_id} не смог запустить WebDriver: {e}", exc_info=True)
+        return
+
+    try:
+        while True:
+            try:
+                league_name, gameweek = jobs.get_nowait()
+            except queue.Empty:
+                break
+
+            try:
+                logger.info(f"Воркер {worker_id} взял задание: лига '{league_name}', неделя {gameweek}.")
+                process_gameweek(session, league_name, gameweek, context)
+            except Exception as e:
+                logger.error(
+                    f"Воркер {worker_id}: ошибка при обработке недели {gameweek} для лиги '{league_name}': {e}",
+                    exc_info=True
+                )
+            finally:
+                jobs.task_done()
+    finally:
+        session.close()
+        logger.info(f"Воркер {worker_id}: WebDriver закрыт.")
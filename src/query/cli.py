@@ -0,0 +1,103 @@
+"""
+Запросы к собранным матчам без открытия файлов лиг.
+
+Запуск из корня проекта:
+    python -m src.query.cli matches --league "Spain. La Liga" --team Barcelona
+    python -m src.query.cli summary --league "Spain. La Liga" --gameweek 5
+    python -m src.query.cli leagues
+    python -m src.query.cli serve [--port 8770]
+"""
+import argparse
+import json
+import time
+
+from src.query.http_server import DEFAULT_HOST, DEFAULT_PORT, DEFAULT_REFRESH_INTERVAL, QueryServer
+from src.query.match_store import SOURCE_AUTO, SOURCES, MatchStore
+from src.utils.config_loader import load_settings
+from src.utils.logger_setup import configure_logger, load_logging_config
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Запросы к собранным матчам: фильтры, сводки и локальный HTTP-сервер.")
+    parser.add_argument(
+        "--source", choices=(SOURCE_AUTO,) + SOURCES, help="Источник данных (по умолчанию из настроек)."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    for name, description in (("matches", "Вывести матчи по фильтрам."), ("summary", "Вывести сводку по фильтрам.")):
+        command = commands.add_parser(name, help=description)
+        command.add_argument("--league", help="Название лиги.")
+        command.add_argument("--gameweek", type=int, help="Номер игровой недели.")
+        command.add_argument("--team", help="Команда (хозяева или гости).")
+        if name == "matches":
+            command.add_argument("--finished", action="store_true", default=None, help="Только сыгранные матчи.")
+            command.add_argument("--limit", type=int, help="Максимальное количество матчей.")
+
+    commands.add_parser("leagues", help="Вывести лиги и количество матчей.")
+    serve = commands.add_parser("serve", help="Запустить локальный HTTP-сервер запросов.")
+    serve.add_argument("--host", help="Адрес сервера.")
+    serve.add_argument("--port", type=int, help="Порт сервера.")
+    return parser.parse_args()
+
+def create_store(settings, source=None):
+    """
+    :param settings: Настройки парсера (секции "output" и "query").
+    :param source: Источник данных; по умолчанию query.source.
+    :return: Загруженное хранилище MatchStore.
+    """
+    output = settings.get("output", {})
+    store = MatchStore(
+        output.get("directory", "data"),
+        source or settings.get("query", {}).get("source", SOURCE_AUTO),
+        output.get("sqlite_path"),
+    )
+    store.refresh()
+    return store
+
+def serve(store, settings, host=None, port=None):
+    """
+    Запускает HTTP-сервер запросов и ждет Ctrl+C.
+    :param store: Хранилище MatchStore.
+    :param settings: Настройки парсера (секция "query").
+    """
+    query = settings.get("query", {})
+    server = QueryServer(
+        store,
+        host or query.get("host", DEFAULT_HOST),
+        port or query.get("port", DEFAULT_PORT),
+        query.get("refresh_interval", DEFAULT_REFRESH_INTERVAL),
+    )
+    with server:
+        print(f"Сервер запросов: {server.url}, матчей: {len(store)}  (Ctrl+C — остановить)")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+def main():
+    args = parse_args()
+    config = load_logging_config()
+    config["LOG_CONSOLE_LEVEL"] = "WARNING"
+    configure_logger(config)
+
+    settings = load_settings()
+    store = create_store(settings, args.source)
+    if args.command == "serve":
+        serve(store, settings, args.host, args.port)
+        return
+
+    started = time.perf_counter()
+    if args.command == "matches":
+        records = store.query(args.league, args.gameweek, args.team, args.finished, args.limit)
+        result = [record.as_dict() for record in records]
+    elif args.command == "summary":
+        result = store.summary(args.league, args.gameweek, args.team)
+    else:
+        result = store.leagues()
+    elapsed = (time.perf_counter() - started) * 1000
+
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    print(f"Матчей в хранилище: {len(store)}, время запроса: {elapsed:.3f} мс")
+
+if __name__ == "__main__":
+    main()
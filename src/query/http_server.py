@@ -0,0 +1,140 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from src.utils.logger_setup import logger
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8770
+DEFAULT_REFRESH_INTERVAL = 2.0
+
+class QueryServer:
+    """
+    Локальный HTTP-сервер запросов к MatchStore в отдельном потоке. Ответы — JSON.
+    Перед ответом хранилище дочитывает новые строки, если с прошлого обновления прошло refresh_interval секунд.
+
+    Адреса:
+        /matches?league=&gameweek=&team=&finished=&limit=   матчи по фильтрам
+        /summary?league=&gameweek=&team=                    сводка по фильтрам
+        /leagues                                            лиги и количество матчей
+        /health                                             количество матчей в хранилище
+    """
+
+    def __init__(self, store, host=DEFAULT_HOST, port=DEFAULT_PORT, refresh_interval=DEFAULT_REFRESH_INTERVAL):
+        """
+        :param store: Хранилище матчей (MatchStore).
+        :param host: Адрес сервера.
+        :param port: Порт; 0 — любой свободный.
+        :param refresh_interval: Минимальный интервал между обновлениями хранилища в секундах.
+        """
+        self.store = store
+        self.refresh_interval = refresh_interval
+        self._refresh_lock = threading.Lock()
+        self._refreshed_at = 0.0
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.refresh()
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="query-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+        return False
+
+    def refresh(self, force=True):
+        """
+        Обновляет хранилище. Пока один запрос обновляет хранилище, остальные отвечают по текущим данным.
+        :param force: Обновить независимо от интервала.
+        """
+        if not force and time.monotonic() - self._refreshed_at < self.refresh_interval:
+            return
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+        try:
+            changed = self.store.refresh()
+            self._refreshed_at = time.monotonic()
+            if changed:
+                logger.info(f"Хранилище запросов обновлено: {changed} записей, всего матчей {len(self.store)}.")
+        finally:
+            self._refresh_lock.release()
+
+    def handle(self, path):
+        """
+        :param path: Путь запроса с параметрами.
+        :return: Кортеж (код ответа, словарь ответа).
+        """
+        url = urlsplit(path)
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        route = url.path.rstrip("/") or "/"
+        try:
+            if route == "/matches":
+                records = self.store.query(
+                    params.get("league"), _int(params.get("gameweek")), params.get("team"),
+                    _bool(params.get("finished")), _int(params.get("limit"))
+                )
+                return 200, {"count": len(records), "matches": [record.as_dict() for record in records]}
+            if route == "/summary":
+                return 200, self.store.summary(params.get("league"), _int(params.get("gameweek")), params.get("team"))
+            if route == "/leagues":
+                return 200, {"leagues": self.store.leagues()}
+            if route == "/health":
+                return 200, {"matches": len(self.store)}
+        except ValueError as e:
+            return 400, {"error": str(e)}
+        return 404, {"error": f"Неизвестный адрес: {url.path}"}
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                server.refresh(force=False)
+                started = time.perf_counter()
+                status, payload = server.handle(self.path)
+                payload["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 3)
+                body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+def _int(value):
+    if value in (None, ""):
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"Ожидается целое число: {value}")
+
+def _bool(value):
+    if value in (None, ""):
+        return None
+    return value.strip().lower() in ("1", "true", "yes")
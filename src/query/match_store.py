@@ -0,0 +1,373 @@
+import csv
+import glob
+import io
+import json
+import os
+import sqlite3
+import threading
+
+from openpyxl import load_workbook
+
+from src.utils.excel_saver import HEADERS, EXCEL_COLUMNS
+from src.utils.match_record import COLUMNS, COLUMN_NAMES, MARK_FIELDS, MatchRecord, split_mark, to_float, to_int
+
+SOURCE_AUTO = "auto"
+SOURCE_SQLITE = "sqlite"
+SOURCE_JSONL = "jsonl"
+SOURCE_CSV = "csv"
+SOURCE_EXCEL = "excel"
+
+SOURCES = (SOURCE_SQLITE, SOURCE_JSONL, SOURCE_CSV, SOURCE_EXCEL)
+"""Источники данных в порядке предпочтения при source="auto"."""
+
+_OUTCOMES = {"home win": 1, "draw": 0, "away win": -1}
+
+class MatchStore:
+    """
+    Собранные матчи в памяти с индексами по лиге, игровой неделе и команде. Запись матча определяется ключом
+    MatchRecord.key (лига, сезон, игровая неделя, хозяева, гости); более новая строка того же матча заменяет
+    прежнюю, как в Excel и SQLite. В строках Excel-файлов прежнего формата нет недели и сезона,
+    поэтому фильтр по неделе их не находит.
+    refresh() дочитывает только новые данные: строки SQLite с rowid больше прочитанного, новые строки
+    в конце файлов CSV и JSON Lines; файл Excel перечитывается целиком, только если он изменился.
+    Упорядоченные результаты запросов кэшируются до следующего изменения данных.
+    """
+
+    def __init__(self, directory="data", source=SOURCE_AUTO, sqlite_path=None):
+        """
+        :param directory: Директория с файлами лиг.
+        :param source: Источник данных: "auto" (первый найденный из SOURCES) или один из SOURCES.
+        :param sqlite_path: Путь к базе SQLite (по умолчанию <directory>/matches.sqlite3).
+        """
+        self.directory = directory
+        self.source = source
+        self.sqlite_path = sqlite_path or os.path.join(directory, "matches.sqlite3")
+        self._reader = None
+        self._lock = threading.RLock()
+        self._records = {}
+        self._by_league = {}
+        self._by_gameweek = {}
+        self._by_team = {}
+        self._results = {}
+
+    def refresh(self):
+        """
+        Дочитывает новые и изменившиеся строки источника и обновляет индексы.
+        :return: Количество добавленных или обновленных записей.
+        """
+        with self._lock:
+            if self._reader is None:
+                self._reader = self._open_reader()
+                if self._reader is None:
+                    return 0
+            changed = 0
+            for record in self._reader.read():
+                if record.home_team and record.away_team:
+                    self._upsert(record)
+                    changed += 1
+            if changed:
+                self._results.clear()
+            return changed
+
+    def query(self, league=None, gameweek=None, team=None, finished=None, limit=None):
+        """
+        Отбирает матчи по индексам.
+        :param league: Название лиги.
+        :param gameweek: Номер игровой недели.
+        :param team: Название команды (хозяева или гости, без учета регистра).
+        :param finished: True — только сыгранные, False — только несыгранные, None — все.
+        :param limit: Максимальное количество матчей.
+        :return: Список MatchRecord, упорядоченный по лиге, неделе и хозяевам.
+        """
+        team = team.strip().lower() if team else None
+        with self._lock:
+            cache_key = (league, gameweek, team)
+            records = self._results.get(cache_key)
+            if records is None:
+                records = [self._records[key] for key in self._select(league, gameweek, team)]
+                records.sort(key=lambda record: (record.league, record.gameweek or 0, record.home_team))
+                self._results[cache_key] = records
+        if finished is not None:
+            records = [record for record in records if record.finished == finished]
+        return records[:limit] if limit else list(records)
+
+    def summary(self, league=None, gameweek=None, team=None):
+        """
+        Сводка по отобранным матчам: количество, сыгранные, голы и xG за матч, исходы и точность метки winner.
+        Если задана команда, добавляются победы, ничьи, поражения, забитые и пропущенные голы и xG команды.
+        :return: Словарь со значениями сводки.
+        """
+        records = self.query(league, gameweek, team)
+        # Сыгранным считается матч, у которого известны голы обеих команд: строка без одного из значений
+        # (например, прочитанная из Excel с пустой ячейкой) не должна попадать в подсчет голов и исходов.
+        played = [record for record in records if record.goals_home is not None and record.goals_away is not None]
+        summary = {
+            "matches": len(records),
+            "finished": len(played),
+            "goals_per_match": _mean([record.goals_home + record.goals_away for record in played]),
+            "xg_per_match": _mean([
+                record.xg_home + record.xg_away for record in played
+                if record.xg_home is not None and record.xg_away is not None
+            ]),
+            "home_wins": sum(1 for record in played if record.goals_home > record.goals_away),
+            "draws": sum(1 for record in played if record.goals_home == record.goals_away),
+            "away_wins": sum(1 for record in played if record.goals_home < record.goals_away),
+        }
+        predicted = [
+            (_OUTCOMES[record.winner.strip().lower()], _sign(record.goals_home - record.goals_away))
+            for record in played if record.winner and record.winner.strip().lower() in _OUTCOMES
+        ]
+        summary["winner_accuracy"] = _mean([int(expected == actual) for expected, actual in predicted])
+
+        if team:
+            name = team.strip().lower()
+            results = []
+            for record in played:
+                home = record.home_team.lower() == name
+                goals = (record.goals_home, record.goals_away, record.xg_home, record.xg_away)
+                results.append(goals if home else (goals[1], goals[0], goals[3], goals[2]))
+            summary.update({
+                "wins": sum(1 for scored, conceded, _, _ in results if scored > conceded),
+                "draws": sum(1 for scored, conceded, _, _ in results if scored == conceded),
+                "losses": sum(1 for scored, conceded, _, _ in results if scored < conceded),
+                "goals_for": sum(result[0] for result in results),
+                "goals_against": sum(result[1] for result in results),
+                "xg_for": _round(sum(result[2] for result in results if result[2] is not None)),
+                "xg_against": _round(sum(result[3] for result in results if result[3] is not None)),
+            })
+        return summary
+
+    def leagues(self):
+        """
+        :return: Словарь {лига: количество матчей}.
+        """
+        with self._lock:
+            return {league: len(keys) for league, keys in sorted(self._by_league.items())}
+
+    def teams(self, league=None):
+        """
+        :param league: Название лиги (None — все лиги).
+        :return: Отсортированный список команд.
+        """
+        with self._lock:
+            keys = self._by_league.get(league, ()) if league else self._records
+            # Ключ матча заканчивается хозяевами и гостями (KEY_FIELDS).
+            return sorted({team for key in keys for team in key[-2:]})
+
+    def __len__(self):
+        return len(self._records)
+
+    def _select(self, league, gameweek, team):
+        """
+        Пересекает индексы заданных фильтров, начиная с самого маленького. Вызывается под блокировкой.
+        :param team: Название команды в нижнем регистре.
+        :return: Множество ключей матчей.
+        """
+        selected = []
+        if league:
+            selected.append(self._by_league.get(league, set()))
+        if gameweek is not None:
+            selected.append(self._by_gameweek.get(gameweek, set()))
+        if team:
+            selected.append(self._by_team.get(team, set()))
+        if not selected:
+            return set(self._records)
+        selected.sort(key=len)
+        return selected[0].intersection(*selected[1:])
+
+    def _upsert(self, record):
+        """
+        Добавляет или заменяет запись матча и обновляет индексы. Вызывается под блокировкой.
+        :param record: MatchRecord.
+        """
+        key = record.key
+        self._records[key] = record
+        self._by_league.setdefault(record.league, set()).add(key)
+        if record.gameweek is not None:
+            self._by_gameweek.setdefault(record.gameweek, set()).add(key)
+        for team in (record.home_team, record.away_team):
+            self._by_team.setdefault(team.lower(), set()).add(key)
+
+    def _open_reader(self):
+        """
+        :return: Читатель выбранного источника или None, если данных еще нет.
+        """
+        readers = {
+            SOURCE_SQLITE: lambda: _SQLiteReader(self.sqlite_path),
+            SOURCE_JSONL: lambda: _AppendReader(self.directory, "jsonl", _parse_jsonl),
+            SOURCE_CSV: lambda: _AppendReader(self.directory, "csv", None),
+            SOURCE_EXCEL: lambda: _ExcelReader(self.directory),
+        }
+        if self.source != SOURCE_AUTO:
+            return readers[self.source]()
+        for name in SOURCES:
+            reader = readers[name]()
+            if reader.available():
+                return reader
+        return None
+
+class _SQLiteReader:
+    """
+    Таблица matches базы SQLite. SQLiteSink записывает строки через INSERT OR REPLACE, и замененная строка
+    получает новый rowid, поэтому новые и обновленные матчи — это строки с rowid больше прочитанного.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._rowid = 0
+
+    def available(self):
+        return os.path.exists(self.path)
+
+    def read(self):
+        if not self.available():
+            return []
+        db = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+        try:
+            rows = db.execute(
+                f"SELECT rowid, {', '.join(COLUMN_NAMES)} FROM matches WHERE rowid > ? ORDER BY rowid", (self._rowid,)
+            ).fetchall()
+        except sqlite3.OperationalError:
+            return []
+        finally:
+            db.close()
+        if rows:
+            self._rowid = rows[-1][0]
+        return [MatchRecord(**dict(zip(COLUMN_NAMES, row[1:]))) for row in rows]
+
+class _AppendReader:
+    """
+    Файлы CSV или JSON Lines лиг, в которые приемники только дописывают строки. Для каждого файла запоминается
+    позиция после последней полной строки, и при обновлении читается только дописанный хвост.
+    """
+
+    def __init__(self, directory, extension, parse):
+        """
+        :param parse: Функция разбора строки JSON Lines; None — файл CSV.
+        """
+        self.directory = directory
+        self.extension = extension
+        self.parse = parse
+        self._offsets = {}
+        self._headers = {}
+
+    def available(self):
+        return bool(glob.glob(os.path.join(self.directory, f"*.{self.extension}")))
+
+    def read(self):
+        records = []
+        for path in sorted(glob.glob(os.path.join(self.directory, f"*.{self.extension}"))):
+            offset = self._offsets.get(path, 0)
+            if os.path.getsize(path) <= offset:
+                continue
+            with open(path, "rb") as file:
+                file.seek(offset)
+                data = file.read()
+            end = data.rfind(b"\n") + 1
+            if not end:
+                continue
+            self._offsets[path] = offset + end
+            text = data[:end].decode("utf-8")
+            if self.parse is not None:
+                records.extend(self.parse(line) for line in text.splitlines() if line.strip())
+            else:
+                records.extend(self._parse_csv(path, text))
+        return records
+
+    def _parse_csv(self, path, text):
+        rows = csv.reader(io.StringIO(text, newline=""))
+        header = self._headers.get(path)
+        for row in rows:
+            if header is None:
+                header = self._headers[path] = row
+                continue
+            yield _typed(dict(zip(header, row)))
+
+class _ExcelReader:
+    """
+    Файлы Excel лиг (название лиги — имя файла). Excel не поддерживает дочитывание, поэтому файл
+    перечитывается целиком, но только если изменились его размер или время изменения.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._versions = {}
+
+    def available(self):
+        return bool(self._paths())
+
+    def read(self):
+        records = []
+        for path in self._paths():
+            stat = os.stat(path)
+            version = (stat.st_size, stat.st_mtime_ns)
+            if self._versions.get(path) == version:
+                continue
+            self._versions[path] = version
+            records.extend(_read_excel(path))
+        return records
+
+    def _paths(self):
+        return [
+            path for path in sorted(glob.glob(os.path.join(self.directory, "*.xlsx")))
+            if not os.path.basename(path).startswith("~$")
+        ]
+
+def _read_excel(path):
+    """
+    :param path: Путь к файлу Excel лиги.
+    :return: Список MatchRecord; значения "метка (оценка)" и проценты разбираются так же, как в MatchRecord.
+    """
+    league = os.path.splitext(os.path.basename(path))[0]
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return []
+        positions = [(column, list(header).index(title)) for column, title in zip(EXCEL_COLUMNS, HEADERS)
+                     if title in header]
+        records = []
+        for row in rows:
+            values = {"league": league}
+            for column, position in positions:
+                values[column] = row[position] if position < len(row) else None
+            for column, _ in MARK_FIELDS:
+                text = values.get(column)
+                if isinstance(text, str):
+                    values[column], values[f"{column}_mark"] = split_mark(text)
+            records.append(_typed(values))
+        return records
+    finally:
+        workbook.close()
+
+def _parse_jsonl(line):
+    return _typed(json.loads(line))
+
+def _typed(values):
+    """
+    Приводит значения столбцов к типам COLUMNS (пустые строки — None).
+    :param values: Словарь {столбец: значение}.
+    :return: Объект MatchRecord.
+    """
+    typed = {}
+    for name, kind in COLUMNS:
+        value = values.get(name)
+        if value == "" or value is None:
+            typed[name] = None
+        elif kind is float:
+            typed[name] = to_float(value)
+        elif kind is int:
+            typed[name] = to_int(value)
+        else:
+            typed[name] = str(value).strip() or None
+    return MatchRecord(**typed)
+
+def _mean(values):
+    return _round(sum(values) / len(values)) if values else None
+
+def _round(value):
+    return round(value, 3)
+
+def _sign(value):
+    return (value > 0) - (value < 0)
@@ -29,4 +29,28 @@ def load_config_from_file(config_path="config/data_collection_settings.json"):
             logger.warning("Файл конфигурации не найден.")
     else:
         logger.warning(f"Файл конфигурации не существует: {config_path}")
-    return []
\ No newline at end of file
+    return []
+
+def load_settings(settings_path="config/parser_settings.json"):
+    """
+    Загружает настройки работы парсера (количество воркеров и т.п.).
+    :param settings_path: Путь к файлу настроек.
+    :return: Словарь настроек. Пустой словарь, если файл отсутствует или некорректен.
+    """
+    if not os.path.exists(settings_path):
+        logger.info(f"Файл настроек не найден, используются значения по умолчанию: {settings_path}")
+        return {}
+
+    try:
+        with open(settings_path, "r", encoding="utf-8") as file:
+            settings = json.load(file)
+    except json.JSONDecodeError as e:
+        logger.warning(f"Ошибка в формате файла настроек: {e}")
+        return {}
+
+    if not isinstance(settings, dict):
+        logger.warning("Формат файла настроек некорректен. Ожидается объект.")
+        return {}
+
+    logger.info("Настройки парсера успешно загружены из файла.")
+    return settings
@@ -1,118 +1,328 @@
 import os
+import threading
 
 from openpyxl import Workbook, load_workbook
 from openpyxl.utils import get_column_letter
 from openpyxl.styles import Alignment
 
 from src.utils.logger_setup import logger
+from src.utils.match_record import PERCENT_FIELDS, to_record
+from src.utils.stage_metrics import metrics
 
-def save_data_to_excel(data, league_name):
+DEFAULT_BATCH_SIZE = 20
+
+HEADERS = [
+    "Team (Home)", "Team (Away)", "Home / Away", "Over / Under", "Both To Score",
+    "Correct Score", "Team Rating (Home)", "Team Rating (Away)", "Team Form (Home)",
+    "Team Form (Away)", "XG Luckiness (Home)", "XG Luckiness (Away)", "XG Predictability (Home)",
+    "XG Predictability (Away)", "Avg XG Scored (Home)", "Avg XG Scored (Away)",
+    "Avg XG Conceded (Home)", "Avg XG Conceded (Away)", "Match Score Prediction (Home)",
+    "Match Score Prediction (Away)", "Goals (Home)", "Goals (Away)",
+    "Expected Goals (Home)", "Expected Goals (Away)", "Gameweek", "Season"
+]
+
+EXCEL_COLUMNS = [
+    "home_team", "away_team", "winner", "total", "both_to_score",
+    "correct_score", "team_rating_home", "team_rating_away", "team_form_home",
+    "team_form_away", "xg_luckiness_home", "xg_luckiness_away", "xg_predictability_home",
+    "xg_predictability_away", "avg_xg_scored_home", "avg_xg_scored_away",
+    "avg_xg_conceded_home", "avg_xg_conceded_away", "predicted_goals_home",
+    "predicted_goals_away", "goals_home", "goals_away",
+    "xg_home", "xg_away", "gameweek", "season"
+]
+"""
+Столбцы MatchRecord в порядке HEADERS. Значения "метка (оценка)" собираются обратно в одну ячейку.
+Неделя и сезон добавлены в конец, поэтому в файлах прежнего формата дописываются только их заголовки.
+"""
+
+NUMBER_FORMATS = {column: '0"%"' for column in PERCENT_FIELDS}
+
+_file_locks = {}
+_file_locks_guard = threading.Lock()
+
+def _get_file_lock(league_name):
     """
-    Сохраняет данные в Excel-файл для указанной лиги. Создает новый файл или обновляет существующий.
-    :param data: Словарь данных матча или список словарей.
-    :param league_name: Название лиги (используется для имени файла).
+    Возвращает блокировку для файла лиги, чтобы параллельные воркеры не перезаписывали данные друг друга.
+    :param league_name: Название лиги.
+    :return: Объект threading.RLock.
+    """
+    with _file_locks_guard:
+        if league_name not in _file_locks:
+            _file_locks[league_name] = threading.RLock()
+        return _file_locks[league_name]
+
+def _get_output_dir(directory=None):
+    """
+    Возвращает директорию для Excel-файлов и создает ее при необходимости.
+    :param directory: Директория файлов. По умолчанию — директория data проекта.
+    :return: Абсолютный путь к директории.
+    """
+    output_dir = os.path.abspath(directory or os.path.join(os.path.dirname(__file__), "..", "..", "data"))
+    os.makedirs(output_dir, exist_ok=True)
+    return output_dir
+
+class ExcelWriter:
     """
-    try:
-        output_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "data"))
-        os.makedirs(output_dir, exist_ok=True)
-        
-        file_path = os.path.join(output_dir, f"{league_name}.xlsx")
-
-        if os.path.exists(file_path):
-            workbook = load_workbook(file_path)
-            sheet = workbook.active
-            existing_rows = sheet.max_row
-            logger.info(f"Файл {file_path} найден. Данные будут добавлены.")
+    Excel-файл одной лиги, открытый на всё время работы.
+    Строки накапливаются в буфере и сохраняются на диск пачками по batch_size,
+    ширина столбцов пересчитывается по мере добавления строк.
+    Строка несыгранного матча (без забитых голов) заменяется новыми данными того же матча
+    (ключ MatchRecord.key: лига, сезон, игровая неделя, хозяева, гости), а не дублируется.
+    Числовые значения записываются в ячейки числами.
+    """
+
+    def __init__(self, league_name, batch_size=DEFAULT_BATCH_SIZE, directory=None):
+        """
+        :param league_name: Название лиги (используется для имени файла).
+        :param batch_size: Количество строк, после которого буфер сбрасывается в файл.
+        :param directory: Директория файлов. По умолчанию — директория data проекта.
+        """
+        self.league_name = league_name
+        self.batch_size = max(1, batch_size)
+        self.file_path = os.path.join(_get_output_dir(directory), f"{league_name}.xlsx")
+        self._lock = _get_file_lock(league_name)
+        self._buffer = []
+        self._workbook = None
+        self._sheet = None
+        self._rows = 0
+        self._widths = []
+        self._pending = {}
+
+    def write(self, data):
+        """
+        Добавляет данные матча в буфер и сбрасывает буфер в файл при его заполнении.
+        :param data: MatchRecord, словарь данных матча или список таких значений.
+        """
+        if not isinstance(data, list):
+            data = [data]
+
+        with self._lock:
+            self._buffer.extend(to_record(match, self.league_name) for match in data)
+            if len(self._buffer) >= self.batch_size:
+                self.flush()
+
+    def flush(self):
+        """
+        Записывает накопленные строки в лист и сохраняет файл. При ошибке строки остаются в буфере.
+        :return: True, если все строки буфера сохранены.
+        """
+        with self._lock:
+            if not self._buffer:
+                return True
+
+            try:
+                with metrics.stage("excel.flush"):
+                    self._write_buffer()
+                logger.info(f"В файл {self.file_path} сохранено строк: {len(self._buffer)}.")
+                self._buffer.clear()
+                return True
+
+            except Exception as e:
+                logger.error(f"Ошибка при сохранении данных в файл {self.league_name}.xlsx: {e}")
+                # Строки буфера могли уже попасть в лист; книга открывается заново из последнего сохраненного файла,
+                # чтобы при следующей попытке они не добавились повторно.
+                self._reset()
+                return False
+
+    def _write_buffer(self):
+        """
+        Записывает строки буфера в лист и сохраняет файл. Вызывается под блокировкой.
+        """
+        if self._workbook is None:
+            self._open()
+
+        for record in self._buffer:
+            key = record.key
+            known = record.home_team and record.away_team
+            row_num = self._pending.get(key) if known else None
+            if row_num is None:
+                self._rows += 1
+                row_num = self._rows
+
+            self._track_widths(_write_row(self._sheet, row_num, record))
+
+            if known:
+                if not record.finished:
+                    self._pending[key] = row_num
+                else:
+                    self._pending.pop(key, None)
+
+        self._apply_widths()
+        self._workbook.save(self.file_path)
+
+    def close(self):
+        """
+        Сбрасывает остаток буфера и освобождает книгу.
+        """
+        with self._lock:
+            self.flush()
+            self._reset()
+
+    def _reset(self):
+        """
+        Освобождает книгу; при следующей записи она открывается из файла. Вызывается под блокировкой.
+        """
+        self._workbook = None
+        self._sheet = None
+        self._rows = 0
+        self._widths = []
+        self._pending = {}
+
+    def _open(self):
+        """
+        Открывает существующий файл лиги или создает новый с заголовками.
+        """
+        if os.path.exists(self.file_path):
+            self._workbook = load_workbook(self.file_path)
+            self._sheet = self._workbook.active
+            self._rows = self._sheet.max_row - 1
+            header = [cell.value for cell in self._sheet[1]]
+            if header != HEADERS and header == HEADERS[:len(header)]:
+                # Файл прежнего формата: в конец дописываются заголовки новых столбцов.
+                _add_headers(self._sheet)
+            self._pending = _find_pending_rows(self._sheet, self.league_name)
+            self._widths = [
+                max(0, (self._sheet.column_dimensions[get_column_letter(col_num)].width or 2) - 2)
+                for col_num in range(1, len(HEADERS) + 1)
+            ]
+            logger.info(f"Файл {self.file_path} найден. Данные будут добавлены.")
         else:
-            workbook = Workbook()
-            sheet = workbook.active
-            sheet.title = league_name
-            existing_rows = 0
-            _add_headers(sheet)
+            self._workbook = Workbook()
+            self._sheet = self._workbook.active
+            self._sheet.title = self.league_name
+            self._rows = 0
+            _add_headers(self._sheet)
+            self._track_widths(HEADERS)
             logger.info("Создан новый файл с заголовками столбцов.")
 
-        if isinstance(data, dict):
-            data = [data]
+    def _track_widths(self, values):
+        """
+        Обновляет максимальную длину значений по столбцам.
+        :param values: Значения одной строки.
+        """
+        if len(self._widths) < len(values):
+            self._widths.extend([0] * (len(values) - len(self._widths)))
+        for idx, value in enumerate(values):
+            if value:
+                self._widths[idx] = max(self._widths[idx], len(str(value)))
 
-        for lot in data:
-            _write_row(sheet, existing_rows + 1, lot)
-            existing_rows += 1
+    def _apply_widths(self):
+        """
+        Применяет накопленные значения ширины к столбцам листа.
+        """
+        for col_num, max_length in enumerate(self._widths, start=1):
+            self._sheet.column_dimensions[get_column_letter(col_num)].width = max_length + 2
 
-        _adjust_column_widths(sheet, existing_rows)
+class ExcelSink:
+    """
+    Набор ExcelWriter по лигам, открытый на всё время запуска.
+    """
+
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE, directory=None):
+        """
+        :param batch_size: Размер пачки строк для каждого файла лиги.
+        :param directory: Директория файлов. По умолчанию — директория data проекта.
+        """
+        self.batch_size = batch_size
+        self.directory = directory
+        self._writers = {}
+        self._guard = threading.Lock()
 
-        workbook.save(file_path)
-        logger.info(f"Данные успешно сохранены в файл: {file_path}")
+    def write(self, data, league_name):
+        """
+        Добавляет данные матча в буфер файла лиги.
+        :param data: MatchRecord, словарь данных матча или список таких значений.
+        :param league_name: Название лиги.
+        """
+        self._get_writer(league_name).write(data)
 
-    except Exception as e:
-        logger.error(f"Ошибка при сохранении данных в файл {league_name}.xlsx: {e}")
+    def flush(self):
+        """
+        Сбрасывает буферы всех лиг в файлы.
+        :return: True, если все файлы сохранены.
+        """
+        results = [writer.flush() for writer in list(self._writers.values())]
+        return all(results)
+
+    def close(self):
+        """
+        Сбрасывает остатки буферов и закрывает все файлы.
+        """
+        for writer in list(self._writers.values()):
+            writer.close()
+        logger.info("Все Excel-файлы сохранены и закрыты.")
+
+    def _get_writer(self, league_name):
+        """
+        Возвращает ExcelWriter лиги, создавая его при первом обращении.
+        :param league_name: Название лиги.
+        :return: Объект ExcelWriter.
+        """
+        with self._guard:
+            if league_name not in self._writers:
+                self._writers[league_name] = ExcelWriter(league_name, self.batch_size, self.directory)
+            return self._writers[league_name]
+
+def save_data_to_excel(data, league_name, directory=None):
+    """
+    Сохраняет данные в Excel-файл для указанной лиги. Создает новый файл или обновляет существующий.
+    Для записи большого количества матчей используйте ExcelSink.
+    :param data: MatchRecord, словарь данных матча или список таких значений.
+    :param league_name: Название лиги (используется для имени файла).
+    :param directory: Директория файлов. По умолчанию — директория data проекта.
+    """
+    writer = ExcelWriter(league_name, directory=directory)
+    writer.write(data)
+    writer.close()
+
+def _find_pending_rows(sheet, league_name):
+    """
+    Находит строки несыгранных матчей (без забитых голов) в существующем листе.
+    :param sheet: Лист Excel.
+    :param league_name: Название лиги.
+    :return: Словарь {ключ MatchRecord.key: номер строки данных}. У строк прежнего формата
+        неделя и сезон в ключе — None.
+    """
+    column = {
+        name: EXCEL_COLUMNS.index(name) for name in ("home_team", "away_team", "goals_home", "gameweek", "season")
+    }
+    pending = {}
+    for row_num, values in enumerate(sheet.iter_rows(min_row=2, values_only=True), start=1):
+        values = list(values or ()) + [None] * (len(EXCEL_COLUMNS) - len(values or ()))
+        if values[column["home_team"]] and values[column["goals_home"]] in (None, ""):
+            key = (
+                league_name, values[column["season"]] or None, values[column["gameweek"]],
+                values[column["home_team"]], values[column["away_team"]]
+            )
+            pending[key] = row_num
+    return pending
 
 def _add_headers(sheet):
     """
     Добавляет заголовки в лист Excel.
     :param sheet: Лист Excel.
     """
-    headers = [
-        "Team (Home)", "Team (Away)", "Home / Away", "Over / Under", "Both To Score",
-        "Correct Score", "Team Rating (Home)", "Team Rating (Away)", "Team Form (Home)",
-        "Team Form (Away)", "XG Luckiness (Home)", "XG Luckiness (Away)", "XG Predictability (Home)",
-        "XG Predictability (Away)", "Avg XG Scored (Home)", "Avg XG Scored (Away)",
-        "Avg XG Conceded (Home)", "Avg XG Conceded (Away)", "Match Score Prediction (Home)",
-        "Match Score Prediction (Away)", "Goals (Home)", "Goals (Away)",
-        "Expected Goals (Home)", "Expected Goals (Away)"
-    ]
-    for col_num, header in enumerate(headers, start=1):
+    for col_num, header in enumerate(HEADERS, start=1):
         cell = sheet.cell(row=1, column=col_num, value=header)
         cell.alignment = Alignment(horizontal="center", vertical="center")
 
-def _write_row(sheet, row_num, match):
+def _write_row(sheet, row_num, record):
     """
     Записывает одну строку данных в лист Excel.
     :param sheet: Лист Excel.
     :param row_num: Номер строки.
-    :param match: Словарь с данными матча.
+    :param record: Объект MatchRecord.
+    :return: Список записанных значений.
     """
     row = [
-        match["preview"].get("team_name_1", ""),
-        match["preview"].get("team_name_2", ""),
-        match["preview"].get("winner", ""),
-        match["preview"].get("total_under", ""),
-        match["preview"].get("both_to_score", ""),
-        match["preview"].get("correct_score", ""),
-        match["preview"].get("team_rating_home", ""),
-        match["preview"].get("team_rating_away", ""),
-        match["preview"].get("team_form_home", ""),
-        match["preview"].get("team_form_away", ""),
-        match["preview"].get("xg_luckiness_home", ""),
-        match["preview"].get("xg_luckiness_away", ""),
-        match["preview"].get("xg_predictability_home", ""),
-        match["preview"].get("xg_predictability_away", ""),
-        match["preview"].get("avg_xg_scored_home", ""),
-        match["preview"].get("avg_xg_scored_away", ""),
-        match["preview"].get("avg_xg_conceded_home", ""),
-        match["preview"].get("avg_xg_conceded_away", ""),
-        match["match_score_prediction"].get("match_score_prediction_home", ""),
-        match["match_score_prediction"].get("match_score_prediction_away", ""),
-        match["xg_statistics"].get("goals_team_1", ""),
-        match["xg_statistics"].get("goals_team_2", ""),
-        match["xg_statistics"].get("expected_goals_team_1", ""),
-        match["xg_statistics"].get("expected_goals_team_2", ""),
+        record.mark_text(column) if column in _MARK_COLUMNS else getattr(record, column)
+        for column in EXCEL_COLUMNS
     ]
-    for col_num, value in enumerate(row, start=1):
+    for col_num, (column, value) in enumerate(zip(EXCEL_COLUMNS, row), start=1):
         cell = sheet.cell(row=row_num + 1, column=col_num, value=value)
         cell.alignment = Alignment(horizontal="center", vertical="center")
+        if column in NUMBER_FORMATS and value is not None:
+            cell.number_format = NUMBER_FORMATS[column]
+    return row
 
-def _adjust_column_widths(sheet, up_to_row):
-    """
-    Корректирует ширину столбцов на основе данных.
-    :param sheet: Лист Excel.
-    :param up_to_row: Количество строк, до которых корректируется ширина.
-    """
-    for col_num in range(1, sheet.max_column + 1):
-        max_length = 0
-        column_letter = get_column_letter(col_num)
-        for row in range(1, up_to_row + 1):
-            cell = sheet.cell(row=row, column=col_num)
-            if cell.value:
-                max_length = max(max_length, len(str(cell.value)))
-        adjusted_width = max_length + 2
-        sheet.column_dimensions[column_letter].width = adjusted_width
+_MARK_COLUMNS = {"winner", "total", "both_to_score", "correct_score"}
@@ -0,0 +1,231 @@
+import os
+import sqlite3
+import threading
+import time
+
+from src.utils.logger_setup import logger
+
+RUN_RUNNING = "running"
+RUN_FINISHED = "finished"
+RUN_INCOMPLETE = "incomplete"
+
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS runs ("
+    "id INTEGER PRIMARY KEY AUTOINCREMENT, started_at INTEGER, resumed_at INTEGER, finished_at INTEGER, status TEXT)",
+    "CREATE TABLE IF NOT EXISTS gameweeks ("
+    "run_id INTEGER, league TEXT, gameweek INTEGER, status TEXT, started_at INTEGER, finished_at INTEGER, "
+    "matches INTEGER DEFAULT 0, failed INTEGER DEFAULT 0, error TEXT, PRIMARY KEY (run_id, league, gameweek))",
+    "CREATE TABLE IF NOT EXISTS matches ("
+    "run_id INTEGER, link TEXT, league TEXT, gameweek INTEGER, status TEXT, updated_at INTEGER, error TEXT, "
+    "PRIMARY KEY (run_id, link))",
+)
+
+class JobJournal:
+    """
+    Журнал заданий запуска в базе SQLite: состояние каждой лиги, игровой недели и матча.
+    Недели отмечаются сразу, а собранные матчи — только в контрольной точке commit(), которая вызывается
+    после сброса буферов приемника: журнал не отмечает матч, строка которого еще не записана.
+    Незавершенный запуск можно продолжить (resume): завершенные недели и собранные матчи пропускаются.
+    """
+
+    def __init__(self, path="data/job_journal.sqlite3"):
+        """
+        :param path: Путь к файлу базы журнала.
+        """
+        self.path = path
+        self.run_id = None
+        self.resumed = False
+        self._lock = threading.Lock()
+        self._pending = []
+        self._done_gameweeks = set()
+        self._done_matches = set()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        with self._db:
+            for statement in _SCHEMA:
+                self._db.execute(statement)
+
+    def begin(self, resume=False):
+        """
+        Начинает новый запуск или продолжает последний незавершенный.
+        :param resume: Продолжить последний незавершенный запуск, если он есть.
+        :return: Номер запуска.
+        """
+        now = int(time.time())
+        with self._lock:
+            row = None
+            if resume:
+                row = self._db.execute(
+                    "SELECT id FROM runs WHERE status != ? ORDER BY id DESC LIMIT 1", (RUN_FINISHED,)
+                ).fetchone()
+
+            with self._db:
+                if row is None:
+                    self.run_id = self._db.execute(
+                        "INSERT INTO runs (started_at, status) VALUES (?, ?)", (now, RUN_RUNNING)
+                    ).lastrowid
+                else:
+                    self.run_id = row[0]
+                    self.resumed = True
+                    self._db.execute(
+                        "UPDATE runs SET resumed_at = ?, status = ? WHERE id = ?", (now, RUN_RUNNING, self.run_id)
+                    )
+
+            self._done_gameweeks = {
+                (league, gameweek) for league, gameweek in self._db.execute(
+                    "SELECT league, gameweek FROM gameweeks WHERE run_id = ? AND status = ?",
+                    (self.run_id, STATUS_DONE)
+                )
+            }
+            self._done_matches = {
+                link for link, in self._db.execute(
+                    "SELECT link FROM matches WHERE run_id = ? AND status = ?", (self.run_id, STATUS_DONE)
+                )
+            }
+
+        if resume and not self.resumed:
+            logger.info("Незавершенных запусков в журнале нет, начинается новый запуск.")
+        elif self.resumed:
+            logger.info(
+                f"Продолжение запуска #{self.run_id}: завершено недель {len(self._done_gameweeks)}, "
+                f"собрано матчей {len(self._done_matches)}."
+            )
+        return self.run_id
+
+    def is_gameweek_done(self, league_name, gameweek):
+        """
+        :param league_name: Название лиги.
+        :param gameweek: Номер игровой недели.
+        :return: True, если неделя полностью обработана в текущем запуске.
+        """
+        with self._lock:
+            return (league_name, gameweek) in self._done_gameweeks
+
+    def is_match_done(self, link):
+        """
+        :param link: Ссылка на страницу матча.
+        :return: True, если матч собран и записан в текущем запуске.
+        """
+        with self._lock:
+            return link in self._done_matches
+
+    def start_gameweek(self, league_name, gameweek):
+        """
+        Отмечает начало обработки игровой недели.
+        :param league_name: Название лиги.
+        :param gameweek: Номер игровой недели.
+        """
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT INTO gameweeks (run_id, league, gameweek, status, started_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (run_id, league, gameweek) DO UPDATE SET status = excluded.status, "
+                "started_at = excluded.started_at, error = NULL",
+                (self.run_id, league_name, gameweek, STATUS_RUNNING, int(time.time()))
+            )
+
+    def finish_gameweek(self, league_name, gameweek, error=None):
+        """
+        Отмечает завершение игровой недели. Неделя считается завершенной, только если
+        она обработана без ошибки, все ее матчи собраны и записаны контрольной точкой;
+        иначе при продолжении она обрабатывается снова.
+        :param league_name: Название лиги.
+        :param gameweek: Номер игровой недели.
+        :param error: Текст ошибки, если неделя прервалась.
+        """
+        with self._lock, self._db:
+            matches, failed = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(status = ?), 0) FROM matches "
+                "WHERE run_id = ? AND league = ? AND gameweek = ?",
+                (STATUS_FAILED, self.run_id, league_name, gameweek)
+            ).fetchone()
+            unsaved = sum(1 for row in self._pending if row[2] == league_name and row[3] == gameweek)
+            if error is None and unsaved:
+                error = f"матчей без контрольной точки: {unsaved}"
+            status = STATUS_DONE if error is None and not failed else STATUS_FAILED
+            self._db.execute(
+                "UPDATE gameweeks SET status = ?, finished_at = ?, matches = ?, failed = ?, error = ? "
+                "WHERE run_id = ? AND league = ? AND gameweek = ?",
+                (status, int(time.time()), matches, failed, error, self.run_id, league_name, gameweek)
+            )
+            if status == STATUS_DONE:
+                self._done_gameweeks.add((league_name, gameweek))
+
+    def record_match(self, link, league_name, gameweek, error=None):
+        """
+        Добавляет результат обработки матча. Собранные матчи записываются в журнал при следующем commit(),
+        ошибки — сразу.
+        :param link: Ссылка на страницу матча.
+        :param league_name: Название лиги.
+        :param gameweek: Номер игровой недели.
+        :param error: Текст ошибки, если матч не собран.
+        """
+        row = (self.run_id, link, league_name, gameweek,
+               STATUS_DONE if error is None else STATUS_FAILED, int(time.time()), error)
+        with self._lock:
+            if error is None:
+                self._pending.append(row)
+                return
+            with self._db:
+                self._write_matches([row])
+
+    def commit(self):
+        """
+        Контрольная точка: записывает собранные матчи. Вызывается после сброса буферов приемника.
+        """
+        with self._lock:
+            if not self._pending:
+                return
+            with self._db:
+                self._write_matches(self._pending)
+            self._done_matches.update(row[1] for row in self._pending)
+            self._pending = []
+
+    def finish_run(self):
+        """
+        Завершает запуск: если все недели обработаны без ошибок, запуск закрывается,
+        иначе остается незавершенным и может быть продолжен.
+        :return: Статус запуска.
+        """
+        self.commit()
+        with self._lock, self._db:
+            unfinished, = self._db.execute(
+                "SELECT COUNT(*) FROM gameweeks WHERE run_id = ? AND status != ?", (self.run_id, STATUS_DONE)
+            ).fetchone()
+            status = RUN_FINISHED if not unfinished else RUN_INCOMPLETE
+            self._db.execute(
+                "UPDATE runs SET finished_at = ?, status = ? WHERE id = ?", (int(time.time()), status, self.run_id)
+            )
+
+        if status == RUN_INCOMPLETE:
+            logger.warning(
+                f"Запуск #{self.run_id} завершен с необработанными неделями: {unfinished}. "
+                f"Продолжить: python main.py --resume"
+            )
+        return status
+
+    def close(self):
+        """
+        Закрывает базу. Матчи, не записанные контрольной точкой commit(), не отмечаются: их строки могли
+        не попасть в приемник, поэтому при продолжении запуска они собираются заново.
+        """
+        with self._lock:
+            if self._pending:
+                logger.warning(f"Журнал заданий: не отмечено матчей без контрольной точки: {len(self._pending)}.")
+            self._pending = []
+            self._db.close()
+
+    def _write_matches(self, rows):
+        """
+        Записывает строки матчей. Вызывается под блокировкой внутри транзакции.
+        :param rows: Кортежи (run_id, link, league, gameweek, status, updated_at, error).
+        """
+        self._db.executemany(
+            "INSERT OR REPLACE INTO matches (run_id, link, league, gameweek, status, updated_at, error) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            rows
+        )
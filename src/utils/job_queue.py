@@ -0,0 +1,461 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from src.utils.logger_setup import logger
+from src.utils.match_record import MatchRecord
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+BACKEND_SQLITE = "sqlite"
+BACKEND_REDIS = "redis"
+
+STATUS_PENDING = "pending"
+STATUS_LEASED = "leased"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+DEFAULT_LEASE_SECONDS = 300
+DEFAULT_MAX_ATTEMPTS = 3
+
+LEASE_EXPIRED_ERROR = "аренда истекла"
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS jobs ("
+    "league TEXT, gameweek INTEGER, status TEXT, worker TEXT, lease_until REAL, attempts INTEGER DEFAULT 0, "
+    "error TEXT, updated_at INTEGER, PRIMARY KEY (league, gameweek))",
+    "CREATE TABLE IF NOT EXISTS results ("
+    "id INTEGER PRIMARY KEY AUTOINCREMENT, league TEXT, worker TEXT, record TEXT, created_at INTEGER)",
+)
+
+class SQLiteJobQueue:
+    """
+    Общая очередь заданий (лига, игровая неделя) в базе SQLite для координатора и воркеров на одной машине
+    (в разных процессах). База работает в режиме WAL, которому нужна общая память процессов (файл -shm),
+    поэтому файл базы нельзя размещать на сетевом диске (NFS, SMB): блокировки там не работают
+    и база может быть повреждена. Для воркеров на нескольких машинах используется RedisJobQueue. Воркер берет задание в аренду на lease_seconds секунд и продлевает ее,
+    пока обрабатывает неделю; задание с просроченной арендой (воркер завис или остановлен) возвращается в очередь,
+    а если попытки исчерпаны — считается неудачным.
+    Собранные воркерами записи матчей передаются координатору через таблицу results.
+    """
+
+    def __init__(self, path="data/job_queue.sqlite3", lease_seconds=DEFAULT_LEASE_SECONDS,
+                 max_attempts=DEFAULT_MAX_ATTEMPTS):
+        """
+        :param path: Путь к файлу базы очереди.
+        :param lease_seconds: Срок аренды задания в секундах; продлевается heartbeat().
+        :param max_attempts: Сколько раз задание выдается воркерам, прежде чем считается неудачным.
+        """
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max(1, max_attempts)
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=60, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        for statement in _SCHEMA:
+            self._db.execute(statement)
+
+    def enqueue(self, jobs, reset=False):
+        """
+        Добавляет задания в очередь. Уже известные задания не дублируются, а неудачные задания
+        предыдущего запуска возвращаются в очередь с обнуленным счетчиком попыток.
+        :param jobs: Список кортежей (лига, игровая неделя).
+        :param reset: Удалить все задания перед добавлением. Несобранные результаты воркеров сохраняются.
+        :return: Количество добавленных и возвращенных в очередь заданий.
+        """
+        now = int(time.time())
+        with self._lock, _immediate(self._db):
+            if reset:
+                self._db.execute("DELETE FROM jobs")
+            before = self._db.total_changes
+            self._db.executemany(
+                "INSERT OR IGNORE INTO jobs (league, gameweek, status, updated_at) VALUES (?, ?, ?, ?)",
+                [(league, gameweek, STATUS_PENDING, now) for league, gameweek in jobs]
+            )
+            self._db.executemany(
+                "UPDATE jobs SET status = ?, worker = NULL, lease_until = NULL, attempts = 0, error = NULL, "
+                "updated_at = ? WHERE league = ? AND gameweek = ? AND status = ?",
+                [(STATUS_PENDING, now, league, gameweek, STATUS_FAILED) for league, gameweek in jobs]
+            )
+            return self._db.total_changes - before
+
+    def lease(self, worker):
+        """
+        Выдает воркеру следующее задание в аренду. Перед выдачей задания с просроченной арендой
+        возвращаются в очередь, а задания, исчерпавшие max_attempts попыток, отмечаются неудачными.
+        :param worker: Имя воркера (например, "host-1:1234").
+        :return: Кортеж (лига, игровая неделя) или None, если свободных заданий нет.
+        """
+        now = time.time()
+        with self._lock, _immediate(self._db):
+            failed = self._db.execute(
+                "UPDATE jobs SET status = ?, worker = NULL, lease_until = NULL, error = ?, updated_at = ? "
+                "WHERE status = ? AND lease_until < ? AND attempts >= ?",
+                (STATUS_FAILED, LEASE_EXPIRED_ERROR, int(now), STATUS_LEASED, now, self.max_attempts)
+            ).rowcount
+            expired = self._db.execute(
+                "UPDATE jobs SET status = ?, worker = NULL, lease_until = NULL, updated_at = ? "
+                "WHERE status = ? AND lease_until < ?",
+                (STATUS_PENDING, int(now), STATUS_LEASED, now)
+            ).rowcount
+            _log_expired(expired, failed)
+
+            row = self._db.execute(
+                "SELECT league, gameweek FROM jobs WHERE status = ? ORDER BY attempts, rowid LIMIT 1",
+                (STATUS_PENDING,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute(
+                "UPDATE jobs SET status = ?, worker = ?, lease_until = ?, attempts = attempts + 1, updated_at = ? "
+                "WHERE league = ? AND gameweek = ?",
+                (STATUS_LEASED, worker, now + self.lease_seconds, int(now), row[0], row[1])
+            )
+            return row[0], row[1]
+
+    def heartbeat(self, worker, job):
+        """
+        Продлевает аренду задания.
+        :param worker: Имя воркера.
+        :param job: Кортеж (лига, игровая неделя).
+        :return: False, если аренда уже потеряна (задание отдано другому воркеру).
+        """
+        with self._lock, _immediate(self._db):
+            return self._db.execute(
+                "UPDATE jobs SET lease_until = ? WHERE league = ? AND gameweek = ? AND worker = ? AND status = ?",
+                (time.time() + self.lease_seconds, job[0], job[1], worker, STATUS_LEASED)
+            ).rowcount == 1
+
+    def complete(self, worker, job, error=None):
+        """
+        Завершает аренду задания. При ошибке задание возвращается в очередь, пока не исчерпаны попытки.
+        :param worker: Имя воркера.
+        :param job: Кортеж (лига, игровая неделя).
+        :param error: Ошибка, прервавшая обработку.
+        :return: Новое состояние задания или None, если аренда уже потеряна.
+        """
+        with self._lock, _immediate(self._db):
+            row = self._db.execute(
+                "SELECT attempts FROM jobs WHERE league = ? AND gameweek = ? AND worker = ? AND status = ?",
+                (job[0], job[1], worker, STATUS_LEASED)
+            ).fetchone()
+            if row is None:
+                return None
+            if error is None:
+                status = STATUS_DONE
+            else:
+                status = STATUS_PENDING if row[0] < self.max_attempts else STATUS_FAILED
+            self._db.execute(
+                "UPDATE jobs SET status = ?, worker = NULL, lease_until = NULL, error = ?, updated_at = ? "
+                "WHERE league = ? AND gameweek = ?",
+                (status, None if error is None else str(error), int(time.time()), job[0], job[1])
+            )
+            return status
+
+    def push_results(self, worker, league_name, records):
+        """
+        Передает координатору собранные записи матчей.
+        :param worker: Имя воркера.
+        :param league_name: Название лиги.
+        :param records: Список MatchRecord.
+        """
+        now = int(time.time())
+        with self._lock, _immediate(self._db):
+            self._db.executemany(
+                "INSERT INTO results (league, worker, record, created_at) VALUES (?, ?, ?, ?)",
+                [(league_name, worker, _dump_record(record), now) for record in records]
+            )
+
+    def peek_results(self, limit=1000):
+        """
+        Читает первые записи матчей, переданные воркерами, не удаляя их из очереди. Записи удаляются
+        вызовом ack_results после того, как координатор записал их в приемник.
+        :param limit: Максимальное количество записей за вызов.
+        :return: Список кортежей (лига, MatchRecord).
+        """
+        with self._lock:
+            rows = self._db.execute("SELECT league, record FROM results ORDER BY id LIMIT ?", (limit,)).fetchall()
+        return [(league, _load_record(record)) for league, record in rows]
+
+    def ack_results(self, count):
+        """
+        Удаляет из очереди первые записи матчей, прочитанные peek_results и записанные координатором.
+        :param count: Количество записей.
+        """
+        with self._lock, _immediate(self._db):
+            self._db.execute(
+                "DELETE FROM results WHERE id IN (SELECT id FROM results ORDER BY id LIMIT ?)", (count,)
+            )
+
+    def counts(self):
+        """
+        :return: Словарь {состояние: количество заданий}.
+        """
+        with self._lock:
+            counts = dict.fromkeys((STATUS_PENDING, STATUS_LEASED, STATUS_DONE, STATUS_FAILED), 0)
+            counts.update(self._db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+            return counts
+
+    def failed(self):
+        """
+        :return: Список кортежей (лига, игровая неделя, ошибка) для неудачных заданий.
+        """
+        with self._lock:
+            return self._db.execute(
+                "SELECT league, gameweek, error FROM jobs WHERE status = ? ORDER BY league, gameweek", (STATUS_FAILED,)
+            ).fetchall()
+
+    def close(self):
+        """
+        Закрывает базу очереди.
+        """
+        with self._lock:
+            self._db.close()
+
+class RedisJobQueue:
+    """
+    Та же очередь заданий в Redis (или совместимом сервере) для координатора и воркеров на нескольких машинах.
+    Свободные задания хранятся в списке, аренды — в упорядоченном множестве со сроком окончания,
+    состояние заданий — в хеше, записи матчей — в списке результатов. Методы совпадают с SQLiteJobQueue.
+    Требует пакет redis.
+    """
+
+    def __init__(self, url="redis://localhost:6379/0", prefix="xgscore", lease_seconds=DEFAULT_LEASE_SECONDS,
+                 max_attempts=DEFAULT_MAX_ATTEMPTS):
+        """
+        :param url: Адрес сервера Redis.
+        :param prefix: Префикс ключей очереди.
+        :param lease_seconds: Срок аренды задания в секундах; продлевается heartbeat().
+        :param max_attempts: Сколько раз задание выдается воркерам, прежде чем считается неудачным.
+        """
+        if redis is None:
+            raise RuntimeError("Для очереди заданий в Redis необходим пакет redis.")
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max(1, max_attempts)
+        self._redis = redis.Redis.from_url(url, decode_responses=True)
+        self._pending = f"{prefix}:jobs:pending"
+        self._leases = f"{prefix}:jobs:leases"
+        self._jobs = f"{prefix}:jobs:state"
+        self._results = f"{prefix}:results"
+        # Проверка состояния задания и его изменение выполняются одним скриптом: при сбое воркера задание
+        # не теряется и не остается в аренде без владельца, а воркер с истекшей арендой не может продлить
+        # или завершить задание, уже выданное другому воркеру.
+        self._lease = self._redis.register_script(_LEASE_SCRIPT)
+        self._enqueue = self._redis.register_script(_ENQUEUE_SCRIPT)
+        self._heartbeat = self._redis.register_script(_HEARTBEAT_SCRIPT)
+        self._complete = self._redis.register_script(_COMPLETE_SCRIPT)
+
+    def enqueue(self, jobs, reset=False):
+        if reset:
+            self._redis.delete(self._pending, self._leases, self._jobs)
+        state = json.dumps({"status": STATUS_PENDING, "attempts": 0})
+        added = 0
+        for job in jobs:
+            added += self._enqueue(keys=[self._pending, self._jobs], args=[_job_key(job), state, STATUS_FAILED])
+        return added
+
+    def lease(self, worker):
+        now = time.time()
+        key, expired, failed = self._lease(
+            keys=[self._pending, self._leases, self._jobs],
+            args=[
+                now, now + self.lease_seconds, worker, STATUS_PENDING, STATUS_LEASED,
+                self.max_attempts, STATUS_FAILED, LEASE_EXPIRED_ERROR
+            ]
+        )
+        _log_expired(expired, failed)
+        if key is None:
+            return None
+        return _parse_job_key(key)
+
+    def heartbeat(self, worker, job):
+        return self._heartbeat(
+            keys=[self._leases, self._jobs],
+            args=[_job_key(job), worker, time.time() + self.lease_seconds, STATUS_LEASED]
+        ) == 1
+
+    def complete(self, worker, job, error=None):
+        return self._complete(
+            keys=[self._pending, self._leases, self._jobs],
+            args=[
+                _job_key(job), worker, json.dumps(None if error is None else str(error)), self.max_attempts,
+                STATUS_LEASED, STATUS_DONE, STATUS_PENDING, STATUS_FAILED
+            ]
+        )
+
+    def push_results(self, worker, league_name, records):
+        if records:
+            self._redis.rpush(self._results, *(
+                json.dumps({"league": league_name, "worker": worker, "record": _dump_record(record)})
+                for record in records
+            ))
+
+    def peek_results(self, limit=1000):
+        items = self._redis.lrange(self._results, 0, limit - 1)
+        results = []
+        for item in items:
+            data = json.loads(item)
+            results.append((data["league"], _load_record(data["record"])))
+        return results
+
+    def ack_results(self, count):
+        # Воркеры дописывают результаты в конец списка, поэтому первые count записей — прочитанные координатором.
+        self._redis.ltrim(self._results, count, -1)
+
+    def counts(self):
+        counts = dict.fromkeys((STATUS_PENDING, STATUS_LEASED, STATUS_DONE, STATUS_FAILED), 0)
+        for value in self._redis.hvals(self._jobs):
+            counts[json.loads(value)["status"]] += 1
+        return counts
+
+    def failed(self):
+        failed = []
+        for key, value in self._redis.hgetall(self._jobs).items():
+            state = json.loads(value)
+            if state["status"] == STATUS_FAILED:
+                failed.append((*_parse_job_key(key), state.get("error")))
+        return sorted(failed)
+
+    def close(self):
+        self._redis.close()
+
+# Аренда задания в Redis. KEYS: свободные задания, аренды, состояние заданий.
+# ARGV: текущее время, срок аренды, воркер, состояния "pending" и "leased", max_attempts, состояние "failed"
+# и ошибка для заданий, исчерпавших попытки. Возвращает [ключ задания или nil,
+# количество возвращенных в очередь просроченных аренд, количество заданий, отмеченных неудачными].
+_LEASE_SCRIPT = """
+local requeued, failed = 0, 0
+for _, key in ipairs(redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[1])) do
+    redis.call('ZREM', KEYS[2], key)
+    local state = cjson.decode(redis.call('HGET', KEYS[3], key) or '{}')
+    state['worker'] = cjson.null
+    if (state['attempts'] or 0) < tonumber(ARGV[6]) then
+        state['status'] = ARGV[4]
+        redis.call('RPUSH', KEYS[1], key)
+        requeued = requeued + 1
+    else
+        state['status'] = ARGV[7]
+        state['error'] = ARGV[8]
+        failed = failed + 1
+    end
+    redis.call('HSET', KEYS[3], key, cjson.encode(state))
+end
+local key = redis.call('LPOP', KEYS[1])
+if key then
+    redis.call('ZADD', KEYS[2], ARGV[2], key)
+    local state = cjson.decode(redis.call('HGET', KEYS[3], key) or '{}')
+    state['status'] = ARGV[5]
+    state['worker'] = ARGV[3]
+    state['attempts'] = (state['attempts'] or 0) + 1
+    redis.call('HSET', KEYS[3], key, cjson.encode(state))
+end
+return {key, requeued, failed}
+"""
+
+# Постановка задания в очередь Redis. KEYS: свободные задания, состояние заданий.
+# ARGV: ключ задания, начальное состояние, состояние "failed". Новое или неудачное задание получает
+# начальное состояние и добавляется в список свободных; возвращает 1, если задание поставлено в очередь.
+_ENQUEUE_SCRIPT = """
+local value = redis.call('HGET', KEYS[2], ARGV[1])
+if value and cjson.decode(value)['status'] ~= ARGV[3] then
+    return 0
+end
+redis.call('HSET', KEYS[2], ARGV[1], ARGV[2])
+redis.call('RPUSH', KEYS[1], ARGV[1])
+return 1
+"""
+
+# Продление аренды в Redis. KEYS: аренды, состояние заданий.
+# ARGV: ключ задания, воркер, новый срок аренды, состояние "leased". Возвращает 1, если аренда продлена.
+_HEARTBEAT_SCRIPT = """
+local state = cjson.decode(redis.call('HGET', KEYS[2], ARGV[1]) or '{}')
+if state['worker'] ~= ARGV[2] or state['status'] ~= ARGV[4] or not redis.call('ZSCORE', KEYS[1], ARGV[1]) then
+    return 0
+end
+redis.call('ZADD', KEYS[1], 'XX', ARGV[3], ARGV[1])
+return 1
+"""
+
+# Завершение аренды в Redis. KEYS: свободные задания, аренды, состояние заданий.
+# ARGV: ключ задания, воркер, ошибка в JSON (null при успехе), max_attempts, состояния "leased", "done",
+# "pending" и "failed". Возвращает новое состояние задания или nil, если аренда уже потеряна.
+_COMPLETE_SCRIPT = """
+local state = cjson.decode(redis.call('HGET', KEYS[3], ARGV[1]) or '{}')
+if state['worker'] ~= ARGV[2] or state['status'] ~= ARGV[5] or redis.call('ZREM', KEYS[2], ARGV[1]) == 0 then
+    return nil
+end
+local failure = cjson.decode(ARGV[3])
+if failure == cjson.null then
+    state['status'] = ARGV[6]
+elseif (state['attempts'] or 0) < tonumber(ARGV[4]) then
+    state['status'] = ARGV[7]
+    redis.call('RPUSH', KEYS[1], ARGV[1])
+else
+    state['status'] = ARGV[8]
+end
+state['worker'] = cjson.null
+state['error'] = failure
+redis.call('HSET', KEYS[3], ARGV[1], cjson.encode(state))
+return state['status']
+"""
+
+def create_job_queue(queue_settings):
+    """
+    Создает очередь заданий по секции "queue" настроек.
+    :param queue_settings: Словарь с ключами backend, path, url, prefix, lease_seconds, max_attempts.
+    :return: SQLiteJobQueue или RedisJobQueue.
+    """
+    backend = queue_settings.get("backend", BACKEND_SQLITE)
+    lease_seconds = queue_settings.get("lease_seconds", DEFAULT_LEASE_SECONDS)
+    max_attempts = queue_settings.get("max_attempts", DEFAULT_MAX_ATTEMPTS)
+    if backend == BACKEND_REDIS:
+        return RedisJobQueue(
+            url=queue_settings.get("url", "redis://localhost:6379/0"),
+            prefix=queue_settings.get("prefix", "xgscore"),
+            lease_seconds=lease_seconds,
+            max_attempts=max_attempts,
+        )
+    if backend != BACKEND_SQLITE:
+        raise ValueError(f"Неизвестный тип очереди заданий: {backend}")
+    return SQLiteJobQueue(queue_settings.get("path", "data/job_queue.sqlite3"), lease_seconds, max_attempts)
+
+def _log_expired(requeued, failed):
+    if requeued:
+        logger.warning(f"Очередь заданий: возвращено заданий с просроченной арендой: {requeued}.")
+    if failed:
+        logger.error(f"Очередь заданий: аренда истекла на последней попытке, заданий отмечено неудачными: {failed}.")
+
+@contextmanager
+def _immediate(db):
+    """
+    Транзакция SQLite с немедленной блокировкой записи (BEGIN IMMEDIATE): выдача задания
+    не пересекается с другими процессами, работающими с тем же файлом.
+    :param db: Соединение SQLite в режиме autocommit (isolation_level=None).
+    """
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        yield db
+    except BaseException:
+        db.execute("ROLLBACK")
+        raise
+    db.execute("COMMIT")
+
+def _job_key(job):
+    return json.dumps([job[0], job[1]], ensure_ascii=False)
+
+def _parse_job_key(key):
+    league, gameweek = json.loads(key)
+    return league, gameweek
+
+def _dump_record(record):
+    return json.dumps(dict(record.as_dict(), mark_texts=record.mark_texts), ensure_ascii=False)
+
+def _load_record(text):
+    return MatchRecord(**json.loads(text))
@@ -1,3 +1,4 @@
+import itertools
 import os
 import json
 from sys import stdout
@@ -5,14 +6,6 @@ from loguru import logger
 
 CONFIG_PATH = os.path.join('config', 'logging_config.json')
 
-with open(CONFIG_PATH, 'r') as config_file:
-    config = json.load(config_file)
-
-LOG_FILE_PATH = config.get("LOG_FILE_PATH", "logs/app.log")
-LOG_LEVEL = config.get("LOG_LEVEL", "INFO")
-LOG_ROTATION = config.get("LOG_ROTATION", "10 MB")
-LOG_RETENTION = config.get("LOG_RETENTION", "7 days")
-
 LOG_FORMAT_TERMINAL = (
     "<green>{time:YYYY-MM-DD at HH:mm:ss}</green> | "
     "<level>{level}</level> | "
@@ -25,40 +18,91 @@ LOG_FORMAT_FILE = (
     "{name}:{function}:{line} - {message}"
 )
 
-def configure_logger():
+_match_counter = itertools.count(1)
+_match_sample = 1
+
+def load_logging_config(path=CONFIG_PATH):
+    """
+    Загружает настройки логирования.
+    :param path: Путь к JSON-файлу настроек.
+    :return: Словарь настроек (пустой, если файла нет).
+    """
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r') as config_file:
+        return json.load(config_file)
+
+def configure_logger(config=None):
     """
-    Конфигурирует логгер:
+    Конфигурирует логгер. Вызывается один раз при запуске приложения, а не при импорте модуля:
     - Удаляет стандартный логгер
     - Создаёт директорию для логов, если она не существует
-    - Настраивает логирование в файл с ротацией и вывод в консоль с цветами
+    - Настраивает логирование в файл с ротацией (через очередь в отдельном потоке, если LOG_ENQUEUE)
+      и вывод в консоль
+    - Диагностика переменных в трассировке (diagnose) включается только в отдельном файле ошибок
+    :param config: Словарь настроек. По умолчанию загружается из config/logging_config.json.
     """
+    global _match_sample
+    config = load_logging_config() if config is None else config
+
+    log_file_path = config.get("LOG_FILE_PATH", "logs/app.log")
+    error_file_path = config.get("LOG_ERROR_FILE_PATH")
+    level = config.get("LOG_LEVEL", "INFO")
+    rotation = config.get("LOG_ROTATION", "10 MB")
+    retention = config.get("LOG_RETENTION", "7 days")
+    enqueue = config.get("LOG_ENQUEUE", True)
+    diagnose = config.get("LOG_DIAGNOSE", False)
+    _match_sample = max(1, config.get("LOG_MATCH_SAMPLE", 1))
+
     logger.remove()
 
-    log_dir = os.path.dirname(os.path.abspath(LOG_FILE_PATH))
-    if log_dir and not os.path.exists(log_dir):
-        logger.debug(f"Creating log directory: {log_dir}")
+    for path in filter(None, (log_file_path, error_file_path)):
+        log_dir = os.path.dirname(os.path.abspath(path))
         os.makedirs(log_dir, exist_ok=True)
 
     logger.add(
-        LOG_FILE_PATH,
-        rotation=LOG_ROTATION,
-        retention=LOG_RETENTION,
-        level=LOG_LEVEL,
+        log_file_path,
+        rotation=rotation,
+        retention=retention,
+        level=level,
         format=LOG_FORMAT_FILE,
-        backtrace=True,  # Полный бэктрейс для ошибок
-        diagnose=True    # Диагностика переменных
+        enqueue=enqueue,
+        backtrace=diagnose,
+        diagnose=diagnose
     )
 
+    if error_file_path:
+        logger.add(
+            error_file_path,
+            rotation=rotation,
+            retention=retention,
+            level="ERROR",
+            format=LOG_FORMAT_FILE,
+            enqueue=enqueue,
+            backtrace=True,  # Полный бэктрейс для ошибок
+            diagnose=True    # Диагностика переменных
+        )
+
     logger.add(
         stdout,
-        level=LOG_LEVEL,
+        level=config.get("LOG_CONSOLE_LEVEL", level),
         format=LOG_FORMAT_TERMINAL,
-        backtrace=True,
-        diagnose=True,
-        colorize=True
+        enqueue=enqueue,
+        backtrace=diagnose,
+        diagnose=diagnose,
+        colorize=None
     )
 
     logger.info("Logger has been configured successfully.")
 
-configure_logger()
-__all__ = ['logger']
\ No newline at end of file
+def log_match(message, *args):
+    """
+    Пишет итог по собранному матчу. На уровне INFO выводится каждый LOG_MATCH_SAMPLE-й матч,
+    остальные — на уровне DEBUG. Аргументы подставляются в message ("{}") только если запись будет выведена.
+    :param message: Шаблон сообщения.
+    :param args: Значения для шаблона.
+    """
+    level = "INFO" if next(_match_counter) % _match_sample == 0 else "DEBUG"
+    logger.opt(depth=1).log(level, message, *args)
+
+__all__ = ['logger', 'configure_logger', 'log_match']
@@ -0,0 +1,93 @@
+import json
+import os
+import threading
+import time
+
+from src.utils.logger_setup import logger
+
+class MatchIndex:
+    """
+    Индекс уже собранных матчей, ключ — ссылка на страницу матча.
+    Загружается один раз при запуске и сохраняется при завершении.
+    Сыгранные матчи больше не загружаются, несыгранные загружаются повторно,
+    так как их прогнозы еще могут измениться.
+    """
+
+    def __init__(self, path="data/match_index.json"):
+        """
+        :param path: Путь к JSON-файлу индекса.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._dirty = False
+        self._load()
+
+    def is_finished(self, link):
+        """
+        Проверяет, собран ли уже сыгранный матч.
+        :param link: Ссылка на страницу матча.
+        :return: True, если матч сыгран и его данные уже сохранены.
+        """
+        with self._lock:
+            entry = self._entries.get(link)
+            return bool(entry and entry.get("finished"))
+
+    def record(self, link, league_name, gameweek, statistic, finished):
+        """
+        Добавляет или обновляет запись о собранном матче.
+        :param link: Ссылка на страницу матча.
+        :param league_name: Название лиги.
+        :param gameweek: Номер игровой недели.
+        :param statistic: Собранные данные матча.
+        :param finished: Сыгран ли матч.
+        """
+        preview = statistic.get("preview", {})
+        with self._lock:
+            self._entries[link] = {
+                "league": league_name,
+                "gameweek": gameweek,
+                "home": preview.get("team_name_1", ""),
+                "away": preview.get("team_name_2", ""),
+                "finished": finished,
+                "updated_at": int(time.time()),
+            }
+            self._dirty = True
+
+    def save(self):
+        """
+        Сохраняет индекс на диск, если он изменился.
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump(self._entries, file, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+
+        logger.info(f"Индекс собранных матчей сохранен: {self.path}")
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def _load(self):
+        """
+        Загружает индекс с диска, если файл существует.
+        """
+        if not os.path.exists(self.path):
+            logger.info("Индекс собранных матчей не найден, будет создан новый.")
+            return
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                self._entries = json.load(file)
+            logger.info(f"Индекс собранных матчей загружен: {len(self._entries)} матчей.")
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning(f"Не удалось загрузить индекс собранных матчей, будет создан новый: {e}")
+            self._entries = {}
@@ -0,0 +1,237 @@
+import re
+import time
+
+COLUMNS = (
+    ("league", str),
+    ("season", str),
+    ("gameweek", int),
+    ("home_team", str),
+    ("away_team", str),
+    ("winner", str),
+    ("winner_mark", float),
+    ("total", str),
+    ("total_mark", float),
+    ("both_to_score", str),
+    ("both_to_score_mark", float),
+    ("correct_score", str),
+    ("correct_score_mark", float),
+    ("team_rating_home", float),
+    ("team_rating_away", float),
+    ("team_form_home", float),
+    ("team_form_away", float),
+    ("xg_luckiness_home", float),
+    ("xg_luckiness_away", float),
+    ("xg_predictability_home", float),
+    ("xg_predictability_away", float),
+    ("avg_xg_scored_home", float),
+    ("avg_xg_scored_away", float),
+    ("avg_xg_conceded_home", float),
+    ("avg_xg_conceded_away", float),
+    ("predicted_goals_home", float),
+    ("predicted_goals_away", float),
+    ("goals_home", int),
+    ("goals_away", int),
+    ("xg_home", float),
+    ("xg_away", float),
+    ("collected_at", int),
+)
+"""
+Столбцы записи матча в общем для всех приемников порядке: имя и тип значения. Пустые значения — None.
+Строки вида "метка (оценка)" с вкладки preview разделяются на два столбца: <поле> и <поле>_mark;
+если оценка не число, вся строка остается в столбце <поле>. Проценты ("-8%") хранятся числом -8.0.
+Сезон ("2024/2025") определяется по дате сбора, см. season_of.
+"""
+
+COLUMN_NAMES = tuple(name for name, _ in COLUMNS)
+
+MARK_FIELDS = (
+    ("winner", "winner"),
+    ("total", "total_under"),
+    ("both_to_score", "both_to_score"),
+    ("correct_score", "correct_score"),
+)
+"""Пары (столбец записи, поле вкладки preview) для значений вида "метка (оценка)"."""
+
+PREVIEW_NUMBER_FIELDS = (
+    "team_rating_home", "team_rating_away", "team_form_home", "team_form_away",
+    "xg_luckiness_home", "xg_luckiness_away", "xg_predictability_home", "xg_predictability_away",
+    "avg_xg_scored_home", "avg_xg_scored_away", "avg_xg_conceded_home", "avg_xg_conceded_away",
+)
+"""Числовые поля вкладки preview, имена которых совпадают со столбцами записи."""
+
+PERCENT_FIELDS = (
+    "xg_luckiness_home", "xg_luckiness_away", "xg_predictability_home", "xg_predictability_away",
+)
+
+SEASON_START_MONTH = 7
+"""Месяц, с которого матчи относятся к следующему сезону."""
+
+KEY_FIELDS = ("league", "season", "gameweek", "home_team", "away_team")
+"""Столбцы ключа матча: одни и те же команды встречаются дважды за сезон и снова в следующих сезонах."""
+
+_MARK_PATTERN = re.compile(r"^(.*?)\s*\(([^()]*)\)\s*$")
+
+class MatchRecord:
+    """
+    Типизированная запись одного матча. Значения разбираются из строк один раз при создании записи,
+    а все приемники данных используют один и тот же порядок столбцов COLUMN_NAMES.
+    """
+
+    __slots__ = COLUMN_NAMES + ("mark_texts",)
+
+    def __init__(self, mark_texts=None, **values):
+        """
+        :param mark_texts: Исходные строки "метка (оценка)" по столбцам MARK_FIELDS (см. mark_text).
+        :param values: Значения столбцов; отсутствующие столбцы заполняются None.
+        """
+        self.mark_texts = dict(mark_texts or {})
+        for name in COLUMN_NAMES:
+            setattr(self, name, values.get(name))
+
+    @classmethod
+    def from_match(cls, match, league_name, gameweek=None):
+        """
+        Создает запись из данных матча, собранных с вкладок xg-statistics и preview.
+        :param match: Словарь с ключами preview, match_score_prediction и xg_statistics.
+        :param league_name: Название лиги.
+        :param gameweek: Номер игровой недели.
+        :return: Объект MatchRecord.
+        """
+        preview = match.get("preview", {})
+        prediction = match.get("match_score_prediction", {})
+        xg = match.get("xg_statistics", {})
+
+        record = cls.__new__(cls)
+        record.league = league_name
+        record.gameweek = to_int(gameweek)
+        record.home_team = preview.get("team_name_1") or None
+        record.away_team = preview.get("team_name_2") or None
+        record.mark_texts = {}
+        for column, key in MARK_FIELDS:
+            text = preview.get(key)
+            label, mark = split_mark(text)
+            if text:
+                record.mark_texts[column] = text.strip()
+            setattr(record, column, label)
+            setattr(record, f"{column}_mark", mark)
+        for column in PREVIEW_NUMBER_FIELDS:
+            setattr(record, column, to_float(preview.get(column)))
+        record.predicted_goals_home = to_float(prediction.get("match_score_prediction_home"))
+        record.predicted_goals_away = to_float(prediction.get("match_score_prediction_away"))
+        record.goals_home = to_int(xg.get("goals_team_1"))
+        record.goals_away = to_int(xg.get("goals_team_2"))
+        record.xg_home = to_float(xg.get("expected_goals_team_1"))
+        record.xg_away = to_float(xg.get("expected_goals_team_2"))
+        record.collected_at = int(time.time())
+        record.season = season_of(record.collected_at)
+        return record
+
+    @property
+    def key(self):
+        """
+        :return: Ключ матча: значения KEY_FIELDS (лига, сезон, игровая неделя, хозяева, гости).
+        """
+        return tuple(getattr(self, name) for name in KEY_FIELDS)
+
+    @property
+    def finished(self):
+        """
+        :return: True, если матч сыгран (известны забитые голы).
+        """
+        return self.goals_home is not None
+
+    def as_tuple(self):
+        """
+        :return: Значения в порядке COLUMN_NAMES.
+        """
+        return tuple(getattr(self, name) for name in COLUMN_NAMES)
+
+    def as_dict(self):
+        """
+        :return: Словарь {столбец: значение} в порядке COLUMN_NAMES.
+        """
+        return {name: getattr(self, name) for name in COLUMN_NAMES}
+
+    def mark_text(self, column):
+        """
+        Возвращает значение "метка (оценка)" в исходном виде, как оно показано на сайте. Для записей,
+        прочитанных из приемников, исходной строки нет, и она собирается из столбцов: точность оценки
+        на сайте разная ("1.40", "5.0"), поэтому число выводится без добавления нулей.
+        :param column: Столбец из MARK_FIELDS, например "winner".
+        :return: Строка или None, если метка не собрана.
+        """
+        text = self.mark_texts.get(column)
+        if text is not None:
+            return text
+        label = getattr(self, column)
+        mark = getattr(self, f"{column}_mark")
+        if label is None and mark is None:
+            return None
+        if mark is None and label is not None and _MARK_PATTERN.match(label):
+            return label
+        return f"{label or ''} ({'' if mark is None else mark})"
+
+    def __eq__(self, other):
+        return isinstance(other, MatchRecord) and self.as_tuple() == other.as_tuple()
+
+    def __repr__(self):
+        return f"MatchRecord({self.league!r}, {self.home_team!r} - {self.away_team!r})"
+
+def to_record(data, league_name):
+    """
+    Приводит данные матча к MatchRecord.
+    :param data: MatchRecord или словарь с данными матча.
+    :param league_name: Название лиги.
+    :return: Объект MatchRecord.
+    """
+    return data if isinstance(data, MatchRecord) else MatchRecord.from_match(data, league_name)
+
+def season_of(timestamp):
+    """
+    :param timestamp: Время сбора матча (Unix time).
+    :return: Сезон вида "2024/2025": матчи, собранные с SEASON_START_MONTH, относятся к сезону,
+        который начинается в этом году.
+    """
+    date = time.localtime(timestamp)
+    start = date.tm_year if date.tm_mon >= SEASON_START_MONTH else date.tm_year - 1
+    return f"{start}/{start + 1}"
+
+def split_mark(value):
+    """
+    Разделяет строку "метка (оценка)" на метку и числовую оценку.
+    :param value: Строка, например "Home Win (1.71)".
+    :return: Кортеж (метка, оценка); пустые части возвращаются как None. Если оценка не число
+        ("Home Win (N/A)"), строка возвращается меткой целиком, чтобы оценка не потерялась.
+    """
+    if not value:
+        return None, None
+    match = _MARK_PATTERN.match(value)
+    if not match:
+        return value.strip() or None, None
+    mark = to_float(match.group(2))
+    if mark is None and match.group(2).strip():
+        return value.strip(), None
+    return match.group(1).strip() or None, mark
+
+def to_float(value):
+    """
+    :param value: Строка со значением ("1.96", "5.8", "-8%") или число.
+    :return: Число с плавающей точкой или None.
+    """
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).strip().rstrip("%").replace(",", ".")
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+def to_int(value):
+    """
+    :param value: Строка с целым значением ("2") или число.
+    :return: Целое число или None.
+    """
+    number = to_float(value)
+    return int(number) if number is not None else None
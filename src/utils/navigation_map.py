@@ -0,0 +1,113 @@
+import json
+import os
+import threading
+import time
+
+from src.utils.logger_setup import logger
+
+class NavigationMap:
+    """
+    Карта прямых адресов страниц лиг и игровых недель, найденных при навигации через интерфейс сайта.
+    Для каждой лиги хранится адрес ее страницы статистики и, если адрес страницы отражает выбранную неделю,
+    адреса отдельных игровых недель. Загружается один раз при запуске и сохраняется при завершении.
+    """
+
+    def __init__(self, path="data/navigation_map.json"):
+        """
+        :param path: Путь к JSON-файлу карты.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._leagues = {}
+        self._dirty = False
+        self._load()
+
+    def league_url(self, league_name):
+        """
+        :param league_name: Название лиги.
+        :return: Адрес страницы лиги или None.
+        """
+        with self._lock:
+            return self._leagues.get(league_name, {}).get("url")
+
+    def gameweek_url(self, league_name, gameweek):
+        """
+        :param league_name: Название лиги.
+        :param gameweek: Номер игровой недели.
+        :return: Прямой адрес игровой недели или None.
+        """
+        with self._lock:
+            return self._leagues.get(league_name, {}).get("gameweeks", {}).get(str(gameweek))
+
+    def record_league(self, league_name, url):
+        """
+        Запоминает адрес страницы лиги.
+        :param league_name: Название лиги.
+        :param url: Адрес страницы лиги.
+        """
+        with self._lock:
+            entry = self._leagues.setdefault(league_name, {"gameweeks": {}})
+            if entry.get("url") != url:
+                entry["url"] = url
+                entry["updated_at"] = int(time.time())
+                self._dirty = True
+
+    def record_gameweek(self, league_name, gameweek, url):
+        """
+        Запоминает адрес игровой недели, если он отличается от адреса страницы лиги
+        (иначе неделю нельзя открыть по ссылке и ее по-прежнему нужно выбирать в списке).
+        :param league_name: Название лиги.
+        :param gameweek: Номер игровой недели.
+        :param url: Адрес страницы после выбора недели.
+        """
+        with self._lock:
+            entry = self._leagues.setdefault(league_name, {"gameweeks": {}})
+            if url == entry.get("url") or entry["gameweeks"].get(str(gameweek)) == url:
+                return
+            entry["gameweeks"][str(gameweek)] = url
+            entry["updated_at"] = int(time.time())
+            self._dirty = True
+
+    def forget_gameweek(self, league_name, gameweek):
+        """
+        Удаляет адрес игровой недели, который перестал открывать нужную неделю.
+        :param league_name: Название лиги.
+        :param gameweek: Номер игровой недели.
+        """
+        with self._lock:
+            gameweeks = self._leagues.get(league_name, {}).get("gameweeks", {})
+            if gameweeks.pop(str(gameweek), None) is not None:
+                self._dirty = True
+
+    def save(self):
+        """
+        Сохраняет карту на диск, если она изменилась.
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump(self._leagues, file, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+
+        logger.info(f"Карта навигации сохранена: {self.path}")
+
+    def _load(self):
+        """
+        Загружает карту с диска, если файл существует.
+        """
+        if not os.path.exists(self.path):
+            return
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                self._leagues = json.load(file)
+            logger.info(f"Карта навигации загружена: {len(self._leagues)} лиг.")
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning(f"Не удалось загрузить карту навигации, будет создана новая: {e}")
+            self._leagues = {}
@@ -0,0 +1,353 @@
+import csv
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from src.utils.excel_saver import ExcelSink, DEFAULT_BATCH_SIZE
+from src.utils.match_record import COLUMNS, COLUMN_NAMES, KEY_FIELDS, to_record
+from src.utils.prediction_history import PredictionHistory
+from src.utils.logger_setup import logger
+from src.utils.stage_metrics import metrics
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+FORMAT_EXCEL = "excel"
+FORMAT_CSV = "csv"
+FORMAT_JSONL = "jsonl"
+FORMAT_SQLITE = "sqlite"
+FORMAT_PARQUET = "parquet"
+FORMAT_HISTORY = "history"
+
+class _BufferedSink:
+    """
+    Общая часть приемников с буфером: записи матчей (MatchRecord) накапливаются по лигам
+    и сбрасываются пачками по batch_size. Наследники реализуют _write_rows(league_name, rows).
+    """
+
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        :param batch_size: Количество строк, после которого буфер сбрасывается.
+        """
+        self.batch_size = max(1, batch_size)
+        self._lock = threading.RLock()
+        self._buffers = {}
+
+    def write(self, data, league_name):
+        """
+        Добавляет данные матча в буфер.
+        :param data: MatchRecord, словарь данных матча или список таких значений.
+        :param league_name: Название лиги.
+        """
+        if not isinstance(data, list):
+            data = [data]
+
+        with self._lock:
+            buffer = self._buffers.setdefault(league_name, [])
+            buffer.extend(to_record(match, league_name) for match in data)
+            if len(buffer) >= self.batch_size:
+                self._flush_league(league_name)
+
+    def flush(self):
+        """
+        Сбрасывает буферы всех лиг.
+        :return: True, если все строки записаны; строки, которые записать не удалось, остаются в буфере.
+        """
+        with self._lock:
+            results = [self._flush_league(league_name) for league_name in list(self._buffers)]
+            return all(results)
+
+    def close(self):
+        """
+        Сбрасывает остатки буферов.
+        """
+        self.flush()
+
+    def _flush_league(self, league_name):
+        """
+        Сбрасывает буфер одной лиги. Вызывается под блокировкой.
+        :param league_name: Название лиги.
+        :return: True, если строки записаны.
+        """
+        rows = self._buffers.get(league_name)
+        if not rows:
+            return True
+        try:
+            with metrics.stage(f"output.{type(self).__name__}"):
+                self._write_rows(league_name, rows)
+            logger.info(f"{type(self).__name__}: сохранено строк лиги '{league_name}': {len(rows)}.")
+            rows.clear()
+            return True
+        except Exception as e:
+            logger.error(f"{type(self).__name__}: ошибка при сохранении данных лиги '{league_name}': {e}")
+            return False
+
+    def _write_rows(self, league_name, rows):
+        raise NotImplementedError
+
+class CsvSink(_BufferedSink):
+    """
+    Файлы CSV по лигам, только дозапись. Пачка и, для нового файла, заголовок дописываются
+    под блокировкой файла (fcntl.flock), поэтому в файл могут дописывать несколько процессов.
+    На Windows блокировка между процессами не выполняется.
+    """
+
+    def __init__(self, directory="data", batch_size=DEFAULT_BATCH_SIZE):
+        """
+        :param directory: Директория файлов.
+        :param batch_size: Размер пачки строк.
+        """
+        super().__init__(batch_size)
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _write_rows(self, league_name, rows):
+        path = os.path.join(self.directory, f"{league_name}.csv")
+        header = _CsvLines()
+        csv.writer(header).writerow(COLUMN_NAMES)
+        lines = _CsvLines()
+        csv.writer(lines).writerows(row.as_tuple() for row in rows)
+        _append(path, "".join(lines), header="".join(header))
+
+class JsonlSink(_BufferedSink):
+    """
+    Файлы JSON Lines по лигам, только дозапись: одна строка — один матч.
+    """
+
+    def __init__(self, directory="data", batch_size=DEFAULT_BATCH_SIZE):
+        """
+        :param directory: Директория файлов.
+        :param batch_size: Размер пачки строк.
+        """
+        super().__init__(batch_size)
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _write_rows(self, league_name, rows):
+        path = os.path.join(self.directory, f"{league_name}.jsonl")
+        _append(path, "".join(json.dumps(row.as_dict(), ensure_ascii=False) + "\n" for row in rows))
+
+class SQLiteSink(_BufferedSink):
+    """
+    Таблица matches в базе SQLite. Ключ записи — KEY_FIELDS (лига, сезон, игровая неделя, хозяева, гости):
+    строка несыгранного матча заменяется новыми данными, как и в Excel, а встречи тех же команд в другой
+    неделе или сезоне остаются отдельными строками. Режим WAL позволяет читать базу во время записи.
+    """
+
+    def __init__(self, path="data/matches.sqlite3", batch_size=DEFAULT_BATCH_SIZE):
+        """
+        :param path: Путь к файлу базы.
+        :param batch_size: Размер пачки строк.
+        """
+        super().__init__(batch_size)
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        columns = ", ".join(f"{name} {_SQLITE_TYPES[kind]}" for name, kind in COLUMNS)
+        self._db.execute(
+            f"CREATE TABLE IF NOT EXISTS matches ({columns}, PRIMARY KEY ({', '.join(KEY_FIELDS)}))"
+        )
+        self._db.commit()
+
+    def close(self):
+        """
+        Сбрасывает остатки буферов и закрывает базу.
+        """
+        with self._lock:
+            self.flush()
+            self._db.close()
+
+    def _write_rows(self, league_name, rows):
+        placeholders = ", ".join("?" for _ in COLUMN_NAMES)
+        with self._db:
+            self._db.executemany(
+                f"INSERT OR REPLACE INTO matches ({', '.join(COLUMN_NAMES)}) VALUES ({placeholders})",
+                [row.as_tuple() for row in rows]
+            )
+
+class ParquetSink(_BufferedSink):
+    """
+    Файлы Parquet по лигам. Parquet не поддерживает дозапись, поэтому каждая пачка
+    записывается отдельным файлом в директорию лиги; читать их можно как один набор данных
+    (pandas.read_parquet("data/parquet/<лига>")). Требует пакет pyarrow.
+    """
+
+    def __init__(self, directory="data/parquet", batch_size=DEFAULT_BATCH_SIZE):
+        """
+        :param directory: Директория наборов данных.
+        :param batch_size: Размер пачки строк.
+        """
+        if pyarrow is None:
+            raise RuntimeError("Для записи в Parquet необходим пакет pyarrow.")
+        super().__init__(batch_size)
+        self.directory = directory
+        self._schema = pyarrow.schema([(name, _ARROW_TYPES[kind]()) for name, kind in COLUMNS])
+        self._parts = 0
+
+    def _write_rows(self, league_name, rows):
+        league_dir = os.path.join(self.directory, league_name)
+        os.makedirs(league_dir, exist_ok=True)
+        self._parts += 1
+        path = os.path.join(league_dir, f"part-{int(time.time() * 1000)}-{os.getpid()}-{self._parts}.parquet")
+        columns = [[getattr(row, name) for row in rows] for name in COLUMN_NAMES]
+        table = pyarrow.Table.from_arrays(columns, schema=self._schema)
+        pyarrow.parquet.write_table(table, path)
+
+class HistorySink(_BufferedSink):
+    """
+    История прогнозов (PredictionHistory): при каждом опросе сохраняются только изменившиеся поля матча,
+    поэтому частые опросы несыгранных матчей не дублируют строки.
+    """
+
+    def __init__(self, path="data/prediction_history.sqlite3", batch_size=DEFAULT_BATCH_SIZE):
+        """
+        :param path: Путь к файлу базы истории.
+        :param batch_size: Размер пачки строк.
+        """
+        super().__init__(batch_size)
+        self.history = PredictionHistory(path)
+
+    def close(self):
+        """
+        Сбрасывает остатки буферов и закрывает базу.
+        """
+        with self._lock:
+            self.flush()
+            self.history.close()
+
+    def _write_rows(self, league_name, rows):
+        self.history.record(rows)
+
+class QueueSink(_BufferedSink):
+    """
+    Передает записи матчей координатору через общую очередь заданий (режим воркера на нескольких машинах).
+    Координатор собирает записи всех воркеров и записывает их в приемники из секции "output".
+    """
+
+    def __init__(self, job_queue, worker, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        :param job_queue: Очередь заданий (SQLiteJobQueue или RedisJobQueue).
+        :param worker: Имя воркера.
+        :param batch_size: Размер пачки строк.
+        """
+        super().__init__(batch_size)
+        self.job_queue = job_queue
+        self.worker = worker
+
+    def _write_rows(self, league_name, rows):
+        self.job_queue.push_results(self.worker, league_name, rows)
+
+class MultiSink:
+    """
+    Передает данные матча в несколько приемников одновременно.
+    """
+
+    def __init__(self, sinks):
+        """
+        :param sinks: Список приемников с методами write(data, league_name), flush() и close().
+        """
+        self.sinks = list(sinks)
+
+    def write(self, data, league_name):
+        for sink in self.sinks:
+            sink.write(data, league_name)
+
+    def flush(self):
+        results = [sink.flush() for sink in self.sinks]
+        return all(results)
+
+    def close(self):
+        for sink in self.sinks:
+            try:
+                sink.close()
+            except Exception as e:
+                logger.error(f"Ошибка при закрытии приемника {type(sink).__name__}: {e}")
+
+def create_sink(output_settings, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Создает приемник данных по секции "output" настроек.
+    :param output_settings: Словарь с ключами formats, directory, excel_directory, sqlite_path, parquet_directory,
+        history_path.
+    :param batch_size: Размер пачки строк.
+    :return: Приемник (ExcelSink, если задан только Excel, иначе MultiSink).
+    """
+    formats = output_settings.get("formats", [FORMAT_EXCEL])
+    directory = output_settings.get("directory", "data")
+
+    sinks = []
+    for output_format in formats:
+        if output_format == FORMAT_EXCEL:
+            sinks.append(ExcelSink(batch_size, output_settings.get("excel_directory")))
+        elif output_format == FORMAT_CSV:
+            sinks.append(CsvSink(directory, batch_size))
+        elif output_format == FORMAT_JSONL:
+            sinks.append(JsonlSink(directory, batch_size))
+        elif output_format == FORMAT_SQLITE:
+            sinks.append(SQLiteSink(output_settings.get("sqlite_path", os.path.join(directory, "matches.sqlite3")),
+                                    batch_size))
+        elif output_format == FORMAT_PARQUET:
+            try:
+                sinks.append(ParquetSink(output_settings.get("parquet_directory", os.path.join(directory, "parquet")),
+                                         batch_size))
+            except RuntimeError as e:
+                logger.error(f"Формат parquet пропущен: {e}")
+        elif output_format == FORMAT_HISTORY:
+            history_path = output_settings.get("history_path", os.path.join(directory, "prediction_history.sqlite3"))
+            sinks.append(HistorySink(history_path, batch_size))
+        else:
+            logger.warning(f"Неизвестный формат вывода пропущен: {output_format}")
+
+    if not sinks:
+        logger.warning("Не задано ни одного формата вывода, используется Excel.")
+        return ExcelSink(batch_size)
+    return sinks[0] if len(sinks) == 1 else MultiSink(sinks)
+
+_SQLITE_TYPES = {str: "TEXT", float: "REAL", int: "INTEGER"}
+
+_ARROW_TYPES = {
+    str: lambda: pyarrow.string(),
+    float: lambda: pyarrow.float64(),
+    int: lambda: pyarrow.int64(),
+}
+
+_append_lock = threading.Lock()
+
+class _CsvLines(list):
+    """
+    Буфер строк для csv.writer, чтобы записать пачку одним вызовом.
+    """
+
+    def write(self, line):
+        self.append(line)
+
+def _append(path, text, header=None):
+    """
+    Дописывает текст в конец файла одним вызовом write. Потоки процесса разделяет _append_lock,
+    процессы — исключительная блокировка файла на время записи.
+    :param path: Путь к файлу.
+    :param text: Текст.
+    :param header: Текст, который записывается перед text, если файл пуст.
+    """
+    with _append_lock:
+        with open(path, "a", encoding="utf-8", newline="") as file:
+            if fcntl is not None:
+                fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+            try:
+                if header and file.seek(0, os.SEEK_END) == 0:
+                    text = header + text
+                file.write(text)
+                file.flush()
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(file.fileno(), fcntl.LOCK_UN)
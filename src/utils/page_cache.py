@@ -0,0 +1,215 @@
+import gzip
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+from src.utils.logger_setup import logger
+
+TAB_XG_STATISTICS = "xg-statistics"
+TAB_PREVIEW = "preview"
+
+class PageCache:
+    """
+    Кэш исходного HTML страниц матчей на диске.
+    Содержимое хранится в сжатых файлах, названных по хэшу содержимого (одинаковые страницы хранятся один раз),
+    а индекс в SQLite связывает пару (адрес, вкладка) с файлом, сроком жизни и временем последнего обращения.
+    Записи без срока жизни (сыгранные матчи) хранятся бессрочно. При превышении max_bytes
+    сначала удаляются просроченные записи, затем давно не использованные.
+    Запись файла, изменение индекса и удаление файлов выполняются в одной транзакции записи SQLite,
+    поэтому кэш могут использовать несколько потоков и процессов: файл, на который ссылается индекс,
+    не удаляется между проверкой его наличия и добавлением записи.
+    """
+
+    def __init__(self, directory=".cache/pages", max_bytes=500 * 1024 * 1024):
+        """
+        :param directory: Директория кэша.
+        :param max_bytes: Максимальный суммарный размер сжатых страниц в байтах.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(directory, "index.sqlite3"), check_same_thread=False)
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT NOT NULL,
+                tab TEXT NOT NULL,
+                blob TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                expires_at REAL,
+                last_access REAL NOT NULL,
+                league TEXT,
+                gameweek INTEGER,
+                PRIMARY KEY (url, tab)
+            )
+            """
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS pages_league ON pages (league, gameweek)")
+        self._db.commit()
+
+    def get(self, url, tab, allow_expired=False):
+        """
+        Возвращает HTML страницы из кэша.
+        :param url: Адрес страницы матча.
+        :param tab: Вкладка (TAB_XG_STATISTICS или TAB_PREVIEW).
+        :param allow_expired: Вернуть запись, даже если срок ее жизни истек.
+        :return: Текст HTML или None, если записи нет или она просрочена.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT blob, expires_at FROM pages WHERE url = ? AND tab = ?", (url, tab)
+            ).fetchone()
+            if row is None:
+                return None
+
+            blob, expires_at = row
+            if expires_at is not None and expires_at < now and not allow_expired:
+                return None
+
+            self._db.execute("UPDATE pages SET last_access = ? WHERE url = ? AND tab = ?", (now, url, tab))
+            self._db.commit()
+
+        try:
+            with gzip.open(self._blob_path(blob), "rt", encoding="utf-8") as file:
+                return file.read()
+        except OSError as e:
+            logger.warning(f"Файл кэша для {url} ({tab}) недоступен: {e}")
+            return None
+
+    def put(self, url, tab, html, ttl=None, league=None, gameweek=None):
+        """
+        Сохраняет HTML страницы в кэш.
+        :param url: Адрес страницы матча.
+        :param tab: Вкладка (TAB_XG_STATISTICS или TAB_PREVIEW).
+        :param html: Текст HTML.
+        :param ttl: Срок жизни записи в секундах. None — бессрочно.
+        :param league: Название лиги (для офлайн-режима).
+        :param gameweek: Номер игровой недели (для офлайн-режима).
+        """
+        data = html.encode("utf-8")
+        blob = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(blob)
+
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        with self._lock:
+            # Блокировка записи удерживается до COMMIT: другой поток или процесс не может удалить файл
+            # с тем же содержимым, пока запись на него не добавлена в индекс.
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                if not os.path.exists(path):
+                    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                    with gzip.open(tmp_path, "wb") as file:
+                        file.write(data)
+                    os.replace(tmp_path, path)
+
+                previous = self._db.execute(
+                    "SELECT blob FROM pages WHERE url = ? AND tab = ?", (url, tab)
+                ).fetchone()
+                self._db.execute(
+                    """
+                    INSERT OR REPLACE INTO pages (url, tab, blob, size, stored_at, expires_at, last_access, league, gameweek)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (url, tab, blob, os.path.getsize(path), now, expires_at, now, league, gameweek)
+                )
+                if previous and previous[0] != blob:
+                    self._remove_unreferenced([previous[0]])
+                self._evict()
+                self._db.commit()
+            except BaseException:
+                self._db.rollback()
+                raise
+
+    def entries(self, league=None, gameweeks=None):
+        """
+        Перечисляет адреса матчей, для которых в кэше есть обе вкладки.
+        :param league: Фильтр по названию лиги.
+        :param gameweeks: Фильтр по списку игровых недель.
+        :return: Список кортежей (адрес, лига, игровая неделя).
+        """
+        query = "SELECT url, league, gameweek FROM pages WHERE 1 = 1"
+        params = []
+        if league is not None:
+            query += " AND league = ?"
+            params.append(league)
+        if gameweeks:
+            query += f" AND gameweek IN ({', '.join('?' for _ in gameweeks)})"
+            params.extend(gameweeks)
+        query += " GROUP BY url HAVING COUNT(DISTINCT tab) = 2 ORDER BY gameweek, MIN(stored_at)"
+
+        with self._lock:
+            return self._db.execute(query, params).fetchall()
+
+    def close(self):
+        """
+        Закрывает индекс кэша.
+        """
+        with self._lock:
+            self._db.close()
+
+    def _blob_path(self, blob):
+        """
+        :param blob: Хэш содержимого.
+        :return: Путь к сжатому файлу страницы.
+        """
+        return os.path.join(self.directory, f"{blob}.html.gz")
+
+    def _evict(self):
+        """
+        Удаляет записи, пока суммарный размер кэша превышает max_bytes:
+        сначала просроченные, затем записи со сроком жизни, затем бессрочные — в порядке давности обращения.
+        Размер файла, на который ссылаются несколько записей, вычитается, только когда удалена последняя из них.
+        Вызывается под блокировкой внутри транзакции записи.
+        """
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT blob, size FROM pages)").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        now = time.time()
+        candidates = self._db.execute(
+            """
+            SELECT url, tab, blob, size FROM pages
+            ORDER BY
+                CASE WHEN expires_at IS NOT NULL AND expires_at < ? THEN 0
+                     WHEN expires_at IS NOT NULL THEN 1
+                     ELSE 2 END,
+                last_access
+            """,
+            (now,)
+        ).fetchall()
+
+        references = Counter(blob for _, _, blob, _ in candidates)
+        removed = []
+        for url, tab, blob, size in candidates:
+            if total <= self.max_bytes:
+                break
+            self._db.execute("DELETE FROM pages WHERE url = ? AND tab = ?", (url, tab))
+            removed.append(blob)
+            references[blob] -= 1
+            if not references[blob]:
+                total -= size
+
+        self._remove_unreferenced(removed)
+        logger.info(f"Из кэша страниц удалено записей: {len(removed)}.")
+
+    def _remove_unreferenced(self, blobs):
+        """
+        Удаляет файлы страниц, на которые больше не ссылается индекс.
+        Вызывается под блокировкой внутри транзакции записи.
+        :param blobs: Список хэшей содержимого.
+        """
+        for blob in set(blobs):
+            in_use = self._db.execute("SELECT 1 FROM pages WHERE blob = ? LIMIT 1", (blob,)).fetchone()
+            if in_use is None:
+                try:
+                    os.remove(self._blob_path(blob))
+                except FileNotFoundError:
+                    pass
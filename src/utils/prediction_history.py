@@ -0,0 +1,255 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from src.utils.match_record import COLUMN_NAMES, MatchRecord
+
+KEY_FIELDS = ("league", "home_team", "away_team")
+"""Поля, определяющие матч в истории прогнозов."""
+
+HISTORY_FIELDS = tuple(name for name in COLUMN_NAMES if name not in KEY_FIELDS and name != "collected_at")
+"""Поля записи матча, изменения которых сохраняются в истории."""
+
+DEFAULT_KEYFRAME_EVERY = 50
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS matches ("
+    "id INTEGER PRIMARY KEY AUTOINCREMENT, league TEXT, home_team TEXT, away_team TEXT, "
+    "UNIQUE (league, home_team, away_team))",
+    "CREATE TABLE IF NOT EXISTS snapshots ("
+    "match_id INTEGER, taken_at INTEGER, full INTEGER, changes TEXT, PRIMARY KEY (match_id, taken_at)) WITHOUT ROWID",
+    "CREATE INDEX IF NOT EXISTS snapshots_keyframes ON snapshots (match_id, taken_at) WHERE full = 1",
+    "CREATE INDEX IF NOT EXISTS snapshots_taken_at ON snapshots (taken_at)",
+)
+
+class PredictionHistory:
+    """
+    История прогнозов матчей в базе SQLite. Для каждого матча (лига, хозяева, гости) хранится не вся строка
+    при каждом опросе, а только поля, изменившиеся с предыдущего снимка; опрос без изменений ничего не записывает.
+    Каждый keyframe_every-й снимок матча записывается целиком, поэтому состояние на любой момент
+    восстанавливается из последнего полного снимка и нескольких изменений после него.
+    """
+
+    def __init__(self, path="data/prediction_history.sqlite3", keyframe_every=DEFAULT_KEYFRAME_EVERY):
+        """
+        :param path: Путь к файлу базы.
+        :param keyframe_every: Через сколько снимков изменений матча записывать полный снимок.
+        """
+        self.path = path
+        self.keyframe_every = max(1, keyframe_every)
+        self._lock = threading.Lock()
+        self._ids = {}
+        self._states = {}
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        with self._db:
+            for statement in _SCHEMA:
+                self._db.execute(statement)
+
+    def record(self, records):
+        """
+        Добавляет снимки матчей. Время снимка — collected_at записи.
+        :param records: Список MatchRecord.
+        :return: Количество записанных снимков (матчи без изменений не записываются).
+        """
+        written = 0
+        with self._lock, self._db:
+            for record in records:
+                written += self._record(record)
+        return written
+
+    def as_of(self, timestamp, league_name=None):
+        """
+        Восстанавливает прогнозы всех матчей на заданный момент.
+        :param timestamp: Момент времени (Unix time, секунды).
+        :param league_name: Название лиги (None — все лиги).
+        :return: Список MatchRecord; collected_at — время последнего изменения матча не позже timestamp.
+        """
+        query = (
+            "SELECT m.id, m.league, m.home_team, m.away_team, s.taken_at, s.full, s.changes "
+            "FROM snapshots s JOIN matches m ON m.id = s.match_id "
+            "JOIN (SELECT match_id, MAX(taken_at) AS since FROM snapshots WHERE full = 1 AND taken_at <= ? "
+            "GROUP BY match_id) k ON k.match_id = s.match_id AND s.taken_at >= k.since "
+            "WHERE s.taken_at <= ?"
+        )
+        params = [timestamp, timestamp]
+        if league_name is not None:
+            query += " AND m.league = ?"
+            params.append(league_name)
+        query += " ORDER BY s.match_id, s.taken_at"
+
+        with self._lock:
+            rows = self._db.execute(query, params).fetchall()
+
+        records = []
+        current = None
+        for match_id, league, home_team, away_team, taken_at, full, changes in rows:
+            if current is None or current[0] != match_id:
+                current = (match_id, {"league": league, "home_team": home_team, "away_team": away_team})
+                records.append(current[1])
+            current[1].update(json.loads(changes))
+            current[1]["collected_at"] = taken_at
+        return [MatchRecord(**values) for values in records]
+
+    def match_as_of(self, league_name, home_team, away_team, timestamp):
+        """
+        :param league_name: Название лиги.
+        :param home_team: Хозяева.
+        :param away_team: Гости.
+        :param timestamp: Момент времени (Unix time, секунды).
+        :return: MatchRecord матча на заданный момент или None, если снимков до этого момента нет.
+        """
+        with self._lock:
+            match_id = self._match_id(league_name, home_team, away_team, create=False)
+            if match_id is None:
+                return None
+            rows = self._replay(match_id, timestamp)
+        if not rows:
+            return None
+        values = {"league": league_name, "home_team": home_team, "away_team": away_team}
+        for _, changes in rows:
+            values.update(changes)
+        values["collected_at"] = rows[-1][0]
+        return MatchRecord(**values)
+
+    def changes(self, league_name, home_team, away_team):
+        """
+        Движение прогнозов матча.
+        :param league_name: Название лиги.
+        :param home_team: Хозяева.
+        :param away_team: Гости.
+        :return: Список кортежей (время снимка, {поле: новое значение}); первый снимок содержит все поля.
+        """
+        with self._lock:
+            match_id = self._match_id(league_name, home_team, away_team, create=False)
+            if match_id is None:
+                return []
+            rows = self._db.execute(
+                "SELECT taken_at, changes FROM snapshots WHERE match_id = ? ORDER BY taken_at", (match_id,)
+            ).fetchall()
+
+        history = []
+        state = {}
+        for taken_at, changes in rows:
+            changes = json.loads(changes)
+            # Полные снимки хранят все поля; в движении прогноза показываются только изменившиеся.
+            delta = {field: value for field, value in changes.items() if state.get(field, _MISSING) != value}
+            state.update(changes)
+            if delta or not history:
+                history.append((taken_at, delta))
+        return history
+
+    def stats(self):
+        """
+        :return: Словарь с количеством матчей, снимков и полных снимков в истории.
+        """
+        with self._lock:
+            matches = self._db.execute("SELECT COUNT(*) FROM matches").fetchone()[0]
+            snapshots, keyframes = self._db.execute("SELECT COUNT(*), SUM(full) FROM snapshots").fetchone()
+        return {"matches": matches, "snapshots": snapshots, "keyframes": keyframes or 0}
+
+    def close(self):
+        """
+        Закрывает базу.
+        """
+        with self._lock:
+            self._db.close()
+
+    def _record(self, record):
+        """
+        Записывает снимок одного матча. Вызывается под блокировкой внутри транзакции.
+        :param record: MatchRecord.
+        :return: 1, если снимок записан, иначе 0.
+        """
+        match_id = self._match_id(record.league, record.home_team, record.away_team, create=True)
+        values = {field: getattr(record, field) for field in HISTORY_FIELDS}
+        taken_at = record.collected_at if record.collected_at is not None else int(time.time())
+
+        state = self._states.get(match_id)
+        if state is None:
+            state = self._load_state(match_id)
+        last_at, snapshot, since_keyframe = state
+
+        changes = {field: value for field, value in values.items() if snapshot.get(field, _MISSING) != value}
+        if not changes:
+            return 0
+        snapshot.update(changes)
+
+        if last_at is not None and taken_at <= last_at:
+            # Снимок с тем же или более ранним временем (несколько опросов за секунду) дополняет последний.
+            row = self._db.execute(
+                "SELECT full, changes FROM snapshots WHERE match_id = ? AND taken_at = ?", (match_id, last_at)
+            ).fetchone()
+            merged = json.loads(row[1])
+            merged.update(snapshot if row[0] else changes)
+            self._db.execute(
+                "UPDATE snapshots SET changes = ? WHERE match_id = ? AND taken_at = ?",
+                (_dump(merged), match_id, last_at)
+            )
+            return 1
+
+        full = last_at is None or since_keyframe + 1 >= self.keyframe_every
+        self._db.execute(
+            "INSERT INTO snapshots (match_id, taken_at, full, changes) VALUES (?, ?, ?, ?)",
+            (match_id, taken_at, int(full), _dump(snapshot if full else changes))
+        )
+        self._states[match_id] = (taken_at, snapshot, 0 if full else since_keyframe + 1)
+        return 1
+
+    def _load_state(self, match_id):
+        """
+        Восстанавливает последнее состояние матча из базы (при первом обращении к матчу за запуск).
+        :param match_id: Идентификатор матча.
+        :return: Кортеж (время последнего снимка, {поле: значение}, снимков после полного).
+        """
+        rows = self._replay(match_id)
+        snapshot = {}
+        for _, changes in rows:
+            snapshot.update(changes)
+        state = (rows[-1][0] if rows else None, snapshot, max(0, len(rows) - 1))
+        self._states[match_id] = state
+        return state
+
+    def _replay(self, match_id, timestamp=None):
+        """
+        :param match_id: Идентификатор матча.
+        :param timestamp: Момент времени; None — последнее состояние.
+        :return: Список кортежей (время, изменения) от последнего полного снимка не позже timestamp.
+        """
+        if timestamp is None:
+            timestamp = 2 ** 62
+        rows = self._db.execute(
+            "SELECT taken_at, changes FROM snapshots WHERE match_id = ? AND taken_at <= ? AND taken_at >= "
+            "(SELECT MAX(taken_at) FROM snapshots WHERE match_id = ? AND full = 1 AND taken_at <= ?) "
+            "ORDER BY taken_at",
+            (match_id, timestamp, match_id, timestamp)
+        ).fetchall()
+        return [(taken_at, json.loads(changes)) for taken_at, changes in rows]
+
+    def _match_id(self, league_name, home_team, away_team, create):
+        """
+        :return: Идентификатор матча; при create=True матч добавляется, если его еще нет.
+        """
+        key = (league_name, home_team, away_team)
+        match_id = self._ids.get(key)
+        if match_id is not None:
+            return match_id
+        row = self._db.execute(
+            "SELECT id FROM matches WHERE league IS ? AND home_team IS ? AND away_team IS ?", key
+        ).fetchone()
+        if row is None:
+            if not create:
+                return None
+            row = (self._db.execute(
+                "INSERT INTO matches (league, home_team, away_team) VALUES (?, ?, ?)", key
+            ).lastrowid,)
+        self._ids[key] = row[0]
+        return row[0]
+
+_MISSING = object()
+
+def _dump(values):
+    return json.dumps(values, ensure_ascii=False, separators=(",", ":"))
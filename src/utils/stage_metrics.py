@@ -0,0 +1,158 @@
+import functools
+import json
+import math
+import os
+import threading
+import time
+from contextlib import nullcontext
+
+from src.utils.logger_setup import logger
+
+_NOOP = nullcontext()
+
+class StageMetrics:
+    """
+    Замеры времени этапов работы парсера (запуск браузера, навигация, паузы, передача page_source,
+    разбор страниц, запись в Excel). Длительности собираются по имени этапа, в конце запуска
+    выводятся количество, сумма, p50, p95 и максимум по каждому этапу.
+    Пока замеры выключены, stage() возвращает общий пустой контекстный менеджер и ничего не измеряет.
+    """
+
+    def __init__(self, enabled=False):
+        """
+        :param enabled: Включены ли замеры.
+        """
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._durations = {}
+        self._started = time.monotonic()
+
+    def configure(self, enabled):
+        """
+        Включает или выключает замеры и сбрасывает накопленные данные.
+        :param enabled: Включены ли замеры.
+        """
+        with self._lock:
+            self.enabled = enabled
+            self._durations = {}
+            self._started = time.monotonic()
+
+    def stage(self, name):
+        """
+        Контекстный менеджер, измеряющий длительность блока.
+        :param name: Имя этапа, например "parse.preview".
+        """
+        if not self.enabled:
+            return _NOOP
+        return _Timer(self, name)
+
+    def timed(self, name):
+        """
+        Декоратор, измеряющий длительность каждого вызова функции.
+        :param name: Имя этапа.
+        """
+        def decorator(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                started = time.perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    self.record(name, time.perf_counter() - started)
+            return wrapper
+        return decorator
+
+    def record(self, name, seconds):
+        """
+        Добавляет замер этапа.
+        :param name: Имя этапа.
+        :param seconds: Длительность в секундах.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._durations.setdefault(name, []).append(seconds)
+
+    def summary(self):
+        """
+        :return: Словарь {этап: {count, total, p50, p95, max}} (секунды), отсортированный по убыванию суммы.
+        """
+        with self._lock:
+            stages = {name: sorted(values) for name, values in self._durations.items()}
+
+        result = {}
+        for name, values in sorted(stages.items(), key=lambda item: -sum(item[1])):
+            result[name] = {
+                "count": len(values),
+                "total": round(sum(values), 3),
+                "p50": round(_percentile(values, 0.5), 4),
+                "p95": round(_percentile(values, 0.95), 4),
+                "max": round(values[-1], 4),
+            }
+        return result
+
+    def report(self, path=None):
+        """
+        Выводит сводку в лог и записывает ее в JSON-файл.
+        :param path: Путь к JSON-файлу метрик. None — только лог.
+        """
+        if not self.enabled:
+            return
+        stages = self.summary()
+        if not stages:
+            return
+
+        elapsed = time.monotonic() - self._started
+        lines = [f"{'этап':<34}{'кол-во':>8}{'всего, с':>11}{'p50, мс':>10}{'p95, мс':>10}{'макс, мс':>10}"]
+        for name, stats in stages.items():
+            lines.append(
+                f"{name:<34}{stats['count']:>8}{stats['total']:>11.2f}"
+                f"{stats['p50'] * 1000:>10.1f}{stats['p95'] * 1000:>10.1f}{stats['max'] * 1000:>10.1f}"
+            )
+        logger.info(f"Время по этапам (запуск {elapsed:.1f} с):\n" + "\n".join(lines))
+
+        if path:
+            try:
+                directory = os.path.dirname(os.path.abspath(path))
+                os.makedirs(directory, exist_ok=True)
+                with open(path, "w", encoding="utf-8") as file:
+                    json.dump({
+                        "finished_at": int(time.time()),
+                        "elapsed_seconds": round(elapsed, 3),
+                        "stages": stages,
+                    }, file, ensure_ascii=False, indent=2)
+                logger.info(f"Метрики этапов сохранены: {path}")
+            except OSError as e:
+                logger.error(f"Не удалось сохранить метрики этапов: {e}")
+
+class _Timer:
+    """
+    Замер одного блока для StageMetrics.stage().
+    """
+
+    __slots__ = ("metrics", "name", "started")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.metrics.record(self.name, time.perf_counter() - self.started)
+        return False
+
+def _percentile(values, fraction):
+    """
+    :param values: Отсортированный непустой список.
+    :param fraction: Доля (0.95 для p95).
+    :return: Значение по методу ближайшего ранга.
+    """
+    return values[max(0, math.ceil(fraction * len(values)) - 1)]
+
+metrics = StageMetrics()
+"""Общий для процесса объект замеров; включается настройкой "metrics" при создании ScrapeContext."""
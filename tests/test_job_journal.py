@@ -0,0 +1,77 @@
+from src.utils.job_journal import RUN_FINISHED, RUN_INCOMPLETE, JobJournal
+
+LEAGUE = "Spain. La Liga"
+
+def _journal(tmp_path, resume=False):
+    journal = JobJournal(str(tmp_path / "journal.sqlite3"))
+    journal.begin(resume=resume)
+    return journal
+
+def test_resume_skips_finished_gameweeks_and_committed_matches(tmp_path):
+    journal = _journal(tmp_path)
+    run_id = journal.run_id
+    journal.start_gameweek(LEAGUE, 1)
+    journal.record_match("match-1", LEAGUE, 1)
+    journal.commit()
+    journal.finish_gameweek(LEAGUE, 1)
+    journal.start_gameweek(LEAGUE, 2)
+    journal.record_match("match-2", LEAGUE, 2)
+    journal.commit()
+    journal.record_match("match-3", LEAGUE, 2)
+    journal.close()
+
+    journal = _journal(tmp_path, resume=True)
+    assert (journal.run_id, journal.resumed) == (run_id, True)
+    assert journal.is_gameweek_done(LEAGUE, 1)
+    assert not journal.is_gameweek_done(LEAGUE, 2)
+    assert journal.is_match_done("match-1") and journal.is_match_done("match-2")
+    # Матч без контрольной точки мог не попасть в приемник и собирается заново.
+    assert not journal.is_match_done("match-3")
+    journal.close()
+
+def test_gameweek_with_failed_or_uncommitted_matches_is_not_done(tmp_path):
+    journal = _journal(tmp_path)
+    journal.start_gameweek(LEAGUE, 1)
+    journal.record_match("match-1", LEAGUE, 1, error="timeout")
+    journal.finish_gameweek(LEAGUE, 1)
+    journal.start_gameweek(LEAGUE, 2)
+    journal.record_match("match-2", LEAGUE, 2)
+    journal.finish_gameweek(LEAGUE, 2)
+    journal.start_gameweek(LEAGUE, 3)
+    journal.finish_gameweek(LEAGUE, 3, error="navigation failed")
+
+    assert not any(journal.is_gameweek_done(LEAGUE, gameweek) for gameweek in (1, 2, 3))
+    assert journal.finish_run() == RUN_INCOMPLETE
+    journal.close()
+
+    journal = _journal(tmp_path, resume=True)
+    assert journal.resumed
+    assert journal.is_match_done("match-2")
+    journal.start_gameweek(LEAGUE, 1)
+    journal.record_match("match-1", LEAGUE, 1)
+    journal.commit()
+    journal.finish_gameweek(LEAGUE, 1)
+    for gameweek in (2, 3):
+        journal.start_gameweek(LEAGUE, gameweek)
+        journal.finish_gameweek(LEAGUE, gameweek)
+    assert journal.finish_run() == RUN_FINISHED
+    journal.close()
+
+def test_new_run_after_finished_run(tmp_path):
+    journal = _journal(tmp_path)
+    run_id = journal.run_id
+    journal.start_gameweek(LEAGUE, 1)
+    journal.record_match("match-1", LEAGUE, 1)
+    journal.commit()
+    journal.finish_gameweek(LEAGUE, 1)
+    assert journal.finish_run() == RUN_FINISHED
+    journal.close()
+
+    journal = _journal(tmp_path, resume=True)
+    assert not journal.resumed and journal.run_id != run_id
+    assert not journal.is_gameweek_done(LEAGUE, 1) and not journal.is_match_done("match-1")
+    journal.close()
+
+    journal = _journal(tmp_path)
+    assert not journal.resumed
+    journal.close()
@@ -0,0 +1,103 @@
+import pytest
+
+from src.utils import job_queue
+from src.utils.job_queue import STATUS_DONE, STATUS_FAILED, STATUS_LEASED, STATUS_PENDING, SQLiteJobQueue
+from src.utils.match_record import MatchRecord
+
+LEAGUE = "Spain. La Liga"
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(job_queue.time, "time", clock)
+    return clock
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = SQLiteJobQueue(str(tmp_path / "queue.sqlite3"), lease_seconds=60, max_attempts=2)
+    yield queue
+    queue.close()
+
+def test_expired_lease_is_requeued_for_another_worker(queue, clock):
+    assert queue.enqueue([(LEAGUE, 1), (LEAGUE, 2)]) == 2
+    assert queue.enqueue([(LEAGUE, 1)]) == 0
+    assert queue.lease("worker-1") == (LEAGUE, 1)
+    assert queue.lease("worker-2") == (LEAGUE, 2)
+    assert queue.lease("worker-3") is None
+
+    clock.now += 30
+    assert queue.heartbeat("worker-1", (LEAGUE, 1))
+    clock.now += 45
+    # Аренда worker-2 истекла (75 с без продления), аренда worker-1 продлена и еще действует.
+    assert queue.lease("worker-3") == (LEAGUE, 2)
+    assert queue.counts()[STATUS_LEASED] == 2
+
+    assert not queue.heartbeat("worker-2", (LEAGUE, 2))
+    assert queue.complete("worker-2", (LEAGUE, 2)) is None
+    assert queue.complete("worker-3", (LEAGUE, 2)) == STATUS_DONE
+    assert queue.complete("worker-1", (LEAGUE, 1)) == STATUS_DONE
+    assert queue.counts() == {STATUS_PENDING: 0, STATUS_LEASED: 0, STATUS_DONE: 2, STATUS_FAILED: 0}
+
+def test_failed_job_is_retried_until_max_attempts(queue, clock):
+    queue.enqueue([(LEAGUE, 1)])
+    job = queue.lease("worker-1")
+    assert queue.complete("worker-1", job, RuntimeError("timeout")) == STATUS_PENDING
+
+    assert queue.lease("worker-2") == job
+    assert queue.complete("worker-2", job, RuntimeError("timeout")) == STATUS_FAILED
+    assert queue.lease("worker-3") is None
+    assert queue.failed() == [(LEAGUE, 1, "timeout")]
+
+def test_lease_expiring_on_last_attempt_fails_the_job(queue, clock):
+    queue.enqueue([(LEAGUE, 1)])
+    job = queue.lease("worker-1")
+    clock.now += 61
+    assert queue.lease("worker-2") == job
+    clock.now += 61
+
+    assert queue.lease("worker-3") is None
+    assert queue.counts() == {STATUS_PENDING: 0, STATUS_LEASED: 0, STATUS_DONE: 0, STATUS_FAILED: 1}
+    assert queue.failed() == [(LEAGUE, 1, job_queue.LEASE_EXPIRED_ERROR)]
+    assert queue.complete("worker-2", job) is None
+
+def test_results_stay_queued_until_acknowledged(queue):
+    records = [MatchRecord(league=LEAGUE, home_team=f"home-{number}", away_team="away") for number in range(3)]
+    queue.push_results("worker-1", LEAGUE, records)
+
+    assert [record for _, record in queue.peek_results(limit=2)] == records[:2]
+    assert [record for _, record in queue.peek_results(limit=2)] == records[:2]
+    queue.ack_results(2)
+    assert queue.peek_results() == [(LEAGUE, records[2])]
+    queue.ack_results(1)
+    assert queue.peek_results() == []
+
+def test_enqueue_requeues_failed_jobs_only(queue):
+    queue.enqueue([(LEAGUE, 1), (LEAGUE, 2)])
+    done, failed = queue.lease("worker-1"), queue.lease("worker-2")
+    queue.complete("worker-1", done)
+    queue.complete("worker-2", failed, RuntimeError("timeout"))
+    queue.complete("worker-2", queue.lease("worker-2"), RuntimeError("timeout"))
+    assert queue.failed() == [(LEAGUE, 2, "timeout")]
+
+    assert queue.enqueue([(LEAGUE, 1), (LEAGUE, 2)]) == 1
+    assert queue.counts() == {STATUS_PENDING: 1, STATUS_LEASED: 0, STATUS_DONE: 1, STATUS_FAILED: 0}
+    # Счетчик попыток обнулен: задание снова выдается max_attempts раз.
+    assert queue.lease("worker-3") == failed
+    assert queue.complete("worker-3", failed, RuntimeError("timeout")) == STATUS_PENDING
+
+def test_reset_clears_jobs_but_keeps_results(queue):
+    record = MatchRecord(league=LEAGUE, home_team="home", away_team="away")
+    queue.enqueue([(LEAGUE, 1)])
+    queue.push_results("worker-1", LEAGUE, [record])
+
+    assert queue.enqueue([(LEAGUE, 2)], reset=True) == 1
+    assert queue.counts()[STATUS_PENDING] == 1
+    assert queue.lease("worker-1") == (LEAGUE, 2)
+    assert queue.peek_results() == [(LEAGUE, record)]
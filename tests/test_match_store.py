@@ -0,0 +1,43 @@
+from src.query.match_store import SOURCE_EXCEL, SOURCE_SQLITE, MatchStore
+from src.utils.excel_saver import ExcelSink
+from src.utils.match_record import MatchRecord
+from src.utils.output_writers import SQLiteSink
+
+LEAGUE = "Spain. La Liga"
+
+def _record(gameweek, season="2024/2025", goals=None):
+    return MatchRecord(
+        league=LEAGUE, season=season, gameweek=gameweek, home_team="Real Betis", away_team="Leganes",
+        goals_home=goals, goals_away=goals
+    )
+
+def test_excel_rows_keep_gameweek_for_queries(tmp_path):
+    sink = ExcelSink(directory=str(tmp_path))
+    sink.write(_record(7), LEAGUE)
+    sink.close()
+
+    store = MatchStore(str(tmp_path), source=SOURCE_EXCEL)
+    store.refresh()
+    assert [(record.gameweek, record.season) for record in store.query(gameweek=7)] == [(7, "2024/2025")]
+    assert store.query(gameweek=8) == []
+
+def test_excel_replaces_only_the_unplayed_row_of_the_same_fixture(tmp_path):
+    sink = ExcelSink(directory=str(tmp_path))
+    sink.write([_record(7), _record(7, goals=1), _record(7, season="2025/2026")], LEAGUE)
+    sink.close()
+
+    store = MatchStore(str(tmp_path), source=SOURCE_EXCEL)
+    store.refresh()
+    rows = [(record.season, record.gameweek, record.goals_home) for record in store.query()]
+    assert sorted(rows) == [("2024/2025", 7, 1), ("2025/2026", 7, None)]
+
+def test_same_teams_in_other_gameweeks_and_seasons_are_kept(tmp_path):
+    sink = SQLiteSink(str(tmp_path / "matches.sqlite3"))
+    sink.write([_record(5), _record(5, goals=2), _record(24), _record(5, season="2025/2026")], LEAGUE)
+    sink.close()
+
+    store = MatchStore(str(tmp_path), source=SOURCE_SQLITE)
+    store.refresh()
+    assert len(store) == 3
+    assert [record.goals_home for record in store.query(gameweek=5) if record.season == "2024/2025"] == [2]
+    assert store.teams(LEAGUE) == ["Leganes", "Real Betis"]
@@ -0,0 +1,112 @@
+import gzip
+import os
+
+import pytest
+
+from src.utils import page_cache
+from src.utils.page_cache import PageCache, TAB_PREVIEW, TAB_XG_STATISTICS
+
+PAGE_CHARS = 4000
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(page_cache.time, "time", clock)
+    return clock
+
+def _page():
+    # Случайные страницы одной длины сжимаются почти одинаково, поэтому их размеры в кэше близки.
+    return os.urandom(PAGE_CHARS // 2).hex()
+
+def _cache(tmp_path, pages=2.5):
+    """
+    :return: PageCache, в который помещается pages страниц из _page().
+    """
+    return PageCache(str(tmp_path / "pages"), max_bytes=int(len(gzip.compress(_page().encode("utf-8"))) * pages))
+
+def _blobs(tmp_path):
+    return sorted(name for name in os.listdir(tmp_path / "pages") if name.endswith(".html.gz"))
+
+def test_evicts_least_recently_used(tmp_path, clock):
+    cache = _cache(tmp_path)
+    cache.put("a", TAB_PREVIEW, _page())
+    clock.now += 1
+    cache.put("b", TAB_PREVIEW, _page())
+    clock.now += 1
+    assert cache.get("a", TAB_PREVIEW) is not None
+    clock.now += 1
+    cache.put("c", TAB_PREVIEW, _page())
+
+    assert cache.get("b", TAB_PREVIEW) is None
+    assert cache.get("a", TAB_PREVIEW) is not None
+    assert cache.get("c", TAB_PREVIEW) is not None
+    cache.close()
+
+def test_evicts_expired_entries_first(tmp_path, clock):
+    cache = _cache(tmp_path)
+    cache.put("finished", TAB_PREVIEW, _page())
+    clock.now += 1
+    cache.put("upcoming", TAB_PREVIEW, _page(), ttl=10)
+    clock.now += 100
+    assert cache.get("upcoming", TAB_PREVIEW) is None
+    assert cache.get("upcoming", TAB_PREVIEW, allow_expired=True) is not None
+    cache.put("new", TAB_PREVIEW, _page())
+
+    assert cache.get("upcoming", TAB_PREVIEW, allow_expired=True) is None
+    assert cache.get("finished", TAB_PREVIEW) is not None
+    cache.close()
+
+def test_removes_files_of_evicted_pages(tmp_path, clock):
+    cache = _cache(tmp_path)
+    pages = [_page() for _ in range(4)]
+    for number, html in enumerate(pages):
+        cache.put(f"match-{number}", TAB_PREVIEW, html)
+        clock.now += 1
+
+    assert len(_blobs(tmp_path)) == 2
+    assert [cache.get(f"match-{number}", TAB_PREVIEW) for number in range(4)] == [None, None, pages[2], pages[3]]
+    cache.close()
+
+def test_identical_pages_stored_once(tmp_path, clock):
+    cache = _cache(tmp_path)
+    html = _page()
+    cache.put("match", TAB_XG_STATISTICS, html, league="L", gameweek=1)
+    cache.put("match", TAB_PREVIEW, html, league="L", gameweek=1)
+
+    assert len(_blobs(tmp_path)) == 1
+    assert cache.entries("L", [1]) == [("match", "L", 1)]
+    cache.close()
+
+def test_shared_file_counts_once_when_evicting(tmp_path, clock):
+    cache = _cache(tmp_path)
+    shared, second, third = _page(), _page(), _page()
+    cache.put("shared-1", TAB_PREVIEW, shared)
+    cache.put("shared-2", TAB_PREVIEW, shared)
+    clock.now += 1
+    cache.put("second", TAB_PREVIEW, second)
+    clock.now += 1
+    cache.put("third", TAB_PREVIEW, third)
+
+    # Удаление одной из записей общего файла не освобождает место: вытесняются обе.
+    assert cache.get("shared-1", TAB_PREVIEW) is None
+    assert cache.get("shared-2", TAB_PREVIEW) is None
+    assert len(_blobs(tmp_path)) == 2
+    cache.close()
+
+def test_put_restores_a_missing_shared_file(tmp_path, clock):
+    cache = _cache(tmp_path)
+    html = _page()
+    cache.put("match-1", TAB_PREVIEW, html)
+    os.remove(tmp_path / "pages" / _blobs(tmp_path)[0])
+    cache.put("match-2", TAB_PREVIEW, html)
+
+    assert cache.get("match-1", TAB_PREVIEW) == html
+    assert cache.get("match-2", TAB_PREVIEW) == html
+    cache.close()
@@ -0,0 +1,64 @@
+from src.utils.match_record import MatchRecord
+from src.utils.prediction_history import PredictionHistory
+
+def _record(collected_at, winner_mark, goals_home=None, goals_away=None):
+    return MatchRecord(
+        league="Spain. La Liga", home_team="Real Betis", away_team="Leganes", winner="Home Win",
+        winner_mark=winner_mark, goals_home=goals_home, goals_away=goals_away, collected_at=collected_at,
+    )
+
+def _history(tmp_path, keyframe_every=2):
+    return PredictionHistory(str(tmp_path / "history.sqlite3"), keyframe_every=keyframe_every)
+
+def test_as_of_restores_state_between_keyframes(tmp_path):
+    history = _history(tmp_path)
+    history.record([_record(100, 1.71)])
+    history.record([_record(200, 1.65)])
+    history.record([_record(300, 1.60)])
+    history.record([_record(400, 1.60, goals_home=2, goals_away=0)])
+
+    assert history.as_of(50) == []
+    assert [record.winner_mark for record in history.as_of(250)] == [1.65]
+    (record,) = history.as_of(350)
+    assert (record.winner_mark, record.goals_home, record.collected_at) == (1.60, None, 300)
+    (record,) = history.as_of(10 ** 9)
+    assert (record.winner, record.winner_mark, record.goals_home, record.goals_away) == ("Home Win", 1.60, 2, 0)
+    assert history.match_as_of("Spain. La Liga", "Real Betis", "Leganes", 250).winner_mark == 1.65
+    history.close()
+
+def test_as_of_filters_by_league(tmp_path):
+    history = _history(tmp_path)
+    history.record([_record(100, 1.71), MatchRecord(league="France. Ligue 1", home_team="Lens", away_team="Nice",
+                                                    winner_mark=2.1, collected_at=100)])
+
+    assert [record.home_team for record in history.as_of(100, "France. Ligue 1")] == ["Lens"]
+    assert len(history.as_of(100)) == 2
+    history.close()
+
+def test_changes_lists_only_changed_fields(tmp_path):
+    history = _history(tmp_path)
+    assert history.record([_record(100, 1.71)]) == 1
+    assert history.record([_record(200, 1.71)]) == 0
+    history.record([_record(300, 1.65)])
+    history.record([_record(400, 1.65, goals_home=1, goals_away=1)])
+
+    changes = history.changes("Spain. La Liga", "Real Betis", "Leganes")
+    assert [taken_at for taken_at, _ in changes] == [100, 300, 400]
+    assert changes[0][1]["winner_mark"] == 1.71
+    assert changes[1][1] == {"winner_mark": 1.65}
+    assert changes[2][1] == {"goals_home": 1, "goals_away": 1}
+    assert history.changes("Spain. La Liga", "Real Betis", "Unknown") == []
+    history.close()
+
+def test_history_survives_reopen(tmp_path):
+    history = _history(tmp_path)
+    history.record([_record(100, 1.71)])
+    history.record([_record(200, 1.65)])
+    history.close()
+
+    history = _history(tmp_path)
+    assert history.record([_record(300, 1.65)]) == 0
+    history.record([_record(400, 1.50)])
+    assert [taken_at for taken_at, _ in history.changes("Spain. La Liga", "Real Betis", "Leganes")] == [100, 200, 400]
+    assert history.as_of(300)[0].winner_mark == 1.65
+    history.close()